@@ -2,37 +2,187 @@
 """
 @author lsipii
 """
+import threading
+
 from apps.DeviceApp.hardware.RaspiCamera import RaspiCamera
+from apps.DeviceApp.features.FrameRingBuffer import FrameRingBuffer
+from apps.DeviceApp.features.coffee.CoffeeObservation import CoffeeObservation
+from apps.utils.Utils import getSettingsGroup
 
 
 class CameraShooter(RaspiCamera):
 
+	"""
+	Default frame buffer settings
+
+	@var (dict) defaultFrameBufferSettings
+	"""
+	defaultFrameBufferSettings = {
+		"backgroundCaptureEnabled": False,
+		"size": 3,
+		"captureInterval": 10,
+		"freshnessSeconds": 15,
+	}
+
 	"""
 	Camera shots module initialization
 
 	@param (MediaStorage) storage
 	@param (bool) debugMode
+	@param (dict) appSettings = None
 	"""
-	def __init__(self, storage, debugMode = False):
-		super().__init__(debugMode)
+	def __init__(self, storage, debugMode = False, appSettings = None):
+		super().__init__(debugMode, appSettings)
 		self.storage = storage
-		
+
+		# The background captured frames
+		self.frameBufferSettings = getSettingsGroup(appSettings, "frameBuffer", self.defaultFrameBufferSettings)
+		self.frameBuffer = FrameRingBuffer(self.frameBufferSettings["size"])
+		self.backgroundCaptureThread = None
+		self.backgroundCaptureStopper = threading.Event()
+
+		# The camera handed over to the stream, eg. to motion, is not captured from
+		self.cameraLock = threading.Lock()
+		self.cameraReleased = False
+		self.captureEngineReleased = False
+
 	"""
 	Takes a photo
 	"""
 	def takeAPhoto(self, mediaPath = None):
-		super().captureStart()
 		self.storage.clearPreviousMediaFiles()
 		self.storage.setupMediaFilename()
-		super().takeAPhoto(self.storage.getTemprorayMediaFilePath())
+		coffeeObservation = self.captureObservation()
+		with open(self.storage.getTemprorayMediaFilePath(), "wb") as imageFile:
+			imageFile.write(coffeeObservation.frame)
+
+	"""
+	Takes a photo to memory, the storage is not touched
+
+	@return (CoffeeObservation) coffeeObservation
+	"""
+	def captureObservation(self):
+		super().captureStart()
+		frame = self.getFreshFrame()
 		super().captureStop()
+		return CoffeeObservation(frame, jpegQuality=self.captureEngine.settings["quality"])
+
+	"""
+	Gets the newest buffered frame if fresh enough, captures a new one if not
+
+	@return (bytes) frame
+	"""
+	def getFreshFrame(self):
+		if self.frameBufferSettings["backgroundCaptureEnabled"]:
+			frame = self.frameBuffer.getNewestFrame(self.frameBufferSettings["freshnessSeconds"])
+			if frame is not None:
+				if self.debugMode:
+					print("Using a buffered frame")
+				return frame
+
+		frame = self.captureOwnFrame()
+		self.frameBuffer.push(frame)
+		return frame
+
+	"""
+	Captures a frame with the capture engine, unless the camera is handed over to the stream
+
+	@throws (Exception) if the camera is held by the stream
+	@return (bytes) frame
+	"""
+	def captureOwnFrame(self):
+		with self.cameraLock:
+			if self.captureEngineReleased:
+				raise Exception("CameraShooter: the camera is held by the stream")
+			return self.captureFrame()
+
+	"""
+	Hands the camera over to the stream, the background capturing pauses
+
+	@param (bool) stopCaptureEngine = True, releases the sensor for another process, eg. motion
+	"""
+	def releaseCamera(self, stopCaptureEngine = True):
+		with self.cameraLock:
+			self.cameraReleased = True
+			self.captureEngineReleased = stopCaptureEngine
+			if stopCaptureEngine:
+				self.captureEngine.stop()
+
+	"""
+	Takes the camera back from the stream, the capture engine warms up in the background
+	"""
+	def reclaimCamera(self):
+		with self.cameraLock:
+			captureEngineReleased = self.captureEngineReleased
+			self.cameraReleased = False
+			self.captureEngineReleased = False
+		if captureEngineReleased:
+			threading.Thread(target=self.warmUpCaptureEngine, name="CameraShooterWarmUp", daemon=True).start()
+
+	"""
+	Starts the capture engine session, unless the camera was handed over again meanwhile
+	"""
+	def warmUpCaptureEngine(self):
+		with self.cameraLock:
+			if self.captureEngineReleased:
+				return
+			try:
+				self.captureEngine.start()
+			except Exception as e:
+				if self.debugMode:
+					print("Warming up the camera failed: "+str(e))
+
+	"""
+	Checks if the camera is handed over to the stream
+
+	@return (bool)
+	"""
+	def isCameraReleased(self):
+		return self.cameraReleased
+
+	"""
+	Starts the background services, the background frame capturing if enabled
+	"""
+	def startBackgroundServices(self):
+		if self.frameBufferSettings["backgroundCaptureEnabled"]:
+			self.startBackgroundCapture()
+
+	"""
+	Starts the background frame capturing, if not yet running
+	"""
+	def startBackgroundCapture(self):
+		if self.backgroundCaptureThread is not None and self.backgroundCaptureThread.is_alive():
+			return
+		self.backgroundCaptureStopper.clear()
+		self.backgroundCaptureThread = threading.Thread(target=self.runBackgroundCapture, name="CameraShooterBackgroundCapture", daemon=True)
+		self.backgroundCaptureThread.start()
+
+	"""
+	Stops the background frame capturing
+	"""
+	def stopBackgroundCapture(self):
+		self.backgroundCaptureStopper.set()
+		if self.backgroundCaptureThread is not None:
+			self.backgroundCaptureThread.join()
+			self.backgroundCaptureThread = None
+
+	"""
+	The background capture loop
+	"""
+	def runBackgroundCapture(self):
+		while not self.backgroundCaptureStopper.is_set():
+			try:
+				if not self.cameraReleased:
+					self.frameBuffer.push(self.captureOwnFrame())
+			except Exception as e:
+				if self.debugMode:
+					print("Background capture failed: "+str(e))
+			self.backgroundCaptureStopper.wait(self.frameBufferSettings["captureInterval"])
 
 	"""
 	Returns the images url
-	
+
 	@return (string) imageUrl
 	"""
 	def getPhotoStorageUrl(self):
 		return self.storage.getMediaFileUrl()
-	
-		
\ No newline at end of file
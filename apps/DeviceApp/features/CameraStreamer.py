@@ -2,10 +2,19 @@
 """
 @author lsipii
 """
+import threading
+import time
+
 from apps.DeviceApp.hardware.Camera import Camera
+from apps.DeviceApp.features.streaming.FrameBroadcaster import FrameBroadcaster
+from apps.DeviceApp.features.streaming.MjpegSnapshotReader import MjpegSnapshotReader
+from apps.DeviceApp.features.streaming.MjpegStreamProxy import MjpegStreamProxy
+from apps.DeviceApp.features.streaming.MotionControlClient import MotionControlClient
+from apps.utils.CachedProbe import CachedProbe
+from apps.utils.FileSystem import isProcessRunning
+from apps.utils.Utils import getSettingsGroup
 
 import sh
-import os
 
 class CameraStreamer(Camera):
 
@@ -16,33 +25,255 @@ class CameraStreamer(Camera):
 	"""
 	shellApplicationRequirements = ["motion"]
 
+	"""
+	Default streaming settings
+
+	@var (dict) defaultStreamingSettings
+	"""
+	defaultStreamingSettings = {
+		"mode": "motion",
+		"maxFramesPerSecond": 15,
+		"minFramesPerSecond": 2,
+		"idleFramesPerSecond": 1,
+		"framesBudgetPerSecond": 60,
+		"clientQueueSize": 2,
+		"snapshotsWhileStreaming": True,
+		"snapshotMaxAgeSeconds": 5,
+		"snapshotTimeout": 3,
+		"motionStreamUrl": "http://localhost:8081",
+		"motionControlUrl": "http://localhost:8080",
+		"motionCameraId": 0,
+		"motionControlTimeout": 2,
+		"stateProbeInterval": 30,
+		"proxyTimeout": 10,
+		"idleShutdownSeconds": 600,
+		"idleCheckInterval": 30,
+	}
+
 	"""
 	Camera shots module initialization
 	
-	@param (dict) appConfig [host]
+	@param (dict) appConfig [host, settings]
+	@param (callable) captureFrame = None, the frame source of the in-process stream
+	@param (bool) debugMode = False
+	@param (callable) releaseCamera = None, called with stopCaptureEngine when the stream takes the camera
+	@param (callable) reclaimCamera = None, called when the stream gives the camera back
 	"""
-	def __init__(self, appConfig):
-		super().__init__()
+	def __init__(self, appConfig, captureFrame = None, debugMode = False, releaseCamera = None, reclaimCamera = None):
+		super().__init__(debugMode)
+		self.releaseCameraHandler = releaseCamera
+		self.reclaimCameraHandler = reclaimCamera
 		self.streamingHost = appConfig["host"]
-		self.weAreCurrentlyStreaming = self.checkIfStreamingAppActuallyRunning()
+		self.streamingSettings = getSettingsGroup(appConfig.get("settings"), "streaming", self.defaultStreamingSettings)
+
+		self.frameBroadcaster = None
+		if self.isInProcessStreaming():
+			if captureFrame is None:
+				raise Exception("CameraStreamer: the in-process streaming requires a frame source")
+			self.shellApplicationRequirements = []
+			self.frameBroadcaster = FrameBroadcaster(captureFrame, self.streamingSettings, debugMode)
+
+		# The resident motion holds the camera, its detection is paused and resumed over http and its stream
+		# opened and closed to the viewers, the state is probed in the background
+		self.motionControl = None
+		self.streamingStateProbe = None
+		if self.isMotionControlStreaming():
+			self.motionControl = MotionControlClient(self.streamingSettings)
+			self.streamingStateProbe = CachedProbe(self.motionControl.isActive, self.streamingSettings["stateProbeInterval"], False, debugMode)
+			self.weAreCurrentlyStreaming = False
+		else:
+			self.weAreCurrentlyStreaming = self.checkIfStreamingAppActuallyRunning()
+
+		# The motion stream snapshots and the viewers passed through to the motion stream
+		self.motionSnapshotReader = None
+		self.motionStreamProxy = None
+		if not self.isInProcessStreaming():
+			self.motionSnapshotReader = MjpegSnapshotReader(self.streamingSettings["motionStreamUrl"], self.streamingSettings["snapshotTimeout"])
+			self.motionStreamProxy = MjpegStreamProxy(self.streamingSettings["motionStreamUrl"], self.streamingSettings["proxyTimeout"])
+
+		# The stream is stopped after being watched by nobody for a while
+		self.streamingLock = threading.RLock()
+		self.streamingStartedAt = None
+		self.lastWatchedAt = None
+		self.idleWatchdogThread = None
+		self.idleWatchdogStopper = threading.Event()
+
+		# Streaming already at the start up
+		if self.isCameraHeldByStreamingApp():
+			self.handCameraToStream(True)
 		
 	"""
 	Starts the stream
 	"""
 	def startStreaming(self): 
+		with self.streamingLock:
+			self.startStreamingService()
+			self.streamingStartedAt = time.time()
+			self.lastWatchedAt = self.streamingStartedAt
+		self.startIdleWatchdog()
+
+	"""
+	Starts the streaming service of the mode
+	"""
+	def startStreamingService(self):
 		super().captureStart()
 		self.weAreCurrentlyStreaming = True
-		#sh.uv4l("-nopreview", "--auto-video_nr", "--driver", "raspicam", "--encoding", "mjpeg", "--width", "640", "--height", "480", "--framerate", "20", "--hflip=yes", "--vflip=yes", "--bitrate=2000000", "--server-option", "'--port=9090'", "--server-option", "'--max-queued-connections=30'", "--server-option", "'--max-streams=25'", "--server-option", "'--max-threads=29'")
-		sh.sudo("service", "motion", "start")
+		if self.isInProcessStreaming():
+			# The stream captures through the same capture engine, the background capturing pauses meanwhile
+			self.handCameraToStream(False)
+			self.frameBroadcaster.start()
+		elif self.isMotionControlStreaming():
+			self.motionControl.resume()
+			self.streamingStateProbe.set(True)
+		else:
+			# Motion needs the camera, the capture engine lets go of it first
+			self.handCameraToStream(True)
+			#sh.uv4l("-nopreview", "--auto-video_nr", "--driver", "raspicam", "--encoding", "mjpeg", "--width", "640", "--height", "480", "--framerate", "20", "--hflip=yes", "--vflip=yes", "--bitrate=2000000", "--server-option", "'--port=9090'", "--server-option", "'--max-queued-connections=30'", "--server-option", "'--max-streams=25'", "--server-option", "'--max-threads=29'")
+			try:
+				sh.sudo("service", "motion", "start")
+			except Exception as e:
+				self.weAreCurrentlyStreaming = False
+				self.handCameraBack()
+				raise e
 
 
 	"""
 	Stops the stream
 	"""
 	def stopStreaming(self):
-		sh.sudo("service", "motion", "stop")
-		super().captureStop()
-		self.weAreCurrentlyStreaming = False
+		with self.streamingLock:
+			if self.isInProcessStreaming():
+				self.frameBroadcaster.stop()
+				self.handCameraBack()
+			elif self.isMotionControlStreaming():
+				self.motionControl.pause()
+				self.streamingStateProbe.set(False)
+				self.motionStreamProxy.closeViewers()
+			else:
+				sh.sudo("service", "motion", "stop")
+				self.motionStreamProxy.closeViewers()
+				self.handCameraBack()
+			# Not started by us when streaming already at the start up
+			if self.times["captureStartTime"] is not None:
+				super().captureStop()
+			self.weAreCurrentlyStreaming = False
+			self.streamingStartedAt = None
+
+	"""
+	Hands the camera over to the streaming app
+
+	@param (bool) stopCaptureEngine, the streaming app is another process
+	"""
+	def handCameraToStream(self, stopCaptureEngine):
+		if self.releaseCameraHandler is not None:
+			self.releaseCameraHandler(stopCaptureEngine)
+
+	"""
+	Gives the camera back from the streaming app
+	"""
+	def handCameraBack(self):
+		if self.reclaimCameraHandler is not None:
+			self.reclaimCameraHandler()
+
+	"""
+	Checks if the camera is held by a streaming app process, the stills can only be taken from its stream then,
+	the resident motion holds it also while not streaming
+
+	@return (bool)
+	"""
+	def isCameraHeldByStreamingApp(self):
+		if self.isInProcessStreaming():
+			return False
+		if self.isMotionControlStreaming():
+			return True
+		return self.weAreCurrentlyStreaming
+
+	"""
+	Gets the amount of the stream viewers, the in-process stream viewers or the viewers passed through to the motion stream
+
+	@return (int)
+	"""
+	def getViewersCount(self):
+		if self.isInProcessStreaming():
+			return self.frameBroadcaster.getViewersCount()
+		return self.motionStreamProxy.getViewersCount()
+
+	"""
+	Gets how long the stream has been up
+
+	@return (float|None) seconds, None if not streaming
+	"""
+	def getUptimeSeconds(self):
+		if not self.areWeCurrentlyStreaming():
+			self.streamingStartedAt = None
+			return None
+		if self.streamingStartedAt is None:
+			# Started by someone else, eg. streaming already when we started up
+			self.streamingStartedAt = time.time()
+		return time.time() - self.streamingStartedAt
+
+	"""
+	Gets how long the stream has been watched by nobody
+
+	@return (float|None) seconds, None if not streaming
+	"""
+	def getIdleSeconds(self):
+		if not self.areWeCurrentlyStreaming():
+			self.lastWatchedAt = None
+			return None
+		if self.lastWatchedAt is None or self.getViewersCount() > 0:
+			self.lastWatchedAt = time.time()
+		return time.time() - self.lastWatchedAt
+
+	"""
+	Stops the stream if watched by nobody for the idle shutdown period
+
+	@return (bool) stopped
+	"""
+	def stopStreamingIfIdle(self):
+		idleShutdownSeconds = self.streamingSettings["idleShutdownSeconds"]
+		if not idleShutdownSeconds:
+			return False
+		with self.streamingLock:
+			idleSeconds = self.getIdleSeconds()
+			if idleSeconds is None or idleSeconds < idleShutdownSeconds:
+				return False
+			if self.debugMode:
+				print("Nobody has watched the stream for "+str(int(idleSeconds))+" seconds, stopping the stream")
+			self.stopStreaming()
+			return True
+
+	"""
+	Starts the idle watchdog, if enabled and not yet running
+	"""
+	def startIdleWatchdog(self):
+		if not self.streamingSettings["idleShutdownSeconds"]:
+			return
+		if self.idleWatchdogThread is not None and self.idleWatchdogThread.is_alive():
+			return
+		self.idleWatchdogStopper.clear()
+		self.idleWatchdogThread = threading.Thread(target=self.runIdleWatchdog, name="CameraStreamerIdleWatchdog", daemon=True)
+		self.idleWatchdogThread.start()
+
+	"""
+	Stops the idle watchdog
+	"""
+	def stopIdleWatchdog(self):
+		self.idleWatchdogStopper.set()
+		if self.idleWatchdogThread is not None:
+			self.idleWatchdogThread.join()
+			self.idleWatchdogThread = None
+
+	"""
+	The idle watchdog loop
+	"""
+	def runIdleWatchdog(self):
+		while not self.idleWatchdogStopper.wait(self.streamingSettings["idleCheckInterval"]):
+			try:
+				self.stopStreamingIfIdle()
+			except Exception as e:
+				if self.debugMode:
+					print("Stopping the idle stream failed: "+str(e))
 
 	"""
 	Gets the streaming address
@@ -58,19 +289,106 @@ class CameraStreamer(Camera):
 	@return (bool)
 	"""
 	def areWeCurrentlyStreaming(self):
+		if self.isMotionControlStreaming():
+			return self.streamingStateProbe.get()
 		return self.weAreCurrentlyStreaming
 
+	"""
+	Checks if the stream is served by the device app itself
+
+	@return (bool)
+	"""
+	def isInProcessStreaming(self):
+		return self.streamingSettings["mode"] == "inProcess"
+
+	"""
+	Checks if the resident motion is controlled over http
+
+	@return (bool)
+	"""
+	def isMotionControlStreaming(self):
+		return self.streamingSettings["mode"] == "motionControl"
+
+	"""
+	Checks if snapshots can be taken from the stream while streaming
+
+	@return (bool)
+	"""
+	def canServeSnapshots(self):
+		return self.streamingSettings["snapshotsWhileStreaming"]
+
+	"""
+	Gets a frame of the running stream, without opening the camera, always of the resident motion stream
+
+	@return (bytes|None) frame, None if not available
+	"""
+	def getSnapshotFrame(self):
+		if self.isInProcessStreaming():
+			if not self.canServeSnapshots() or not self.areWeCurrentlyStreaming():
+				return None
+			return self.frameBroadcaster.getNewestFrame(self.streamingSettings["snapshotMaxAgeSeconds"])
+		if not self.isCameraHeldByStreamingApp():
+			return None
+		if not self.canServeSnapshots() and not self.isMotionControlStreaming():
+			return None
+		try:
+			return self.motionSnapshotReader.readFrame()
+		except Exception as e:
+			if self.debugMode:
+				print("Stream snapshot failed: "+str(e))
+			return None
+
 	"""
 	Checks if the streaming app is currently up
 
 	@return (bool)
 	"""
 	def checkIfStreamingAppActuallyRunning(self):
-		import subprocess
+		if self.isInProcessStreaming():
+			return self.frameBroadcaster.isRunning()
+		if self.isMotionControlStreaming():
+			return self.streamingStateProbe.refresh()
+		return isProcessRunning("motion")
 
-		p = subprocess.Popen(["ps", "-a"], stdout=subprocess.PIPE)
-		out, err = p.communicate()
-		if ('motion' in str(out)):
-			return True
-		return False
-		
\ No newline at end of file
+	"""
+	Gets the stream status
+
+	@return (dict) {mode, streaming, viewers, uptimeSeconds, idleSeconds, ..}
+	"""
+	def getStreamingStatus(self):
+		uptimeSeconds = self.getUptimeSeconds()
+		idleSeconds = self.getIdleSeconds()
+		streamingStatus = {
+			"mode": self.streamingSettings["mode"],
+			"streaming": self.areWeCurrentlyStreaming(),
+			"viewers": self.getViewersCount(),
+			"uptimeSeconds": None if uptimeSeconds is None else round(uptimeSeconds),
+			"idleSeconds": None if idleSeconds is None else round(idleSeconds),
+		}
+		if self.isInProcessStreaming():
+			streamingStatus.update(self.frameBroadcaster.getStatus())
+		elif self.isMotionControlStreaming():
+			stateAge = self.streamingStateProbe.getAge()
+			streamingStatus["stateAgeSeconds"] = None if stateAge is None else round(stateAge, 1)
+			streamingStatus["stateProbeError"] = self.streamingStateProbe.lastError
+		return streamingStatus
+
+	"""
+	Starts the background services, eg. the streaming state probe and the idle watchdog
+	"""
+	def startBackgroundServices(self):
+		if self.streamingStateProbe is not None:
+			self.streamingStateProbe.start()
+		self.startIdleWatchdog()
+
+	"""
+	Sets debug mode
+	
+	@param (bool) debugMode
+	"""
+	def setDebugMode(self, debugMode):
+		super().setDebugMode(debugMode)
+		if self.frameBroadcaster is not None:
+			self.frameBroadcaster.setDebugMode(debugMode)
+		if self.streamingStateProbe is not None:
+			self.streamingStateProbe.setDebugMode(debugMode)
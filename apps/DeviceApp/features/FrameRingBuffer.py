@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+import time
+from collections import deque
+
+"""
+Bounded in-memory buffer of the last captured JPEG frames, the oldest frame drops out first
+"""
+class FrameRingBuffer():
+
+	"""
+	Constructor
+
+	@param (int) size, max amount of frames kept
+	"""
+	def __init__(self, size):
+		self.frames = deque(maxlen=max(1, int(size)))
+		self.lock = threading.Lock()
+
+	"""
+	Adds a frame
+
+	@param (bytes) frame
+	@param (float) capturedAt = None, unix timestamp
+	"""
+	def push(self, frame, capturedAt = None):
+		if capturedAt is None:
+			capturedAt = time.time()
+		with self.lock:
+			self.frames.append((capturedAt, frame))
+
+	"""
+	Gets the newest frame with its capture time
+
+	@return (tuple|None) (capturedAt, frame)
+	"""
+	def getNewest(self):
+		with self.lock:
+			if len(self.frames) == 0:
+				return None
+			return self.frames[-1]
+
+	"""
+	Gets the newest frame if it's younger than the max age
+
+	@param (float) maxAgeInSeconds
+	@return (bytes|None) frame
+	"""
+	def getNewestFrame(self, maxAgeInSeconds):
+		newest = self.getNewest()
+		if newest is None:
+			return None
+		capturedAt, frame = newest
+		if time.time() - capturedAt > maxAgeInSeconds:
+			return None
+		return frame
+
+	"""
+	Gets the amount of buffered frames
+
+	@return (int)
+	"""
+	def getSize(self):
+		with self.lock:
+			return len(self.frames)
+
+	"""
+	Empties the buffer
+	"""
+	def clear(self):
+		with self.lock:
+			self.frames.clear()
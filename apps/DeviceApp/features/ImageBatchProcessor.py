@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import json
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+"""
+Runs the image filter chain and the coffee situation resolver over a directory or an archive of images,
+eg. to re-blur the stored photos when the privacy polygons change
+
+The images are spread over a process pool sized to the cores, a bounded amount of them in flight at a time,
+the results are streamed to a JSONL file as they complete
+"""
+class ImageBatchProcessor():
+
+	"""
+	Image files processed
+
+	@var (tuple) imageFileExtensions
+	"""
+	imageFileExtensions = (".jpg", ".jpeg", ".png")
+
+	"""
+	The pipeline of a worker process, set up by the initWorker
+
+	@var (dict) workerPipeline
+	"""
+	workerPipeline = None
+
+	"""
+	Constructor
+
+	@param (dict) options, {filters, resolve, appSettings, outputPath, jpegQuality, workers, tasksPerWorker}
+	"""
+	def __init__(self, options):
+		self.options = options
+		self.workersCount = options.get("workers") or os.cpu_count() or 1
+		self.maxTasksInFlight = self.workersCount * options.get("tasksPerWorker", 4)
+
+	"""
+	Processes the images of a directory or an archive, writes the results as JSON lines
+
+	@param (string) inputPath, a directory, a tar archive or a zip archive
+	@param (FileObj) resultsFile, text stream
+	@return (dict) {images, failed, seconds}
+	"""
+	def run(self, inputPath, resultsFile):
+		startTime = time.perf_counter()
+		summary = {"images": 0, "failed": 0}
+
+		def writeResult(future):
+			result = future.result()
+			resultsFile.write(json.dumps(result)+"\n")
+			summary["images"] += 1
+			if "error" in result:
+				summary["failed"] += 1
+
+		with ProcessPoolExecutor(self.workersCount, initializer=ImageBatchProcessor.initWorker, initargs=(self.options,)) as executor:
+			futuresInFlight = set()
+			for task in self.iterateTasks(inputPath):
+				if len(futuresInFlight) >= self.maxTasksInFlight:
+					doneFutures, futuresInFlight = wait(futuresInFlight, return_when=FIRST_COMPLETED)
+					for future in doneFutures:
+						writeResult(future)
+				futuresInFlight.add(executor.submit(ImageBatchProcessor.processTask, task))
+
+			for future in wait(futuresInFlight).done:
+				writeResult(future)
+
+		summary["seconds"] = round(time.perf_counter() - startTime, 3)
+		return summary
+
+	"""
+	Lists the image tasks lazily, the directory images are read by the workers, the archived images by us one at a time
+
+	@param (string) inputPath
+	@return (generator) {name, path} or {name, data}
+	"""
+	def iterateTasks(self, inputPath):
+		if os.path.isdir(inputPath):
+			for directoryPath, directoryNames, fileNames in os.walk(inputPath):
+				directoryNames.sort()
+				for fileName in sorted(fileNames):
+					if fileName.lower().endswith(self.imageFileExtensions):
+						imagePath = os.path.join(directoryPath, fileName)
+						yield {"name": os.path.relpath(imagePath, inputPath), "path": imagePath}
+
+		elif zipfile.is_zipfile(inputPath):
+			with zipfile.ZipFile(inputPath) as archive:
+				for member in archive.infolist():
+					if not member.is_dir() and member.filename.lower().endswith(self.imageFileExtensions):
+						yield {"name": member.filename, "data": archive.read(member)}
+
+		elif tarfile.is_tarfile(inputPath):
+			# Streamed, the members are read in the archive order
+			with tarfile.open(inputPath, "r|*") as archive:
+				for member in archive:
+					if member.isfile() and member.name.lower().endswith(self.imageFileExtensions):
+						yield {"name": member.name, "data": archive.extractfile(member).read()}
+		else:
+			raise Exception("ImageBatchProcessor: not a directory or an archive: "+inputPath)
+
+	"""
+	Reads the images one at a time, the undecodable ones are skipped
+
+	@param (string) inputPath, a directory, a tar archive or a zip archive
+	@return (generator) numpy.ndarray images
+	"""
+	def iterateImages(self, inputPath):
+		import cv2
+		import numpy as np
+
+		for task in self.iterateTasks(inputPath):
+			if "path" in task:
+				cvImage = cv2.imread(task["path"], cv2.IMREAD_COLOR)
+			else:
+				cvImage = cv2.imdecode(np.frombuffer(task["data"], dtype=np.uint8), cv2.IMREAD_COLOR)
+			if cvImage is not None:
+				yield cvImage
+
+	"""
+	Sets up the pipeline of a worker process
+
+	@param (dict) options
+	"""
+	@staticmethod
+	def initWorker(options):
+		from apps.utils.images.filters.ImageFilterChain import ImageFilterChain
+		from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+
+		appSettings = dict(options.get("appSettings") or {})
+		appSettings["CoffeeSituationResolverEnabled"] = bool(options.get("resolve"))
+
+		ImageBatchProcessor.workerPipeline = {
+			"options": options,
+			"imageFilterChain": ImageFilterChain(options["filters"], appSettings) if options.get("filters") else None,
+			"coffeeSituationResolver": CoffeeSituationResolver(appSettings),
+		}
+
+	"""
+	Gets the output path of an image, the image names of an archive may try to escape the output directory
+
+	@param (string) outputDirectory
+	@param (string) imageName, relative to the output directory
+	@return (string) outputPath
+	"""
+	@staticmethod
+	def getOutputPath(outputDirectory, imageName):
+		normalizedName = os.path.normpath(imageName)
+		if os.path.isabs(normalizedName) or os.pardir in normalizedName.split(os.sep):
+			raise Exception("not writing outside the output directory: "+imageName)
+		outputPath = os.path.join(outputDirectory, normalizedName)
+
+		# A symlink in the output directory may point out of it
+		realOutputDirectory = os.path.realpath(outputDirectory)
+		if not os.path.realpath(outputPath).startswith(realOutputDirectory + os.sep):
+			raise Exception("not writing outside the output directory: "+imageName)
+		return outputPath
+
+	"""
+	Processes an image in a worker process
+
+	@param (dict) task, {name, path} or {name, data}
+	@return (dict) result, {name, width, height, filterTimes, resolveTime, hasCoffeeMsg, coffeeLevel, outputPath} or {name, error}
+	"""
+	@staticmethod
+	def processTask(task):
+		import cv2
+		import numpy as np
+
+		pipeline = ImageBatchProcessor.workerPipeline
+		options = pipeline["options"]
+		result = {"name": task["name"]}
+
+		try:
+			if "path" in task:
+				cvImage = cv2.imread(task["path"], cv2.IMREAD_COLOR)
+			else:
+				cvImage = cv2.imdecode(np.frombuffer(task["data"], dtype=np.uint8), cv2.IMREAD_COLOR)
+			if cvImage is None:
+				raise Exception("could not decode the image")
+			result["width"] = cvImage.shape[1]
+			result["height"] = cvImage.shape[0]
+
+			# Resolve from the unblurred image
+			if pipeline["coffeeSituationResolver"].isEnabled():
+				startTime = time.perf_counter()
+				result["hasCoffeeMsg"] = pipeline["coffeeSituationResolver"].resolveCoffeeSituationFromImage(cvImage)
+				result["coffeeLevel"] = pipeline["coffeeSituationResolver"].getCoffeeLevel()
+				result["resolveTime"] = round((time.perf_counter() - startTime) * 1000, 3)
+
+			# Blur, in place, the photos are unrelated, eg. a face tracked on the previous photo is not blurred on this one
+			if pipeline["imageFilterChain"] is not None:
+				pipeline["imageFilterChain"].resetTracking()
+				cvImage, filterTimes = pipeline["imageFilterChain"].blurImageDataWithTimes(cvImage)
+				result["filterTimes"] = {filterName: round(seconds * 1000, 3) for filterName, seconds in filterTimes.items()}
+
+			# Store
+			if options.get("outputPath"):
+				outputPath = ImageBatchProcessor.getOutputPath(options["outputPath"], task["name"])
+				os.makedirs(os.path.dirname(outputPath), exist_ok=True)
+				writeParams = []
+				if outputPath.lower().endswith((".jpg", ".jpeg")):
+					writeParams = [cv2.IMWRITE_JPEG_QUALITY, options.get("jpegQuality", 85)]
+				if not cv2.imwrite(outputPath, cvImage, writeParams):
+					raise Exception("could not write "+outputPath)
+				result["outputPath"] = outputPath
+
+		except Exception as e:
+			result["error"] = str(e)
+		return result
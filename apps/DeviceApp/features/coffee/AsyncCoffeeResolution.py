@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import collections
+import queue
+import secrets
+import threading
+import time
+
+from apps.utils.Utils import getSettingsGroup
+
+"""
+Resolves the coffee situations of the stored photos in the background, the coffee question is answered
+with the photo right away and the verdict is delivered later, to the callbacks or by the observation id
+
+The resolutions run one at a time in the order of the photos, the coffee level tracker follows them in order
+"""
+class AsyncCoffeeResolution():
+
+	"""
+	The coffee message while resolving
+
+	@var (string) pendingCoffeeMsg
+	"""
+	pendingCoffeeMsg = "Resolving the coffee situation"
+
+	"""
+	Default settings
+
+	@var (dict) defaultSettings
+	"""
+	defaultSettings = {
+		"enabled": False,
+		"queueSize": 4,
+		"keepResultsSeconds": 900,
+		"maxResults": 100,
+		"followUpNotifications": True,
+	}
+
+	"""
+	Constructor
+
+	@param (CoffeeSituationResolver) coffeeSituationResolver
+	@param (dict) appSettings = None, {asyncResolution}
+	@param (LatencyStats) latencyStats = None, records the resolve stage
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, coffeeSituationResolver, appSettings = None, latencyStats = None, debugMode = False):
+		self.coffeeSituationResolver = coffeeSituationResolver
+		self.settings = getSettingsGroup(appSettings, "asyncResolution", self.defaultSettings)
+		self.latencyStats = latencyStats
+		self.debugMode = debugMode
+
+		self.lock = threading.Lock()
+		self.resolutionQueue = queue.Queue(self.settings["queueSize"])
+		self.results = collections.OrderedDict()
+		self.callbacks = {}
+		self.workerThread = None
+		self.workerStopper = threading.Event()
+
+	"""
+	Checks if the feat is enabled
+
+	@return (bool)
+	"""
+	def isEnabled(self):
+		return self.settings["enabled"]
+
+	"""
+	Checks if the verdicts should be sent as follow up notifications
+
+	@return (bool)
+	"""
+	def shouldSendFollowUpNotifications(self):
+		return self.isEnabled() and self.settings["followUpNotifications"]
+
+	"""
+	Queues a photo for resolving
+
+	@param (numpy.ndarray) cvImage, not modified afterwards
+	@param (FrameViews) frameViews = None, the shared views of the image if any, held until resolved
+	@return (string|None) observationId, None if the queue is full
+	"""
+	def submit(self, cvImage, frameViews = None):
+		self.start()
+		observationId = secrets.token_hex(8)
+		with self.lock:
+			self.pruneResults()
+			self.results[observationId] = {
+				"observationId": observationId,
+				"resolved": False,
+				"hasCoffeeMsg": self.pendingCoffeeMsg,
+				"coffeeLevel": None,
+				"createdAt": time.time(),
+				"resolvedAt": None,
+			}
+		try:
+			self.resolutionQueue.put_nowait((observationId, cvImage, frameViews))
+		except queue.Full:
+			with self.lock:
+				del self.results[observationId]
+			return None
+		return observationId
+
+	"""
+	Gets the resolution result
+
+	@param (string) observationId
+	@return (dict|None) {observationId, resolved, hasCoffeeMsg, coffeeLevel, createdAt, resolvedAt, error}, None if not known
+	"""
+	def getResult(self, observationId):
+		with self.lock:
+			result = self.results.get(observationId)
+			return None if result is None else result.copy()
+
+	"""
+	Calls back with the result when resolved, right away if already resolved
+
+	@param (string) observationId
+	@param (callable) callback, called with the result
+	"""
+	def onResolved(self, observationId, callback):
+		with self.lock:
+			result = self.results.get(observationId)
+			if result is None:
+				return
+			if not result["resolved"]:
+				self.callbacks.setdefault(observationId, []).append(callback)
+				return
+			result = result.copy()
+		self.runCallback(callback, result)
+
+	"""
+	Starts the worker, if not yet running
+	"""
+	def start(self):
+		if self.workerThread is not None and self.workerThread.is_alive():
+			return
+		self.workerStopper.clear()
+		self.workerThread = threading.Thread(target=self.runWorker, name="AsyncCoffeeResolution", daemon=True)
+		self.workerThread.start()
+
+	"""
+	Stops the worker, the queued photos are left unresolved
+	"""
+	def stop(self):
+		self.workerStopper.set()
+		if self.workerThread is not None:
+			self.workerThread.join()
+			self.workerThread = None
+
+	"""
+	The worker loop
+	"""
+	def runWorker(self):
+		while not self.workerStopper.is_set():
+			try:
+				observationId, cvImage, frameViews = self.resolutionQueue.get(timeout=1)
+			except queue.Empty:
+				continue
+
+			resolution = {"resolved": True}
+			try:
+				startTime = time.perf_counter()
+				resolution["hasCoffeeMsg"], resolution["coffeeLevel"] = self.coffeeSituationResolver.resolveCoffeeVerdictFromImage(cvImage, frameViews)
+				if self.latencyStats is not None:
+					self.latencyStats.record("resolve", time.perf_counter() - startTime)
+			except Exception as e:
+				if self.debugMode:
+					print("Coffee situation resolving failed: "+str(e))
+				resolution["hasCoffeeMsg"] = "Not recognized"
+				resolution["error"] = str(e)
+			resolution["resolvedAt"] = time.time()
+
+			with self.lock:
+				result = self.results.get(observationId)
+				callbacks = self.callbacks.pop(observationId, [])
+				if result is None:
+					continue
+				result.update(resolution)
+				result = result.copy()
+			for callback in callbacks:
+				self.runCallback(callback, result)
+
+	"""
+	Runs a callback, a failing one does not stop the worker
+
+	@param (callable) callback
+	@param (dict) result
+	"""
+	def runCallback(self, callback, result):
+		try:
+			callback(result)
+		except Exception as e:
+			if self.debugMode:
+				print("Coffee situation callback failed: "+str(e))
+
+	"""
+	Drops the old results, the oldest first, called locked
+	"""
+	def pruneResults(self):
+		expiredAt = time.time() - self.settings["keepResultsSeconds"]
+		while len(self.results) > 0:
+			observationId, result = next(iter(self.results.items()))
+			if len(self.results) < self.settings["maxResults"] and result["createdAt"] >= expiredAt:
+				break
+			del self.results[observationId]
+			self.callbacks.pop(observationId, None)
+
+	"""
+	Gets the status
+
+	@return (dict) {enabled, queued, results}
+	"""
+	def getStatus(self):
+		return {
+			"enabled": self.isEnabled(),
+			"queued": self.resolutionQueue.qsize(),
+			"results": len(self.results),
+		}
+
+	"""
+	Sets debug mode
+
+	@param (bool) debugMode
+	"""
+	def setDebugMode(self, debugMode):
+		self.debugMode = debugMode
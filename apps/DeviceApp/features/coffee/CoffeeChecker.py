@@ -2,14 +2,36 @@
 """
 @author lsipii
 """
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.DeviceApp.features.coffee.AsyncCoffeeResolution import AsyncCoffeeResolution
+from apps.DeviceApp.features.coffee.CoffeeObservation import CoffeeObservation
 from apps.DeviceApp.features.coffee.CoffeeActionAccessChecker import CoffeeActionAccessChecker
 from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+from apps.DeviceApp.features.coffee.ObservationScheduler import ObservationScheduler
 from apps.DeviceApp.features.CameraShooter import CameraShooter
 from apps.DeviceApp.features.CameraStreamer import CameraStreamer
 from apps.DeviceApp.hardware.storage.MediaStorageFactory import MediaStorageFactory
+from apps.utils.SingleFlight import SingleFlight
+from apps.utils.LatencyStats import LatencyStats
+from apps.utils.Utils import getSettingsGroup
+from apps.utils.images.PerceptualHash import hammingDistance
+from apps.utils.images.filters.ImageFilterChain import ImageFilterChain
 
 class CoffeeChecker():
 
+	"""
+	Default change detection settings
+
+	@var (dict) defaultChangeDetectionSettings
+	"""
+	defaultChangeDetectionSettings = {
+		"enabled": False,
+		"maxHammingDistance": 4,
+		"maxReuseSeconds": 600,
+	}
+
 	"""
 	Module initialization
 
@@ -17,16 +39,39 @@ class CoffeeChecker():
 	@param (bool) debugMode
 	"""
 	def __init__(self, configs, debugMode = False):
+		self.debugMode = debugMode
 		self.storage = MediaStorageFactory.getInstance(configs)
-		self.cameraShooter = CameraShooter(self.storage, debugMode)
-		self.cameraStreamer = CameraStreamer(configs["app"])
+		self.latencyStats = LatencyStats(configs["app"]["settings"])
+		self.cameraShooter = CameraShooter(self.storage, debugMode, configs["app"]["settings"])
+		self.cameraStreamer = CameraStreamer(configs["app"], self.cameraShooter.captureFrame, debugMode, self.cameraShooter.releaseCamera, self.cameraShooter.reclaimCamera)
 		self.coffeeActionAccessChecker = CoffeeActionAccessChecker(configs["coffeeAccess"])
 		self.coffeeSituationResolver = CoffeeSituationResolver(configs["app"]["settings"])
 		self.initImageBlurrer(configs["app"]["settings"])
 
+		# The blur runs alongside the resolving, both from the captured frame
+		self.stageExecutor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="CoffeeStages")
+
+		# The coffee situation resolved after answering with the photo, if the feat enabled
+		self.asyncResolution = AsyncCoffeeResolution(self.coffeeSituationResolver, configs["app"]["settings"], self.latencyStats, debugMode)
+		self.observationsHost = configs["app"]["host"]
+
+		# Concurrent coffee questions share the observation in flight
+		self.observationFlight = SingleFlight()
+
+		# The previous stored observation, reused while the coffee corner looks the same
+		self.changeDetectionSettings = getSettingsGroup(configs["app"]["settings"], "changeDetection", self.defaultChangeDetectionSettings)
+		self.previousStoredObservation = None
+
+		# Observations ahead of the questions, by the learned demand
+		self.observationScheduler = ObservationScheduler(self.runScheduledObservation, configs["app"]["settings"], debugMode)
+		self.latestObservation = None
+
+		# The photo of the latest answer, kept until a newer one is answered with
+		self.servedPhotoFilename = None
+
 
 	"""
-	Setups the image blurrer
+	Setups the image blurrer, a filter name or an ordered list of them run as a chain on the decoded photo
 
 	@param (dict) appSettings
 	"""
@@ -36,12 +81,9 @@ class CoffeeChecker():
 
 		if "imageBlurrerFilter" in appSettings and appSettings['imageBlurrerFilter']:
 			try:
-				blurrerName = "apps.utils.images.filters."+appSettings['imageBlurrerFilter']
-			
-				from apps.utils.Utils import getModulePathInstance
-				self.imageBlurrer = getModulePathInstance(blurrerName)
+				self.imageBlurrer = ImageFilterChain(appSettings['imageBlurrerFilter'], appSettings, self.latencyStats)
 			except Exception as e:
-				print("Failed to load image blurrer module")
+				print("Failed to load image blurrer module: "+str(e))
 
 	"""
 	Checks if we have coffe
@@ -56,44 +98,283 @@ class CoffeeChecker():
 
 		# Check for mode change requests
 		self.checkForModeChangeRequests(requestParams)
+		self.observationScheduler.recordRequest()
 
-		# Get coffee data from selected service
-		if self.areWeCurrentlyStreaming():
-			coffeeObservationUrl = self.cameraStreamer.getStreamUrl()
+		with self.latencyStats.measure("observation"):
+			latestObservation = self.latestObservation
+			if latestObservation is not None and not self.areWeCurrentlyStreaming() and self.observationScheduler.isServeable(latestObservation["observedAt"]):
+				# Served from the latest scheduled observation
+				servedObservation = latestObservation
+			else:
+				# Observe, or join the observation already in progress
+				servedObservation = self.observationFlight.do("coffeeObservation", self.runObservation)
+		self.servedPhotoFilename = servedObservation["photoFilename"]
+		return self.attachResolution(servedObservation["coffeeObservation"].copy())
+
+	"""
+	Runs an observation by the scheduler, skipped while streaming
+	"""
+	def runScheduledObservation(self):
+		if not self.areWeCurrentlyStreaming():
+			self.observationFlight.do("coffeeObservation", self.runObservation)
+
+	"""
+	Runs an observation, keeps books for the scheduler
+
+	@return (dict) observation, {coffeeObservation, observedAt, photoFilename}
+	"""
+	def runObservation(self):
+		startTime = time.perf_counter()
+		coffeeObservation = self.observeCoffeeSituation()
+		self.observationScheduler.recordObservation(time.perf_counter() - startTime)
+		observation = {
+			"coffeeObservation": coffeeObservation,
+			"observedAt": time.time(),
+			"photoFilename": self.storage.getMediaFilename(),
+		}
+		if not coffeeObservation["streaming"]:
+			self.latestObservation = observation
+		return observation
+
+	"""
+	Starts the background services, eg. the observation scheduler
+	"""
+	def startBackgroundServices(self):
+		self.cameraShooter.startBackgroundServices()
+		self.observationScheduler.start()
+		self.cameraStreamer.startBackgroundServices()
+		if self.asyncResolution.isEnabled():
+			self.asyncResolution.start()
+
+	"""
+	Observes the coffee situation
+	
+	@return (dict) {
+		(string) hasCoffee
+		(string) coffeeObservationImageUrl
+	}
+	"""
+	def observeCoffeeSituation(self):
+
+		# Take the photo, kept in memory through the stages, while streaming a snapshot of the stream
+		coffeeObservation = None
+		coffeeVerdict = None
+		if not self.areWeCurrentlyStreaming() or self.cameraStreamer.canServeSnapshots():
+			coffeeObservation = self.captureObservation()
+
+		if coffeeObservation is None:
+			coffeeObservationUrl = None
 		else:
-			# Take the photo
-			self.cameraShooter.takeAPhoto() 
+			# Nothing changed, reuse the previous results
+			previousStoredObservation = self.getReusablePreviousObservation(coffeeObservation)
+			if previousStoredObservation is not None:
+				if self.debugMode:
+					print("No changes in the coffee situation, reusing the previous observation")
+				return self.getCoffeeSituation(previousStoredObservation["hasCoffeeMsg"], previousStoredObservation["coffeeObservationUrl"], previousStoredObservation["coffeeLevel"], previousStoredObservation["observationId"])
+
+			# The resolver reads the unblurred frame, only the blurred one is stored, the stages share the views of the frame
+			capturedImage = coffeeObservation.getImage()
+			frameViews = coffeeObservation.getFrameViews()
 
-			# Blur the photo, if the feat enabled
+			# Blur a copy of the photo on the pool, if the feat enabled, the filters blur in place
+			blurring = None
 			if self.weHaveAnImageBlurrer(): 
-				self.imageBlurrer.blurImage(self.storage.getTemprorayMediaFilePath())
+				blurring = self.stageExecutor.submit(self.blurImage, capturedImage.copy(), frameViews)
+
+			# Resolve the situation meanwhile if resolving enabled, in the background after storing the photo if so configured
+			resolveInBackground = self.coffeeSituationResolver.isEnabled() and self.asyncResolution.isEnabled()
+			if self.coffeeSituationResolver.isEnabled() and not resolveInBackground:
+				coffeeVerdict = self.resolveCoffeeSituation(capturedImage, frameViews)
+
+			if blurring is not None:
+				coffeeObservation.setImage(blurring.result())
 
-			# Resolve the situation if resolving enabled
-			if self.coffeeSituationResolver.isEnabled():
-				self.coffeeSituationResolver.resolveCoffeeSituation(self.storage.getTemprorayMediaFilePath())
-			
 			# Store the photo
-			self.storage.saveImageFile()
+			with self.latencyStats.measure("store"):
+				self.storage.clearPreviousMediaFiles(self.getKeptPhotoFilenames())
+				self.storage.setupMediaFilename()
+				self.storage.saveImageData(coffeeObservation.getEncodedFrame())
 
 			# Grap the photo url
 			coffeeObservationUrl = self.cameraShooter.getPhotoStorageUrl()
 
+			# The captured image is not touched, resolved as is, here if the queue is full
+			observationId = None
+			if resolveInBackground:
+				observationId = self.asyncResolution.submit(capturedImage, frameViews)
+				if observationId is None:
+					coffeeVerdict = self.resolveCoffeeSituation(capturedImage, frameViews)
+				else:
+					coffeeVerdict = (self.asyncResolution.pendingCoffeeMsg, None)
+
+			# The verdict of this photo, the latest one if not resolved
+			if coffeeVerdict is None:
+				coffeeVerdict = self.coffeeSituationResolver.getCoffeeVerdict()
+			self.rememberStoredObservation(coffeeObservation, coffeeObservationUrl, coffeeVerdict, observationId)
+			coffeeObservation.releaseFrameViews()
+			return self.getCoffeeSituation(coffeeVerdict[0], coffeeObservationUrl, coffeeVerdict[1], observationId)
+
 		# Coffee situation message
+		hasCoffeeMsg, coffeeLevel = self.coffeeSituationResolver.getCoffeeVerdict()
+		return self.getCoffeeSituation(hasCoffeeMsg, coffeeObservationUrl, coffeeLevel)
 
-		return {
-			"hasCoffeeMsg": self.coffeeSituationResolver.getCanWeHasCoffeeMsg(),
-			"coffeeObservationUrl": coffeeObservationUrl,
-			"streaming": self.areWeCurrentlyStreaming(),
-		}
+	"""
+	Gets the photos not cleared before storing a new one: the photo of the latest answer, even if observed
+	in the background since, and the latest observation photo, which may be answered with meanwhile
+
+	@return (list) photoFilenames
+	"""
+	def getKeptPhotoFilenames(self):
+		photoFilenames = [self.servedPhotoFilename]
+		latestObservation = self.latestObservation
+		if latestObservation is not None:
+			photoFilenames.append(latestObservation["photoFilename"])
+		return [photoFilename for photoFilename in photoFilenames if photoFilename is not None]
+
+	"""
+	Resolves the coffee situation of the photo
+
+	@param (numpy.ndarray) cvImage, the unblurred photo
+	@param (FrameViews) frameViews = None, the shared views of the photo
+	@return (tuple) (hasCoffeeMsg, coffeeLevel)
+	"""
+	def resolveCoffeeSituation(self, cvImage, frameViews = None):
+		with self.latencyStats.measure("resolve"):
+			return self.coffeeSituationResolver.resolveCoffeeVerdictFromImage(cvImage, frameViews)
+
+	"""
+	Blurs the photo, run on the stage pool
+
+	@param (numpy.ndarray) cvImage, blurred in place
+	@param (FrameViews) frameViews = None, the shared views of the captured photo
+	@return (numpy.ndarray) cvImage
+	"""
+	def blurImage(self, cvImage, frameViews = None):
+		with self.latencyStats.measure("blur"):
+			return self.imageBlurrer.blurImageData(cvImage, frameViews)
+
+	"""
+	Takes a photo to memory, a snapshot of the running stream if any
+
+	@return (CoffeeObservation|None) coffeeObservation, None if motion holds the camera and gave no snapshot
+	"""
+	def captureObservation(self):
+		cameraHeldByStreamingApp = self.cameraStreamer.isCameraHeldByStreamingApp()
+		if self.areWeCurrentlyStreaming() or cameraHeldByStreamingApp:
+			with self.latencyStats.measure("snapshot"):
+				frame = self.cameraStreamer.getSnapshotFrame()
+			if frame is not None:
+				return CoffeeObservation(frame, jpegQuality=self.cameraShooter.captureEngine.settings["quality"])
+			if cameraHeldByStreamingApp:
+				return None
+
+		coffeeObservation = self.cameraShooter.captureObservation()
+		self.latencyStats.record("capture", self.cameraShooter.getTimeObj("captureTotalTime").total_seconds())
+		return coffeeObservation
+
+	"""
+	Gets the coffee situation response, while streaming the observation url is the stream and the photo a snapshot
+
+	@param (string) hasCoffeeMsg
+	@param (string) photoUrl, None if no photo was taken
+	@param (float) coffeeLevel = None, the share of the pot filled if measured
+	@param (string) observationId = None, the background resolution of the photo if any
+	@return (dict) {hasCoffeeMsg, coffeeLevel, coffeeObservationUrl, streaming, snapshotUrl, observationId, observationUrl, resolved}
+	"""
+	def getCoffeeSituation(self, hasCoffeeMsg, photoUrl, coffeeLevel = None, observationId = None):
+		if self.areWeCurrentlyStreaming():
+			coffeeSituation = {
+				"hasCoffeeMsg": hasCoffeeMsg,
+				"coffeeLevel": coffeeLevel,
+				"coffeeObservationUrl": self.cameraStreamer.getStreamUrl(),
+				"streaming": True,
+			}
+			if photoUrl is not None:
+				coffeeSituation["snapshotUrl"] = photoUrl
+		else:
+			coffeeSituation = {
+				"hasCoffeeMsg": hasCoffeeMsg,
+				"coffeeLevel": coffeeLevel,
+				"coffeeObservationUrl": photoUrl,
+				"streaming": False,
+			}
+
+		if observationId is not None:
+			coffeeSituation["observationId"] = observationId
+			coffeeSituation["observationUrl"] = self.observationsHost+"/observation/"+observationId
+			coffeeSituation["resolved"] = False
+		return coffeeSituation
+
+	"""
+	Attaches the background resolved verdict to the coffee situation, if resolved by now
+
+	@param (dict) coffeeSituation
+	@return (dict) coffeeSituation
+	"""
+	def attachResolution(self, coffeeSituation):
+		if coffeeSituation.get("resolved") is not False:
+			return coffeeSituation
+		result = self.asyncResolution.getResult(coffeeSituation["observationId"])
+		if result is not None and result["resolved"]:
+			coffeeSituation["hasCoffeeMsg"] = result["hasCoffeeMsg"]
+			coffeeSituation["coffeeLevel"] = result["coffeeLevel"]
+			coffeeSituation["resolved"] = True
+		return coffeeSituation
+
+	"""
+	Gets the previous stored observation if it looks the same as the new one and has not expired
+
+	@param (CoffeeObservation) coffeeObservation
+	@return (dict|None) previousStoredObservation
+	"""
+	def getReusablePreviousObservation(self, coffeeObservation):
+
+		if not self.changeDetectionSettings["enabled"]:
+			return None
+
+		with self.latencyStats.measure("changeDetection"):
+			try:
+				perceptualHash = coffeeObservation.getPerceptualHash()
+			except Exception as e:
+				if self.debugMode:
+					print("Change detection failed: "+str(e))
+				return None
+
+		previousStoredObservation = self.previousStoredObservation
+		if previousStoredObservation is None:
+			return None
+		if time.time() - previousStoredObservation["storedAt"] > self.changeDetectionSettings["maxReuseSeconds"]:
+			return None
+		if hammingDistance(perceptualHash, previousStoredObservation["perceptualHash"]) > self.changeDetectionSettings["maxHammingDistance"]:
+			return None
+		return previousStoredObservation
+
+	"""
+	Remembers the stored observation for the change detection
+
+	@param (CoffeeObservation) coffeeObservation
+	@param (string) coffeeObservationUrl
+	@param (tuple) coffeeVerdict, (hasCoffeeMsg, coffeeLevel) of the photo, pending if resolved in the background
+	@param (string) observationId = None, the background resolution of the photo if any
+	"""
+	def rememberStoredObservation(self, coffeeObservation, coffeeObservationUrl, coffeeVerdict, observationId = None):
+		if self.changeDetectionSettings["enabled"] and coffeeObservation.perceptualHash is not None:
+			self.previousStoredObservation = {
+				"perceptualHash": coffeeObservation.perceptualHash,
+				"hasCoffeeMsg": coffeeVerdict[0],
+				"coffeeLevel": coffeeVerdict[1],
+				"observationId": observationId,
+				"coffeeObservationUrl": coffeeObservationUrl,
+				"storedAt": time.time(),
+			}
 
 	"""
 	Returns the list of required shell aps
 	
 	@return (array) {app}
 	"""
-	@staticmethod
-	def getRequiredShellApps():
-		return [CameraShooter, CameraStreamer]
+	def getRequiredShellApps(self):
+		return [self.cameraShooter, self.cameraStreamer]
 
 	"""
 	Checks if we have a coffee MODE change and executes it
@@ -135,3 +416,6 @@ class CoffeeChecker():
 	def setDebugMode(self, debugMode):
 		self.debugMode = debugMode
 		self.cameraShooter.setDebugMode(self.debugMode)
+		self.cameraStreamer.setDebugMode(self.debugMode)
+		self.observationScheduler.setDebugMode(self.debugMode)
+		self.asyncResolution.setDebugMode(self.debugMode)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import math
+import threading
+from array import array
+
+"""
+Fixed size history of the coffee level observations, the oldest ones are overwritten
+
+The observations are kept in preallocated typed arrays, 16 bytes an observation,
+the unknown scores as NaNs
+"""
+class CoffeeLevelHistory():
+
+	"""
+	Constructor
+
+	@param (int) size = 64, how many observations are kept
+	"""
+	def __init__(self, size = 64):
+		if size < 1:
+			raise Exception("CoffeeLevelHistory: the size must be at least 1")
+		self.size = size
+		self.timestamps = array("d", [0.0] * size)
+		self.darknesses = array("f", [math.nan] * size)
+		self.levels = array("f", [math.nan] * size)
+		self.nextIndex = 0
+		self.count = 0
+		self.lock = threading.Lock()
+
+	"""
+	Records an observation
+
+	@param (float) timestamp, unix timestamp
+	@param (float|None) darkness, 0 for white, 1 for black
+	@param (float|None) level, the share of the pot filled
+	"""
+	def push(self, timestamp, darkness, level):
+		with self.lock:
+			self.timestamps[self.nextIndex] = timestamp
+			self.darknesses[self.nextIndex] = math.nan if darkness is None else darkness
+			self.levels[self.nextIndex] = math.nan if level is None else level
+			self.nextIndex = (self.nextIndex + 1) % self.size
+			self.count = min(self.count + 1, self.size)
+
+	"""
+	Gets the newest observations, oldest first
+
+	@param (int) count = None, all by default
+	@param (float) minTimestamp = None, the older ones are left out
+	@return (list) observations, [(timestamp, darkness, level)], the unknown scores as None
+	"""
+	def getLatest(self, count = None, minTimestamp = None):
+		observations = []
+		with self.lock:
+			if count is None or count > self.count:
+				count = self.count
+			for offset in range(count, 0, -1):
+				index = (self.nextIndex - offset) % self.size
+				if minTimestamp is not None and self.timestamps[index] < minTimestamp:
+					continue
+				darkness = self.darknesses[index]
+				level = self.levels[index]
+				observations.append((self.timestamps[index], None if math.isnan(darkness) else darkness, None if math.isnan(level) else level))
+		return observations
+
+	"""
+	Gets the count of the observations kept
+
+	@return (int)
+	"""
+	def getCount(self):
+		return self.count
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import statistics
+import threading
+import time
+
+from apps.DeviceApp.features.coffee.CoffeeLevelHistory import CoffeeLevelHistory
+from apps.utils.Utils import getSettingsGroup
+
+"""
+Follows the coffee level over the observations, the single photo verdicts flicker
+
+The newest observations are smoothed by their median and the smoothed level moves a state machine:
+empty, running low and full, the thresholds have a hysteresis so a level near one does not flap the state.
+A fresh pot is a climb to full from empty or running low. The coffee message is answered from the state.
+"""
+class CoffeeLevelTracker():
+
+	"""
+	States
+
+	@var (string) stateUnknown, stateEmpty, stateLow, stateFull
+	"""
+	stateUnknown = "unknown"
+	stateEmpty = "empty"
+	stateLow = "low"
+	stateFull = "full"
+
+	"""
+	Default settings
+
+	@var (dict) defaultSettings
+	"""
+	defaultSettings = {
+		"enabled": False,
+		"historySize": 64,
+		"smoothingWindow": 5,
+		"maxObservationAgeSeconds": 900,
+		"minDarkness": 0.87,
+		"emptyLevel": 0.1,
+		"lowLevel": 0.35,
+		"hysteresis": 0.05,
+		"freshSeconds": 1800,
+		"maxStateAgeSeconds": 3600,
+	}
+
+	"""
+	Constructor
+
+	@param (dict) appSettings = None, {coffeeLevelTracker}
+	"""
+	def __init__(self, appSettings = None):
+		self.settings = getSettingsGroup(appSettings, "coffeeLevelTracker", self.defaultSettings)
+		self.history = CoffeeLevelHistory(self.settings["historySize"])
+		self.lock = threading.Lock()
+
+		self.state = self.stateUnknown
+		self.stateChangedAt = None
+		self.stateUpdatedAt = None
+		self.brewedAt = None
+		self.lastEvent = None
+		self.smoothedDarkness = None
+		self.smoothedLevel = None
+
+	"""
+	Checks if the feat is enabled
+
+	@return (bool)
+	"""
+	def isEnabled(self):
+		return self.settings["enabled"]
+
+	"""
+	Records an observation and moves the state by the smoothed scores
+
+	@param (float|None) darkness, 0 for white, 1 for black, None if no pot was seen
+	@param (float|None) level, the share of the pot filled, None if no pot was seen
+	@param (float) now = None, unix timestamp
+	@return (string|None) event, brewed, runningLow or empty, if the state changed so
+	"""
+	def recordObservation(self, darkness, level, now = None):
+		if now is None:
+			now = time.time()
+		self.history.push(now, darkness, level)
+
+		# The newest observations with the pot seen
+		observations = self.history.getLatest(None, now - self.settings["maxObservationAgeSeconds"])
+		observations = [observation for observation in observations if observation[1] is not None and observation[2] is not None]
+		observations = observations[-self.settings["smoothingWindow"]:]
+		if len(observations) == 0:
+			return None
+
+		smoothedDarkness = statistics.median(observation[1] for observation in observations)
+		smoothedLevel = statistics.median(observation[2] for observation in observations)
+
+		with self.lock:
+			self.smoothedDarkness = smoothedDarkness
+			self.smoothedLevel = smoothedLevel
+			self.stateUpdatedAt = now
+
+			nextState = self.getNextState(smoothedDarkness, smoothedLevel)
+			if nextState == self.state:
+				return None
+
+			event = self.getTransitionEvent(self.state, nextState)
+			self.state = nextState
+			self.stateChangedAt = now
+			if event == "brewed":
+				self.brewedAt = now
+			if event is not None:
+				self.lastEvent = {"event": event, "at": now}
+			return event
+
+	"""
+	Gets the state the smoothed scores point to, leaving the current state takes a hysteresis more
+
+	@param (float) darkness
+	@param (float) level
+	@return (string) state
+	"""
+	def getNextState(self, darkness, level):
+		hysteresis = self.settings["hysteresis"]
+		stateRanks = {self.stateEmpty: 0, self.stateLow: 1, self.stateFull: 2}
+		currentRank = stateRanks.get(self.state)
+
+		# A threshold is moved up when climbing over it, down when falling below it
+		def getThreshold(threshold, upperRank):
+			if currentRank is None:
+				return threshold
+			return threshold + hysteresis if currentRank < upperRank else threshold - hysteresis
+
+		hasCoffee = darkness >= self.settings["minDarkness"] - (hysteresis if currentRank is not None and currentRank > 0 else 0)
+		if not hasCoffee or level < getThreshold(self.settings["emptyLevel"], 1):
+			return self.stateEmpty
+		if level < getThreshold(self.settings["lowLevel"], 2):
+			return self.stateLow
+		return self.stateFull
+
+	"""
+	Gets the event of a state change
+
+	@param (string) previousState
+	@param (string) nextState
+	@return (string|None) event
+	"""
+	def getTransitionEvent(self, previousState, nextState):
+		if previousState == self.stateUnknown:
+			return None
+		if nextState == self.stateFull:
+			return "brewed"
+		if nextState == self.stateLow and previousState == self.stateFull:
+			return "runningLow"
+		if nextState == self.stateEmpty:
+			return "empty"
+		return None
+
+	"""
+	Gets the coffee message of the state
+
+	@param (float) now = None, unix timestamp
+	@return (string|None) coffeeAwarenessMsg, None if the state is not known or too old
+	"""
+	def getCoffeeMsg(self, now = None):
+		if now is None:
+			now = time.time()
+		with self.lock:
+			if self.state == self.stateUnknown or now - self.stateUpdatedAt > self.settings["maxStateAgeSeconds"]:
+				return None
+			if self.state == self.stateEmpty:
+				return "No coffee"
+			if self.state == self.stateLow:
+				return "Coffee is running low"
+			if self.brewedAt is not None and now - self.brewedAt <= self.settings["freshSeconds"]:
+				return "Fresh coffee, brewed "+str(int((now - self.brewedAt) / 60))+" min ago"
+			return "We have coffee"
+
+	"""
+	Gets the tracker status
+
+	@return (dict) {enabled, state, stateChangedAt, smoothedDarkness, smoothedLevel, lastEvent, observations}
+	"""
+	def getStatus(self):
+		with self.lock:
+			return {
+				"enabled": self.isEnabled(),
+				"state": self.state,
+				"stateChangedAt": self.stateChangedAt,
+				"smoothedDarkness": None if self.smoothedDarkness is None else round(self.smoothedDarkness, 3),
+				"smoothedLevel": None if self.smoothedLevel is None else round(self.smoothedLevel, 3),
+				"lastEvent": self.lastEvent,
+				"observations": self.history.getCount(),
+			}
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import time
+try:
+	import cv2
+	import numpy as np
+	openCvNotInstalled=False
+except Exception:
+	openCvNotInstalled=True
+
+"""
+A single coffee observation, carries the captured frame in memory through the blur, resolve and store stages
+
+The JPEG is decoded at most once, on the first image access, 
+and encoded at most once, only if the decoded image has been modified
+"""
+class CoffeeObservation():
+
+	"""
+	Constructor
+
+	@param (bytes) frame, the captured JPEG
+	@param (float) capturedAt = None, unix timestamp
+	@param (int) jpegQuality = 85
+	"""
+	def __init__(self, frame, capturedAt = None, jpegQuality = 85):
+		self.frame = frame
+		self.capturedAt = capturedAt if capturedAt is not None else time.time()
+		self.jpegQuality = jpegQuality
+
+		self.image = None
+		self.frameViews = None
+		self.imageModified = False
+		self.encodedFrame = None
+		self.perceptualHash = None
+
+	"""
+	Gets the decoded image
+
+	@return (numpy.ndarray) image, BGR
+	"""
+	def getImage(self):
+		if self.image is None:
+			if openCvNotInstalled:
+				raise Exception("CoffeeObservation.getImage(): OpenCV not installed")
+			self.image = cv2.imdecode(np.frombuffer(self.frame, dtype=np.uint8), cv2.IMREAD_COLOR)
+			if self.image is None:
+				raise Exception("CoffeeObservation.getImage(): could not decode the frame")
+		return self.image
+
+	"""
+	Gets the shared derived views of the captured image, eg. the grayscale, computed once for all of the stages
+
+	@return (FrameViews) frameViews
+	"""
+	def getFrameViews(self):
+		if self.frameViews is None:
+			from apps.utils.images.FrameViews import FrameViews
+			self.frameViews = FrameViews(self.getImage())
+		return self.frameViews
+
+	"""
+	Frees the derived views when the stages are done, the stages still holding them keep them until done
+	"""
+	def releaseFrameViews(self):
+		self.frameViews = None
+
+	"""
+	Replaces the image, eg. with a filtered one
+
+	@param (numpy.ndarray) image
+	"""
+	def setImage(self, image):
+		self.image = image
+		self.markImageModified()
+
+	"""
+	Flags the image modified in place
+	"""
+	def markImageModified(self):
+		self.imageModified = True
+		self.encodedFrame = None
+
+	"""
+	Gets the JPEG to store, the captured frame as is if the image was not modified
+
+	@return (bytes|memoryview) frame
+	"""
+	def getEncodedFrame(self):
+		if not self.imageModified:
+			return self.frame
+		if self.encodedFrame is None:
+			encodingSucceeded, encodedImage = cv2.imencode(".jpg", self.image, [cv2.IMWRITE_JPEG_QUALITY, self.jpegQuality])
+			if not encodingSucceeded:
+				raise Exception("CoffeeObservation.getEncodedFrame(): could not encode the image")
+			self.encodedFrame = memoryview(encodedImage.reshape(-1))
+		return self.encodedFrame
+
+	"""
+	Gets the perceptual hash of the captured frame
+
+	@return (int) perceptualHash
+	"""
+	def getPerceptualHash(self):
+		if self.perceptualHash is None:
+			from apps.utils.images.PerceptualHash import differenceHashOfJpeg
+			self.perceptualHash = differenceHashOfJpeg(self.frame)
+		return self.perceptualHash
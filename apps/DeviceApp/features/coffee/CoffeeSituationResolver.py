@@ -9,30 +9,107 @@ try:
 except Exception:
 	openCvNotInstalled=True
 
+import json
+import os
+import threading
+
+from apps.DeviceApp.features.coffee.CoffeeLevelTracker import CoffeeLevelTracker
+from apps.utils.Utils import getProjectRootPath, getSettingsGroup, getModulePathInstance
+from apps.utils.images.Boxes import clipBox, isSameBox
+
 """
-Checks if there is coffee using Haar classification
+Checks if there is coffee, the coffee pots found by Haar classification or calibrated,
+the coffee in them measured by the configured coffee level strategy
 
 @see: http://opencv-python-tutroals.readthedocs.io/en/latest/py_tutorials/py_objdetect/py_face_detection/py_face_detection.html
 @see: https://github.com/jordanott/Coffee-Robot
 """
 class CoffeeSituationResolver():
 
+	"""
+	The coffee level strategies module path
+
+	@var (string) strategiesModulePath
+	"""
+	strategiesModulePath = "apps.DeviceApp.features.coffee.strategies."
+
+	"""
+	Default coffee level estimator settings
+
+	@var (dict) defaultEstimatorSettings
+	"""
+	defaultEstimatorSettings = {
+		"strategy": "HaarCoffeeLevelStrategy",
+		"potScaleFactor": 1.3,
+		"potMinNeighbors": 5,
+		"liquidScaleFactor": 1.3,
+		"liquidMinNeighbors": 5,
+		"minDarkness": 0.87,
+		"minLevel": 0.05,
+		"neckShare": 0.2,
+		"baseShare": 0.05,
+		"bandShare": 0.4,
+		"liquidMaxIntensity": 90,
+		"minContrast": 40,
+	}
+
+	"""
+	Default coffee pot regions settings, the calibrated pot areas scanned instead of the whole frame
+
+	@var (dict) defaultPotRegionsSettings
+	"""
+	defaultPotRegionsSettings = {
+		"enabled": False,
+		"regions": None,
+		"regionsResolution": [640, 480],
+		"regionsFile": None,
+		"regionMargin": 0.4,
+		"potSizeRange": [0.6, 1.5],
+		"fullDetectionInterval": 50,
+		"calibrationMinHitRatio": 0.5,
+	}
+
+	"""
+	The intersection over union of the boxes of the same pot
+
+	@var (float) samePotMinOverlap
+	"""
+	samePotMinOverlap = 0.3
+
 	"""
 	Constructor
 
-	@param (dict) settings, {CoffeeSituationResolverEnabled}
+	@param (dict) settings, {CoffeeSituationResolverEnabled, coffeeLevelEstimator, coffeePotRegions, coffeeLevelTracker}
 	"""
 	def __init__(self, settings):
 		self.imagePath = None
 		self.coffeeSituationResolverEnabled = settings["CoffeeSituationResolverEnabled"]
 		self.coffeeAwarenessMsg = "no data"
+		self.coffeeLevelScores = None
+		self.coffeeFound = False
+
+		# One resolution at a time, the latest photo state and the tracker are shared
+		self.resolutionLock = threading.RLock()
+
+		# The smoothed coffee level over the observations
+		self.coffeeLevelTracker = CoffeeLevelTracker(settings)
+
+		# The calibrated coffee pot regions
+		self.potRegionsSettings = getSettingsGroup(settings, "coffeePotRegions", self.defaultPotRegionsSettings)
+		self.potRegionsLock = threading.Lock()
+		self.potRegions = None
+		self.potRegionsResolution = self.potRegionsSettings["regionsResolution"]
+		self.resolutionsSinceFullDetection = 0
+		if self.potRegionsSettings["enabled"]:
+			self.loadPotRegions()
 
 		self.coffeePotCascade = None
-		self.liquidAreaCascade = None
+		self.coffeeLevelStrategy = None
+		self.estimatorSettings = getSettingsGroup(settings, "coffeeLevelEstimator", self.defaultEstimatorSettings)
 		
 		if self.coffeeSituationResolverEnabled:
-			self.coffeePotCascade = cv2.CascadeClassifier('device/data/haarcascades/coffeePots.xml')
-			self.liquidAreaCascade = cv2.CascadeClassifier('device/data/haarcascades/liquids.xml')
+			self.coffeePotCascade = cv2.CascadeClassifier(getProjectRootPath()+'/apps/DeviceApp/data/haarcascades/coffeePots.xml')
+			self.coffeeLevelStrategy = getModulePathInstance(self.strategiesModulePath+self.estimatorSettings["strategy"], self.estimatorSettings)
 
 	"""
 	Checks if the feat is enabled
@@ -47,11 +124,65 @@ class CoffeeSituationResolver():
 	"""
 	Reads the image data for some indicators that we should have coffee, maybe?
 
+	The tracked coffee level state answers if known, the latest photo if not
+
 	@return (string) coffeeAwarenessMsg = not recognized
 	"""
 	def getCanWeHasCoffeeMsg(self):
+		if self.coffeeLevelTracker.isEnabled():
+			trackedCoffeeMsg = self.coffeeLevelTracker.getCoffeeMsg()
+			if trackedCoffeeMsg is not None:
+				return trackedCoffeeMsg
 		return self.coffeeAwarenessMsg
 
+	"""
+	Gets the coffee level scores of the latest photo
+
+	@return (dict|None) {darkness, level}, None if no pots were seen
+	"""
+	def getCoffeeLevelScores(self):
+		return self.coffeeLevelScores
+
+	"""
+	Checks if the latest photo had coffee
+
+	@return (bool)
+	"""
+	def hasCoffee(self):
+		return self.coffeeFound
+
+	"""
+	Gets the coffee level of the latest photo
+
+	@return (float|None) level, the share of the pot filled, None if no pots were seen
+	"""
+	def getCoffeeLevel(self):
+		coffeeLevelScores = self.coffeeLevelScores
+		if coffeeLevelScores is None:
+			return None
+		return round(coffeeLevelScores["level"], 2)
+
+	"""
+	Gets the coffee verdict, the message and the coffee level read together, not mixed with a resolution running meanwhile
+
+	@return (tuple) (hasCoffeeMsg, coffeeLevel)
+	"""
+	def getCoffeeVerdict(self):
+		with self.resolutionLock:
+			return self.getCanWeHasCoffeeMsg(), self.getCoffeeLevel()
+
+	"""
+	Resolves the coffee verdict of a decoded image, the verdict read before any other resolution may run
+
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, the shared views of the image if any
+	@return (tuple) (hasCoffeeMsg, coffeeLevel)
+	"""
+	def resolveCoffeeVerdictFromImage(self, cvImage, frameViews = None):
+		with self.resolutionLock:
+			self.resolveCoffeeSituationFromImage(cvImage, frameViews)
+			return self.getCoffeeVerdict()
+
 	"""
 	Resolves the coffee situation message
 
@@ -59,34 +190,246 @@ class CoffeeSituationResolver():
 	"""
 	def resolveCoffeeSituation(self, imagePath):
 		
-		# Default situation
-		self.coffeeAwarenessMsg = "Not recognized"
-		
 		# Read and transform imagePath file to an opencv image matrix
-		cvImage = cv2.imread(imagePath)
-		cvImageGray = cv2.cvtColor(cvImage, cv2.COLOR_BGR2GRAY)
+		return self.resolveCoffeeSituationFromImage(cv2.imread(imagePath))
 
-		# Detect coffee pots
-		coffeePots = self.coffeePotCascade.detectMultiScale(cvImageGray, 1.3, 5)
+	"""
+	Resolves the coffee situation message from a decoded image
+
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, the shared views of the image if any
+	@return (string) coffeeAwarenessMsg
+	"""
+	def resolveCoffeeSituationFromImage(self, cvImage, frameViews = None):
+		with self.resolutionLock:
+			# Default situation
+			self.coffeeAwarenessMsg = "Not recognized"
+			self.coffeeFound = False
+			coffeeLevelScores = None
 
-		# Find out if there is coffee, in the coffee pots
-		for (x,y,w,h) in coffeePots:
+			cvImageGray = frameViews.getGray() if frameViews is not None else cv2.cvtColor(cvImage, cv2.COLOR_BGR2GRAY)
 
-			# Coffeepot area
-			coffeePotAreaImageGray = cvImageGray[y:y+h,x:x+w]
+			# Find the coffee pots
+			coffeePots = self.getCoffeePots(cvImageGray)
 
-			# Find the liquid areas
-			potsLiquidAreas = self.liquidAreaCascade.detectMultiScale(coffeePotAreaImageGray, 1.3, 5)
-			
-			# Calc blackness of the liquids
-			rgbMean = 0
-			for (lx,ly,lw,lh) in potsLiquidAreas:
-				liquidColours = cvImage[ly:ly+lh, lx:lx+lw]
-				means = cv2.mean(liquidColours)
-				rgbMean += means[0] + means[1] + means[2]
+			# Measure the coffee in the coffee pots, the darkest pot scores the photo
+			for coffeePot in coffeePots:
+				potScores = self.coffeeLevelStrategy.measureCoffeePot(cvImage, cvImageGray, coffeePot)
+				if potScores is None:
+					continue
+				if coffeeLevelScores is None or potScores["darkness"] > coffeeLevelScores["darkness"]:
+					coffeeLevelScores = potScores
 
 			# If dark enough, we should have coffee
-			if rgbMean > 0 and rgbMean < 100:
+			if coffeeLevelScores is not None and coffeeLevelScores["darkness"] >= self.estimatorSettings["minDarkness"] and coffeeLevelScores["level"] >= self.estimatorSettings["minLevel"]:
 				self.coffeeAwarenessMsg = "We might have coffee"
+				self.coffeeFound = True
+
+			self.coffeeLevelScores = coffeeLevelScores
+			if self.coffeeLevelTracker.isEnabled():
+				if coffeeLevelScores is None:
+					self.coffeeLevelTracker.recordObservation(None, None)
+				else:
+					self.coffeeLevelTracker.recordObservation(coffeeLevelScores["darkness"], coffeeLevelScores["level"])
+
+			return self.coffeeAwarenessMsg
+
+	"""
+	Gets the coffee pots to measure, the calibrated pot regions as such if the strategy does not need the pots detected
+
+	The regions still follow the pots of a full frame detection every now and then, a moved pot is found again
+
+	@param (numpy.ndarray) cvImageGray
+	@return (list) coffeePots, [(x, y, w, h)]
+	"""
+	def getCoffeePots(self, cvImageGray):
+		if self.coffeeLevelStrategy.detectsPots or self.potRegions is None:
+			return self.detectCoffeePots(cvImageGray)
+		potRegions, fullDetectionDue = self.countPotRegionsResolution()
+		if fullDetectionDue:
+			coffeePots = self.detectCoffeePotsInArea(cvImageGray, (0, 0, cvImageGray.shape[1], cvImageGray.shape[0]))
+			self.followPotRegions(coffeePots, cvImageGray.shape[1], cvImageGray.shape[0])
+		return [region for region, searchArea in self.getPotRegions(cvImageGray.shape[1], cvImageGray.shape[0])]
+
+	"""
+	Counts a resolution with the pot regions, the full frame detection is due every fullDetectionInterval resolutions
+
+	@return (tuple) (potRegions, fullDetectionDue), the pot regions at the count
+	"""
+	def countPotRegionsResolution(self):
+		with self.potRegionsLock:
+			potRegions = self.potRegions
+			fullDetectionDue = potRegions is not None and self.resolutionsSinceFullDetection >= self.potRegionsSettings["fullDetectionInterval"]
+			if fullDetectionDue:
+				self.resolutionsSinceFullDetection = 0
+			else:
+				self.resolutionsSinceFullDetection += 1
+		return potRegions, fullDetectionDue
+
+	"""
+	Detects the coffee pots, in the calibrated pot regions if any, in the whole frame every now and then
+
+	@param (numpy.ndarray) cvImageGray
+	@return (list) coffeePots, [(x, y, w, h)]
+	"""
+	def detectCoffeePots(self, cvImageGray):
+		potRegions, fullDetectionDue = self.countPotRegionsResolution()
+		if potRegions is None or fullDetectionDue:
+			coffeePots = self.detectCoffeePotsInArea(cvImageGray, (0, 0, cvImageGray.shape[1], cvImageGray.shape[0]))
+			if fullDetectionDue:
+				self.followPotRegions(coffeePots, cvImageGray.shape[1], cvImageGray.shape[0])
+			return coffeePots
+
+		coffeePots = []
+		for region, searchArea in self.getPotRegions(cvImageGray.shape[1], cvImageGray.shape[0]):
+			# Only the pot sized detections matching the region, the crop shifts the cascade windows from the calibration ones
+			minSize = (int(region[2] * self.potRegionsSettings["potSizeRange"][0]), int(region[3] * self.potRegionsSettings["potSizeRange"][0]))
+			maxSize = (int(region[2] * self.potRegionsSettings["potSizeRange"][1]), int(region[3] * self.potRegionsSettings["potSizeRange"][1]))
+			for coffeePot in self.detectCoffeePotsInArea(cvImageGray, searchArea, minSize, maxSize):
+				if isSameBox(coffeePot, region, self.samePotMinOverlap) and not any(isSameBox(coffeePot, otherCoffeePot, self.samePotMinOverlap) for otherCoffeePot in coffeePots):
+					coffeePots.append(coffeePot)
+		return coffeePots
+
+	"""
+	Detects the coffee pots in an area of the image
+
+	@param (numpy.ndarray) cvImageGray
+	@param (tuple) area, (x, y, w, h)
+	@param (tuple) minSize = (0, 0), the smallest pot (w, h)
+	@param (tuple) maxSize = (0, 0), the largest pot (w, h), unlimited by default
+	@return (list) coffeePots, [(x, y, w, h)] in the image coordinates
+	"""
+	def detectCoffeePotsInArea(self, cvImageGray, area, minSize = (0, 0), maxSize = (0, 0)):
+		x, y, w, h = area
+		if w <= 0 or h <= 0:
+			return []
+		coffeePots = self.coffeePotCascade.detectMultiScale(cvImageGray[y:y+h, x:x+w], self.estimatorSettings["potScaleFactor"], self.estimatorSettings["potMinNeighbors"], minSize=minSize, maxSize=maxSize)
+		return [(int(px) + x, int(py) + y, int(pw), int(ph)) for (px, py, pw, ph) in coffeePots]
+
+	"""
+	Gets the pot regions scaled to the image, with their search areas expanded by the margin
+
+	@param (int) width
+	@param (int) height
+	@return (list) regions, [((x, y, w, h), (x, y, w, h))] the region and its search area
+	"""
+	def getPotRegions(self, width, height):
+		scaleX = width / self.potRegionsResolution[0]
+		scaleY = height / self.potRegionsResolution[1]
+		margin = self.potRegionsSettings["regionMargin"]
+		regions = []
+		for (x, y, w, h) in self.potRegions:
+			region = (int(x * scaleX), int(y * scaleY), int(round(w * scaleX)), int(round(h * scaleY)))
+			marginX = int(region[2] * margin)
+			marginY = int(region[3] * margin)
+			searchArea = clipBox((region[0] - marginX, region[1] - marginY, region[2] + 2 * marginX, region[3] + 2 * marginY), width, height)
+			regions.append((region, searchArea))
+		return regions
+
+	"""
+	Moves the pot regions to the pots of a full frame detection, to follow a drifting camera or a moved pot
+
+	The regions without a matching pot are kept, the pot may just be away
+
+	@param (list) coffeePots, [(x, y, w, h)]
+	@param (int) width
+	@param (int) height
+	"""
+	def followPotRegions(self, coffeePots, width, height):
+		scaleX = self.potRegionsResolution[0] / width
+		scaleY = self.potRegionsResolution[1] / height
+		scaledCoffeePots = [(int(x * scaleX), int(y * scaleY), int(round(w * scaleX)), int(round(h * scaleY))) for (x, y, w, h) in coffeePots]
+
+		with self.potRegionsLock:
+			potRegions = []
+			for region in self.potRegions:
+				matchingCoffeePots = [coffeePot for coffeePot in scaledCoffeePots if isSameBox(region, coffeePot, self.samePotMinOverlap)]
+				potRegions.append(matchingCoffeePots[0] if len(matchingCoffeePots) > 0 else region)
+			self.potRegions = potRegions
+
+	"""
+	Calibrates the pot regions from a set of frames, the pots found in enough of the frames are kept
+
+	@param (iterable) cvImages, decoded frames
+	@return (list) regions, [(x, y, w, h)] in the regions resolution
+	"""
+	def calibratePotRegions(self, cvImages):
+		clusters = []
+		imagesCount = 0
+		for cvImage in cvImages:
+			imagesCount += 1
+			cvImageGray = cv2.cvtColor(cvImage, cv2.COLOR_BGR2GRAY)
+			scaleX = self.potRegionsResolution[0] / cvImageGray.shape[1]
+			scaleY = self.potRegionsResolution[1] / cvImageGray.shape[0]
+
+			matchedClusters = set()
+			for (x, y, w, h) in self.detectCoffeePotsInArea(cvImageGray, (0, 0, cvImageGray.shape[1], cvImageGray.shape[0])):
+				box = (x * scaleX, y * scaleY, w * scaleX, h * scaleY)
+				for clusterIndex, cluster in enumerate(clusters):
+					if clusterIndex not in matchedClusters and isSameBox(self.getClusterBox(cluster), box, self.samePotMinOverlap):
+						break
+				else:
+					clusterIndex = len(clusters)
+					clusters.append({"boxesSum": np.zeros(4), "boxesCount": 0, "imagesCount": 0})
+
+				cluster = clusters[clusterIndex]
+				cluster["boxesSum"] += box
+				cluster["boxesCount"] += 1
+				if clusterIndex not in matchedClusters:
+					cluster["imagesCount"] += 1
+					matchedClusters.add(clusterIndex)
+
+		if imagesCount == 0:
+			raise Exception("CoffeeSituationResolver: no frames to calibrate the pot regions from")
+
+		minImagesCount = imagesCount * self.potRegionsSettings["calibrationMinHitRatio"]
+		potRegions = [self.getClusterBox(cluster) for cluster in clusters if cluster["imagesCount"] >= minImagesCount]
+
+		with self.potRegionsLock:
+			self.potRegions = potRegions if len(potRegions) > 0 else None
+			self.resolutionsSinceFullDetection = 0
+		return potRegions
+
+	"""
+	Gets the mean box of a calibration cluster
 
-		return self.coffeeAwarenessMsg
\ No newline at end of file
+	@param (dict) cluster, {boxesSum, boxesCount}
+	@return (tuple) box, (x, y, w, h)
+	"""
+	def getClusterBox(self, cluster):
+		return tuple(int(round(value)) for value in cluster["boxesSum"] / cluster["boxesCount"])
+
+	"""
+	Loads the pot regions from the settings or from the regions file
+	"""
+	def loadPotRegions(self):
+		regionsFile = self.potRegionsSettings["regionsFile"]
+		if self.potRegionsSettings["regions"]:
+			self.potRegions = [tuple(region) for region in self.potRegionsSettings["regions"]]
+		elif regionsFile is not None and os.path.isfile(regionsFile):
+			with open(regionsFile) as potRegionsFile:
+				calibration = json.load(potRegionsFile)
+			self.potRegions = [tuple(region) for region in calibration["regions"]] or None
+			self.potRegionsResolution = calibration["regionsResolution"]
+
+	"""
+	Saves the pot regions as a regions file
+
+	@param (string) regionsFile
+	"""
+	def savePotRegions(self, regionsFile):
+		with self.potRegionsLock:
+			calibration = {
+				"regions": [list(region) for region in self.potRegions or []],
+				"regionsResolution": list(self.potRegionsResolution),
+			}
+		with open(regionsFile, "w") as potRegionsFile:
+			json.dump(calibration, potRegionsFile)
+
+	"""
+	Gets the pot regions in use
+
+	@return (list|None) regions, [(x, y, w, h)] in the regions resolution
+	"""
+	def getCalibratedPotRegions(self):
+		return self.potRegions
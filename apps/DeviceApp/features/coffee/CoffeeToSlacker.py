@@ -145,9 +145,34 @@ class CoffeeToSlacker(SlackPostWebhook):
 			coffeeSituationMessage = "STREAM: Check the current 4th floor coffee situation here"
 
 		messageData["message"] += "\n> <"+payload["coffeeObservationUrl"]+"|"+coffeeSituationMessage+">"
+		if "snapshotUrl" in payload:
+			messageData["message"] += "\n> <"+payload["snapshotUrl"]+"|"+payload["hasCoffeeMsg"]+">"
 		
 		# Force request channel&network
 		messageData["channel"] = ("channel" in requestParams) and requestParams["channel"] or self.defaultChannel
 		messageData["network"] = ("network" in requestParams) and requestParams["network"] or self.defaultNetwork
 
+		return messageData
+
+	"""
+	Generates the slack payload of a coffee situation resolved after the first message
+
+	@param (dict) result, {hasCoffeeMsg, coffeeLevel}
+	@param (dict) requestParams, [channel, network]
+	@return (dict) messageData
+	"""
+	def generateFollowUpPayload(self, result, requestParams):
+
+		messageData = {
+			"username": "Coffee Situation: Verdict",
+			"message": "> "+result["hasCoffeeMsg"],
+			"icon_emoji": ":coffee:",
+		}
+		if result.get("coffeeLevel") is not None:
+			messageData["message"] += " ("+str(int(round(result["coffeeLevel"] * 100)))+" % full)"
+
+		# Force request channel&network
+		messageData["channel"] = ("channel" in requestParams) and requestParams["channel"] or self.defaultChannel
+		messageData["network"] = ("network" in requestParams) and requestParams["network"] or self.defaultNetwork
+
 		return messageData
\ No newline at end of file
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+import time
+
+from apps.DeviceApp.features.coffee.RequestDemandHistory import RequestDemandHistory
+from apps.utils.Utils import getSettingsGroup
+
+"""
+Runs the coffee observations in the background, ahead of the coffee questions
+
+The observation interval follows the expected demand: the more questions expected
+at this hour of the week, the more often we observe, and not at all when nobody asks.
+The interval never goes below what the duty cycle budget allows, so the Pi stays responsive.
+"""
+class ObservationScheduler():
+
+	"""
+	Default settings
+
+	@var (dict) defaultSettings
+	"""
+	defaultSettings = {
+		"enabled": False,
+		"minInterval": 30,
+		"maxInterval": 900,
+		"minRequestsPerHour": 0.5,
+		"maxDutyCycle": 0.1,
+		"maxServeAgeSeconds": 120,
+		"idleRecheckInterval": 300,
+		"weeklyDecay": 0.5,
+		"demandHistoryFile": None,
+	}
+
+	"""
+	Constructor
+
+	@param (callable) observe, runs an observation
+	@param (dict) appSettings = None, {observationScheduler}
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, observe, appSettings = None, debugMode = False):
+		self.observe = observe
+		self.settings = getSettingsGroup(appSettings, "observationScheduler", self.defaultSettings)
+		self.debugMode = debugMode
+		self.demandHistory = RequestDemandHistory(self.settings["weeklyDecay"], self.settings["demandHistoryFile"])
+
+		self.lock = threading.Lock()
+		self.lastObservationAt = None
+		self.lastAttemptAt = None
+		self.averageObservationSeconds = None
+		self.schedulerThread = None
+		self.schedulerStopper = threading.Event()
+
+	"""
+	Checks if the feat is enabled
+
+	@return (bool)
+	"""
+	def isEnabled(self):
+		return self.settings["enabled"]
+
+	"""
+	Records a coffee question for the demand history
+
+	@param (float) now = None, unix timestamp
+	"""
+	def recordRequest(self, now = None):
+		self.demandHistory.recordRequest(now)
+
+	"""
+	Records a finished observation, scheduled or not
+
+	@param (float) observationSeconds, how long it took
+	@param (float) now = None, unix timestamp
+	"""
+	def recordObservation(self, observationSeconds, now = None):
+		if now is None:
+			now = time.time()
+		with self.lock:
+			self.lastObservationAt = now
+			if self.averageObservationSeconds is None:
+				self.averageObservationSeconds = observationSeconds
+			else:
+				self.averageObservationSeconds = 0.8 * self.averageObservationSeconds + 0.2 * observationSeconds
+
+	"""
+	Gets the current observation interval
+
+	@param (float) now = None, unix timestamp
+	@return (float|None) interval in seconds, None if no observations are needed now
+	"""
+	def getObservationInterval(self, now = None):
+		expectedRequestsPerHour = self.demandHistory.getExpectedRequestsPerHour(now)
+		if expectedRequestsPerHour < self.settings["minRequestsPerHour"]:
+			return None
+
+		# One observation per an expected question, within the limits
+		interval = 3600.0 / expectedRequestsPerHour
+		interval = max(self.settings["minInterval"], min(self.settings["maxInterval"], interval))
+
+		# The duty cycle budget
+		with self.lock:
+			averageObservationSeconds = self.averageObservationSeconds
+		if averageObservationSeconds is not None and self.settings["maxDutyCycle"] > 0:
+			interval = max(interval, averageObservationSeconds / self.settings["maxDutyCycle"])
+
+		return interval
+
+	"""
+	Checks if the latest observation is fresh enough to be served for a question
+
+	@param (float) observedAt, unix timestamp
+	@return (bool)
+	"""
+	def isServeable(self, observedAt):
+		return self.isEnabled() and time.time() - observedAt <= self.settings["maxServeAgeSeconds"]
+
+	"""
+	Starts the scheduler, if enabled and not yet running
+	"""
+	def start(self):
+		if not self.isEnabled():
+			return
+		if self.schedulerThread is not None and self.schedulerThread.is_alive():
+			return
+		self.schedulerStopper.clear()
+		self.schedulerThread = threading.Thread(target=self.runScheduler, name="ObservationScheduler", daemon=True)
+		self.schedulerThread.start()
+
+	"""
+	Stops the scheduler
+	"""
+	def stop(self):
+		self.schedulerStopper.set()
+		if self.schedulerThread is not None:
+			self.schedulerThread.join()
+			self.schedulerThread = None
+
+	"""
+	The scheduler loop
+	"""
+	def runScheduler(self):
+		while not self.schedulerStopper.is_set():
+
+			interval = self.getObservationInterval()
+			if interval is None:
+				self.schedulerStopper.wait(self.settings["idleRecheckInterval"])
+				continue
+
+			with self.lock:
+				lastObservationAt = max(self.lastObservationAt or 0, self.lastAttemptAt or 0)
+			waitSeconds = lastObservationAt + interval - time.time()
+
+			if waitSeconds > 0:
+				# Re-evaluated after the wait, a question may have triggered an observation meanwhile
+				self.schedulerStopper.wait(min(waitSeconds, self.settings["idleRecheckInterval"]))
+				continue
+
+			# Attempts count too, a failing or skipped observation is not retried in a tight loop
+			with self.lock:
+				self.lastAttemptAt = time.time()
+			try:
+				self.observe()
+			except Exception as e:
+				if self.debugMode:
+					print("Scheduled observation failed: "+str(e))
+
+	"""
+	Gets the scheduler status
+
+	@return (dict) {enabled, interval, expectedRequestsPerHour, averageObservationSeconds}
+	"""
+	def getStatus(self):
+		return {
+			"enabled": self.isEnabled(),
+			"interval": self.getObservationInterval(),
+			"expectedRequestsPerHour": round(self.demandHistory.getExpectedRequestsPerHour(), 2),
+			"averageObservationSeconds": self.averageObservationSeconds,
+		}
+
+	"""
+	Sets debug mode
+
+	@param (bool) debugMode
+	"""
+	def setDebugMode(self, debugMode):
+		self.debugMode = debugMode
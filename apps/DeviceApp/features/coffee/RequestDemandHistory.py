@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import json
+import os
+import threading
+import time
+
+"""
+Coffee question counts by the hour of the week, older weeks fade out by a weekly decay
+
+Used for guessing how many coffee questions to expect right now, 
+eg. a lot on weekday mornings and lunch times, none at night
+"""
+class RequestDemandHistory():
+
+	"""
+	Seconds in a week
+
+	@var (int) weekInSeconds
+	"""
+	weekInSeconds = 7 * 24 * 3600
+
+	"""
+	Constructor
+
+	@param (float) weeklyDecay = 0.5, how much of the history is left after a week
+	@param (string) historyFilePath = None, the history is persisted here if set
+	"""
+	def __init__(self, weeklyDecay = 0.5, historyFilePath = None):
+		self.weeklyDecay = weeklyDecay
+		self.historyFilePath = historyFilePath
+		self.lock = threading.Lock()
+
+		self.hourlyCounts = [0.0] * (7 * 24)
+		self.historyWeight = 1.0 # Weeks of history, the older ones decayed
+		self.currentWeek = None
+		self.lastSavedHourSlot = None
+
+		self.loadHistory()
+
+	"""
+	Records a coffee question
+
+	@param (float) now = None, unix timestamp
+	"""
+	def recordRequest(self, now = None):
+		if now is None:
+			now = time.time()
+		with self.lock:
+			self.decayToWeek(now)
+			hourSlot = self.getHourSlot(now)
+			self.hourlyCounts[hourSlot] += 1
+
+			# Persist once in an hour at the most
+			shouldSave = self.historyFilePath is not None and self.lastSavedHourSlot != hourSlot
+			if shouldSave:
+				self.lastSavedHourSlot = hourSlot
+		if shouldSave:
+			self.saveHistory()
+
+	"""
+	Gets the expected amount of coffee questions in an hour, by the history of the same hour of the week
+
+	@param (float) now = None, unix timestamp
+	@return (float) expectedRequestsPerHour
+	"""
+	def getExpectedRequestsPerHour(self, now = None):
+		if now is None:
+			now = time.time()
+		with self.lock:
+			self.decayToWeek(now)
+			return self.hourlyCounts[self.getHourSlot(now)] / self.historyWeight
+
+	"""
+	Fades out the history for the weeks passed since the previous call
+
+	@param (float) now
+	"""
+	def decayToWeek(self, now):
+		week = int(now // self.weekInSeconds)
+		if self.currentWeek is None:
+			self.currentWeek = week
+		elif week > self.currentWeek:
+			decay = self.weeklyDecay ** (week - self.currentWeek)
+			for hourSlot in range(len(self.hourlyCounts)):
+				self.hourlyCounts[hourSlot] *= decay
+			self.historyWeight = self.historyWeight * decay + sum(self.weeklyDecay ** i for i in range(week - self.currentWeek))
+			self.currentWeek = week
+
+	"""
+	Gets the hour of the week slot, in local time
+
+	@param (float) now
+	@return (int) hourSlot
+	"""
+	def getHourSlot(self, now):
+		localTime = time.localtime(now)
+		return localTime.tm_wday * 24 + localTime.tm_hour
+
+	"""
+	Saves the history to the history file
+	"""
+	def saveHistory(self):
+		with self.lock:
+			history = {
+				"hourlyCounts": list(self.hourlyCounts),
+				"historyWeight": self.historyWeight,
+				"currentWeek": self.currentWeek,
+			}
+		try:
+			partialPath = self.historyFilePath+".part"
+			with open(partialPath, "w") as historyFile:
+				json.dump(history, historyFile)
+			os.replace(partialPath, self.historyFilePath)
+		except Exception as e:
+			print("Saving the request demand history failed: "+str(e))
+
+	"""
+	Loads the history from the history file, if any
+	"""
+	def loadHistory(self):
+		if self.historyFilePath is None or not os.path.isfile(self.historyFilePath):
+			return
+		try:
+			with open(self.historyFilePath) as historyFile:
+				history = json.load(historyFile)
+			if len(history["hourlyCounts"]) == len(self.hourlyCounts):
+				self.hourlyCounts = [float(count) for count in history["hourlyCounts"]]
+				self.historyWeight = float(history["historyWeight"])
+				self.currentWeek = history["currentWeek"]
+		except Exception as e:
+			print("Loading the request demand history failed: "+str(e))
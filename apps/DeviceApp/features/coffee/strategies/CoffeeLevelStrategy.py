@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+
+"""
+Coffee level measuring abstraction class, measures the coffee in a coffee pot found by the resolver
+"""
+class CoffeeLevelStrategy():
+
+	"""
+	Does the strategy need the coffee pots detected from each photo, if not the calibrated pot regions are measured as such
+
+	@var (bool) detectsPots
+	"""
+	detectsPots = True
+
+	"""
+	Constructor
+
+	@param (dict) settings, the coffeeLevelEstimator settings group
+	"""
+	def __init__(self, settings):
+		self.settings = settings
+
+	"""
+	Measures the coffee in a coffee pot
+
+	@param (numpy.ndarray) cvImage
+	@param (numpy.ndarray) cvImageGray
+	@param (tuple) coffeePot, (x, y, w, h)
+	@return (dict|None) {darkness, level}, darkness 0 for white and 1 for black, level the share of the pot filled, None if the pot can not be measured
+	"""
+	def measureCoffeePot(self, cvImage, cvImageGray, coffeePot):
+		raise NotImplementedError("CoffeeLevelStrategy class must have a measureCoffeePot(cvImage, cvImageGray, coffeePot) method")
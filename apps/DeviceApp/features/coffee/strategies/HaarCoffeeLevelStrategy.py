@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import cv2
+
+from apps.DeviceApp.features.coffee.strategies.CoffeeLevelStrategy import CoffeeLevelStrategy
+from apps.utils.Utils import getProjectRootPath
+
+"""
+Measures the coffee from the liquid areas found in the pot by Haar classification
+
+@see: https://github.com/jordanott/Coffee-Robot
+"""
+class HaarCoffeeLevelStrategy(CoffeeLevelStrategy):
+
+	"""
+	Constructor
+
+	@param (dict) settings, the coffeeLevelEstimator settings group
+	"""
+	def __init__(self, settings):
+		super().__init__(settings)
+		self.liquidAreaCascade = cv2.CascadeClassifier(getProjectRootPath()+'/apps/DeviceApp/data/haarcascades/liquids.xml')
+
+	"""
+	Measures the coffee in a coffee pot, the darkness over the liquid areas and the level from their top
+
+	@param (numpy.ndarray) cvImage
+	@param (numpy.ndarray) cvImageGray
+	@param (tuple) coffeePot, (x, y, w, h)
+	@return (dict) {darkness, level}
+	"""
+	def measureCoffeePot(self, cvImage, cvImageGray, coffeePot):
+		x, y, w, h = coffeePot
+
+		# Find the liquid areas, in the coffee pot coordinates
+		potsLiquidAreas = self.liquidAreaCascade.detectMultiScale(cvImageGray[y:y+h, x:x+w], self.settings["liquidScaleFactor"], self.settings["liquidMinNeighbors"])
+		if len(potsLiquidAreas) == 0:
+			return {"darkness": 0.0, "level": 0.0}
+
+		# Calc blackness of the liquids, weighted by their areas
+		coloursSum = 0.0
+		pixelsCount = 0
+		for (lx,ly,lw,lh) in potsLiquidAreas:
+			means = cv2.mean(cvImage[y+ly:y+ly+lh, x+lx:x+lx+lw])
+			coloursSum += (means[0] + means[1] + means[2]) * lw * lh
+			pixelsCount += int(lw * lh)
+
+		return {
+			"darkness": max(0.0, 1 - coloursSum / pixelsCount / 765),
+			"level": min(1.0, max(0.0, float(h - min(ly for (lx,ly,lw,lh) in potsLiquidAreas)) / h)),
+		}
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import numpy as np
+
+from apps.DeviceApp.features.coffee.strategies.CoffeeLevelStrategy import CoffeeLevelStrategy
+
+"""
+Measures the coffee from the intensity profiles of the pot, without a classifier
+
+The column profile finds the darkest vertical band of the pot, the row profile of that band
+the coffee line: the dark rows reaching up from the pot bottom are the coffee.
+Measures the calibrated pot regions directly, a few array passes per pot.
+"""
+class IntensityProfileCoffeeLevelStrategy(CoffeeLevelStrategy):
+
+	"""
+	Measures the calibrated pot regions as such
+
+	@var (bool) detectsPots
+	"""
+	detectsPots = False
+
+	"""
+	Measures the coffee in a coffee pot
+
+	@param (numpy.ndarray) cvImage
+	@param (numpy.ndarray) cvImageGray
+	@param (tuple) coffeePot, (x, y, w, h)
+	@return (dict|None) {darkness, level}, None if the pot can not be measured
+	"""
+	def measureCoffeePot(self, cvImage, cvImageGray, coffeePot):
+		x, y, w, h = coffeePot
+
+		# Too dark or overexposed to tell
+		lowIntensity, highIntensity = np.percentile(cvImageGray[y:y+h, x:x+w], [5, 95])
+		if highIntensity - lowIntensity < self.settings["minContrast"]:
+			return None
+
+		# The pot without the lid and the base
+		top = y + int(h * self.settings["neckShare"])
+		bottom = y + h - int(h * self.settings["baseShare"])
+		potImage = cvImageGray[top:bottom, x:x+w]
+		if potImage.size == 0:
+			return {"darkness": 0.0, "level": 0.0}
+
+		# The darkest vertical band, by the column profile
+		columnProfile = potImage.mean(axis=0, dtype=np.float32)
+		bandWidth = max(1, min(len(columnProfile), int(len(columnProfile) * self.settings["bandShare"])))
+		bandStart = int(np.argmin(self.getWindowSums(columnProfile, bandWidth)))
+
+		# The row profile of the band, smoothed over the sensor noise
+		rowProfile = potImage[:, bandStart:bandStart+bandWidth].mean(axis=1, dtype=np.float32)
+		smoothingRows = max(1, len(rowProfile) // 20)
+		rowProfile = self.getWindowSums(rowProfile, smoothingRows) / smoothingRows
+
+		# The coffee: the dark rows reaching up from the bottom
+		threshold = min(self.settings["liquidMaxIntensity"], (rowProfile.min() + rowProfile.max()) / 2)
+		lightRows = np.flatnonzero(rowProfile >= threshold)
+		if len(lightRows) == 0:
+			liquidRowsCount = len(rowProfile)
+		else:
+			liquidRowsCount = len(rowProfile) - 1 - int(lightRows[-1])
+		if liquidRowsCount == 0:
+			return {"darkness": 0.0, "level": 0.0}
+
+		return {
+			"darkness": float(1 - rowProfile[-liquidRowsCount:].mean() / 255),
+			"level": liquidRowsCount / len(rowProfile),
+		}
+
+	"""
+	Gets the sums of the sliding windows of a profile
+
+	@param (numpy.ndarray) profile
+	@param (int) windowSize
+	@return (numpy.ndarray) sums, len(profile) - windowSize + 1 of them
+	"""
+	def getWindowSums(self, profile, windowSize):
+		cumulativeSums = np.concatenate(([0.0], np.cumsum(profile, dtype=np.float64)))
+		return cumulativeSums[windowSize:] - cumulativeSums[:-windowSize]
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+import time
+
+from apps.DeviceApp.features.FrameRingBuffer import FrameRingBuffer
+from apps.DeviceApp.features.streaming.StreamClient import StreamClient
+
+"""
+Captures the stream frames once and fans the same JPEG frames out to every connected viewer
+
+The frame rate follows the viewers count: the frames budget per second is shared by the viewers,
+within the min and max frame rates, without viewers the frames are captured at the idle rate
+to keep a fresh snapshot available for the coffee questions
+"""
+class FrameBroadcaster():
+
+	"""
+	The multipart boundary of the MJPEG stream
+
+	@var (string) boundary
+	"""
+	boundary = "frame"
+
+	"""
+	Constructor
+
+	@param (callable) captureFrame, returns a JPEG frame
+	@param (dict) settings, {maxFramesPerSecond, minFramesPerSecond, idleFramesPerSecond, framesBudgetPerSecond, clientQueueSize}
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, captureFrame, settings, debugMode = False):
+		self.captureFrame = captureFrame
+		self.settings = settings
+		self.debugMode = debugMode
+
+		self.frameBuffer = FrameRingBuffer(1)
+		self.clients = []
+		self.clientsLock = threading.Lock()
+		self.broadcastThread = None
+		self.broadcastStopper = threading.Event()
+		self.broadcastFramesCount = 0
+
+	"""
+	Starts the broadcasting, if not yet running
+	"""
+	def start(self):
+		if self.isRunning():
+			return
+		self.broadcastStopper.clear()
+		self.broadcastThread = threading.Thread(target=self.runBroadcast, name="FrameBroadcaster", daemon=True)
+		self.broadcastThread.start()
+
+	"""
+	Stops the broadcasting, disconnects the viewers
+	"""
+	def stop(self):
+		self.broadcastStopper.set()
+		if self.broadcastThread is not None:
+			self.broadcastThread.join()
+			self.broadcastThread = None
+		with self.clientsLock:
+			clients = self.clients
+			self.clients = []
+		for client in clients:
+			client.close()
+		self.frameBuffer.clear()
+
+	"""
+	Checks if the broadcasting is running
+
+	@return (bool)
+	"""
+	def isRunning(self):
+		return self.broadcastThread is not None and self.broadcastThread.is_alive()
+
+	"""
+	Connects a viewer
+
+	@return (StreamClient) client
+	"""
+	def subscribe(self):
+		client = StreamClient(self.settings["clientQueueSize"])
+		with self.clientsLock:
+			self.clients.append(client)
+
+		# The viewer gets the newest frame right away
+		newest = self.frameBuffer.getNewest()
+		if newest is not None:
+			client.push(newest[1])
+		return client
+
+	"""
+	Disconnects a viewer
+
+	@param (StreamClient) client
+	"""
+	def unsubscribe(self, client):
+		with self.clientsLock:
+			if client in self.clients:
+				self.clients.remove(client)
+		client.close()
+
+	"""
+	Gets the amount of the connected viewers
+
+	@return (int)
+	"""
+	def getViewersCount(self):
+		with self.clientsLock:
+			return len(self.clients)
+
+	"""
+	Gets the current frame rate
+
+	@return (float) frames per second
+	"""
+	def getFramesPerSecond(self):
+		viewersCount = self.getViewersCount()
+		if viewersCount == 0:
+			return self.settings["idleFramesPerSecond"]
+		framesPerSecond = self.settings["framesBudgetPerSecond"] / viewersCount
+		return max(self.settings["minFramesPerSecond"], min(self.settings["maxFramesPerSecond"], framesPerSecond))
+
+	"""
+	Gets the newest broadcast frame if it's younger than the max age
+
+	@param (float) maxAgeInSeconds
+	@return (bytes|None) frame
+	"""
+	def getNewestFrame(self, maxAgeInSeconds):
+		return self.frameBuffer.getNewestFrame(maxAgeInSeconds)
+
+	"""
+	The broadcast loop, one capture per frame regardless of the viewers count
+	"""
+	def runBroadcast(self):
+		while not self.broadcastStopper.is_set():
+			startTime = time.perf_counter()
+			try:
+				frame = self.captureFrame()
+				self.frameBuffer.push(frame)
+				self.broadcastFramesCount += 1
+				with self.clientsLock:
+					clients = list(self.clients)
+				for client in clients:
+					client.push(frame)
+			except Exception as e:
+				if self.debugMode:
+					print("Stream capture failed: "+str(e))
+			self.broadcastStopper.wait(max(0, 1.0 / self.getFramesPerSecond() - (time.perf_counter() - startTime)))
+
+	"""
+	Generates the multipart MJPEG stream parts for a new viewer, the viewer is connected on the first part
+	and disconnected when the generator is closed, eg. when the http client goes away
+
+	@param (float) frameTimeout = 5, seconds to wait for a frame before checking the broadcast state
+	@return (generator) bytes
+	"""
+	def generateMultipartStream(self, frameTimeout = 5):
+		client = self.subscribe()
+		try:
+			while self.isRunning() and not client.isClosed():
+				frame = client.getFrame(frameTimeout)
+				if frame is None:
+					continue
+				yield (b"--"+self.boundary.encode()+b"\r\nContent-Type: image/jpeg\r\nContent-Length: "+str(len(frame)).encode()+b"\r\n\r\n")+frame+b"\r\n"
+		finally:
+			self.unsubscribe(client)
+
+	"""
+	Gets the stream status
+
+	@return (dict) {running, viewers, framesPerSecond, broadcastFrames, droppedFrames}
+	"""
+	def getStatus(self):
+		with self.clientsLock:
+			clients = list(self.clients)
+		return {
+			"running": self.isRunning(),
+			"viewers": len(clients),
+			"framesPerSecond": round(self.getFramesPerSecond(), 2),
+			"broadcastFrames": self.broadcastFramesCount,
+			"droppedFrames": sum(client.droppedFramesCount for client in clients),
+		}
+
+	"""
+	Sets debug mode
+
+	@param (bool) debugMode
+	"""
+	def setDebugMode(self, debugMode):
+		self.debugMode = debugMode
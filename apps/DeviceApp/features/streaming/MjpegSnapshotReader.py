@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import urllib.request
+
+from apps.utils.images.JpegStreamReader import JpegStreamReader
+
+"""
+Reads a single frame from a running MJPEG http stream, eg. the motion stream,
+so that a snapshot does not need the camera that the stream is holding
+"""
+class MjpegSnapshotReader():
+
+	"""
+	Constructor
+
+	@param (string) streamUrl
+	@param (float) timeout, seconds
+	"""
+	def __init__(self, streamUrl, timeout):
+		self.streamUrl = streamUrl
+		self.timeout = timeout
+
+	"""
+	Reads the next frame of the stream
+
+	@throws (Exception) if the stream is not reachable or ends
+	@return (bytes) frame
+	"""
+	def readFrame(self):
+		with urllib.request.urlopen(self.streamUrl, timeout=self.timeout) as response:
+			return JpegStreamReader(response, self.timeout, readRaw=False).readFrame()
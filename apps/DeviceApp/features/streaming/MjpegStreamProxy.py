@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+import time
+import urllib.request
+
+"""
+Passes a MJPEG http stream, eg. the motion stream, through to the viewers and counts them
+"""
+class MjpegStreamProxy():
+
+	"""
+	Constructor
+
+	@param (string) streamUrl
+	@param (float) timeout, seconds
+	@param (int) chunkSize = 65536
+	"""
+	def __init__(self, streamUrl, timeout, chunkSize = 65536):
+		self.streamUrl = streamUrl
+		self.timeout = timeout
+		self.chunkSize = chunkSize
+
+		self.lock = threading.Lock()
+		self.viewersCount = 0
+		self.lastViewerLeftAt = None
+
+		# Bumped to disconnect the viewers of the previous stream
+		self.viewersGeneration = 0
+
+	"""
+	Opens the upstream stream for a viewer, the viewer is counted until the stream is closed,
+	the close is called also if the viewer leaves before the first chunk, eg. on the response close
+
+	@throws (Exception) if the stream is not reachable
+	@return (tuple) (contentType, generator of bytes, close callable)
+	"""
+	def open(self):
+		response = urllib.request.urlopen(self.streamUrl, timeout=self.timeout)
+		with self.lock:
+			self.viewersCount += 1
+			viewer = {"response": response, "generation": self.viewersGeneration, "closed": False}
+		return response.headers.get("Content-Type", "multipart/x-mixed-replace"), self.generateStream(viewer), lambda: self.closeViewer(viewer)
+
+	"""
+	Generates the stream chunks for a viewer
+
+	@param (dict) viewer, {response, generation, closed}
+	@return (generator) bytes
+	"""
+	def generateStream(self, viewer):
+		try:
+			while viewer["generation"] == self.viewersGeneration:
+				chunk = viewer["response"].read1(self.chunkSize)
+				if not chunk:
+					break
+				yield chunk
+		finally:
+			self.closeViewer(viewer)
+
+	"""
+	Closes the upstream stream of a viewer, once
+
+	@param (dict) viewer
+	"""
+	def closeViewer(self, viewer):
+		with self.lock:
+			if viewer["closed"]:
+				return
+			viewer["closed"] = True
+			self.viewersCount -= 1
+			self.lastViewerLeftAt = time.time()
+		viewer["response"].close()
+
+	"""
+	Disconnects the connected viewers, on their next chunk
+	"""
+	def closeViewers(self):
+		with self.lock:
+			self.viewersGeneration += 1
+
+	"""
+	Gets the amount of the connected viewers
+
+	@return (int)
+	"""
+	def getViewersCount(self):
+		with self.lock:
+			return self.viewersCount
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import urllib.request
+
+"""
+Controls a resident motion service through its local web control interface
+
+@see: https://motion-project.github.io/motion_config.html#webcontrol_port
+"""
+class MotionControlClient():
+
+	"""
+	Constructor
+
+	@param (dict) settings, {motionControlUrl, motionCameraId, motionControlTimeout}
+	"""
+	def __init__(self, settings):
+		self.controlUrl = settings["motionControlUrl"].rstrip("/")
+		self.cameraId = str(settings["motionCameraId"])
+		self.timeout = settings["motionControlTimeout"]
+
+	"""
+	Pauses the motion detection, motion keeps the camera and serves its stream
+	"""
+	def pause(self):
+		self.requestAction("detection/pause")
+
+	"""
+	Resumes the motion detection
+	"""
+	def resume(self):
+		self.requestAction("detection/start")
+
+	"""
+	Checks if the motion detection is active
+
+	@return (bool)
+	"""
+	def isActive(self):
+		status = self.requestAction("detection/status")
+		if "ACTIVE" in status:
+			return True
+		if "PAUSE" in status:
+			return False
+		raise Exception("MotionControlClient: unknown detection status: "+status.strip())
+
+	"""
+	Requests a web control action
+
+	@throws (Exception) if motion is not reachable
+	@param (string) action, eg. detection/status
+	@return (string) response text
+	"""
+	def requestAction(self, action):
+		with urllib.request.urlopen(self.controlUrl+"/"+self.cameraId+"/"+action, timeout=self.timeout) as response:
+			return response.read().decode("utf-8", "replace")
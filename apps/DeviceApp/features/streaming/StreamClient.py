@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+import time
+from collections import deque
+
+"""
+A connected stream viewer, with a bounded queue of frames waiting to be sent
+
+A slow viewer does not hold back the others: when the queue is full the oldest frame is dropped
+"""
+class StreamClient():
+
+	"""
+	Constructor
+
+	@param (int) queueSize, max amount of frames waiting to be sent
+	"""
+	def __init__(self, queueSize):
+		self.frames = deque(maxlen=max(1, int(queueSize)))
+		self.condition = threading.Condition()
+		self.closed = False
+		self.connectedAt = time.time()
+		self.sentFramesCount = 0
+		self.droppedFramesCount = 0
+
+	"""
+	Queues a frame, drops the oldest queued frame if the queue is full
+
+	@param (bytes) frame
+	"""
+	def push(self, frame):
+		with self.condition:
+			if len(self.frames) == self.frames.maxlen:
+				self.droppedFramesCount += 1
+			self.frames.append(frame)
+			self.condition.notify()
+
+	"""
+	Waits for the next frame
+
+	@param (float) timeout = None, seconds
+	@return (bytes|None) frame, None on timeout or when closed
+	"""
+	def getFrame(self, timeout = None):
+		with self.condition:
+			if not self.condition.wait_for(lambda: self.closed or len(self.frames) > 0, timeout):
+				return None
+			if self.closed:
+				return None
+			self.sentFramesCount += 1
+			return self.frames.popleft()
+
+	"""
+	Closes the client, wakes up the waiting sender
+	"""
+	def close(self):
+		with self.condition:
+			self.closed = True
+			self.frames.clear()
+			self.condition.notify_all()
+
+	"""
+	Checks if the client is closed
+
+	@return (bool)
+	"""
+	def isClosed(self):
+		return self.closed
@@ -3,7 +3,8 @@
 @author lsipii
 """
 from datetime import datetime
-import sh
+from apps.utils.FileSystem import copyFile
+from apps.utils.Utils import getProjectRootPath
 
 class Camera():
 
@@ -52,7 +53,24 @@ class Camera():
 	@param (string) savePath
 	"""
 	def takeADebugPhoto(self, savePath):
-		sh.cp("./apps/DeviceApp/data/testimages/5aa2867e.jpg", savePath)
+		copyFile(self.getDebugPhotoPath(), savePath)
+
+	"""
+	Fakes a photoshoot to memory
+
+	@return (bytes) frame
+	"""
+	def readDebugPhoto(self):
+		with open(self.getDebugPhotoPath(), "rb") as imageFile:
+			return imageFile.read()
+
+	"""
+	Gets the fake photo path
+
+	@return (string) imagePath
+	"""
+	def getDebugPhotoPath(self):
+		return getProjectRootPath()+"/apps/DeviceApp/data/testimages/5aa2867e.jpg"
 
 	"""
 	Start shooting
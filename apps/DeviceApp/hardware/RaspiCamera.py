@@ -3,9 +3,8 @@
 @author lsipii
 """
 
-import sh
-
 from apps.DeviceApp.hardware.Camera import Camera
+from apps.DeviceApp.hardware.capture.CaptureEngineFactory import CaptureEngineFactory
 
 class RaspiCamera(Camera):
 
@@ -16,6 +15,17 @@ class RaspiCamera(Camera):
 	"""
 	shellApplicationRequirements = ["raspistill"]
 
+	"""
+	Raspberry camera module initialization
+
+	@param (bool) debugMode
+	@param (dict) appSettings = None, {camera}
+	"""
+	def __init__(self, debugMode = False, appSettings = None):
+		super().__init__(debugMode)
+		self.captureEngine = CaptureEngineFactory.getInstance(appSettings, debugMode)
+		self.shellApplicationRequirements = self.captureEngine.shellApplicationRequirements
+
 	"""
 	Takes a photo
 
@@ -25,7 +35,28 @@ class RaspiCamera(Camera):
 		if self.shellApplicationRequirementsMet:
 			if self.debugMode:
 				print("Taking a real photo")
-			sh.raspistill('-w', '640', '-h', '480', '-o', savePath)
+			self.captureEngine.captureToFile(savePath)
 		elif self.debugMode:
 			print("Taking a fake photo")
-			self.takeADebugPhoto(savePath)
\ No newline at end of file
+			self.takeADebugPhoto(savePath)
+
+	"""
+	Captures a JPEG frame
+
+	@return (bytes) frame
+	"""
+	def captureFrame(self):
+		if self.shellApplicationRequirementsMet:
+			return self.captureEngine.captureFrame()
+		elif self.debugMode:
+			return self.readDebugPhoto()
+		raise Exception("RaspiCamera.captureFrame(): camera requirements not met")
+
+	"""
+	Sets debug mode
+	
+	@param (bool) debugMode
+	"""
+	def setDebugMode(self, debugMode):
+		super().setDebugMode(debugMode)
+		self.captureEngine.setDebugMode(debugMode)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+
+"""
+Camera capture engine abstraction, the thing that actually gets the frames out of the sensor
+"""
+class CaptureEngine():
+
+	"""
+	List of shell apps that we require
+
+	@var (array) shellApplicationRequirements
+	"""
+	shellApplicationRequirements = []
+
+	"""
+	Capture engine initialization
+
+	@param (dict) settings, {width, height, ...}
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, settings, debugMode = False):
+		self.settings = settings
+		self.debugMode = debugMode
+
+	"""
+	Starts the camera session, if the engine has one
+	"""
+	def start(self):
+		pass
+
+	"""
+	Stops the camera session, if the engine has one
+	"""
+	def stop(self):
+		pass
+
+	"""
+	Checks if the camera session is up
+
+	@return (bool)
+	"""
+	def isRunning(self):
+		return True
+
+	"""
+	Captures a JPEG frame
+
+	@return (bytes) frame
+	"""
+	def captureFrame(self):
+		raise Exception("CaptureEngine.captureFrame(): Must be implemented")
+
+	"""
+	Captures a JPEG frame to a file
+
+	@param (string) savePath
+	"""
+	def captureToFile(self, savePath):
+		frame = self.captureFrame()
+		with open(savePath, "wb") as imageFile:
+			imageFile.write(frame)
+
+	"""
+	Sets debug mode
+	
+	@param (bool) debugMode
+	"""
+	def setDebugMode(self, debugMode):
+		self.debugMode = debugMode
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+from apps.utils.Utils import getSettingsGroup
+
+class CaptureEngineFactory():
+
+	"""
+	Default camera settings
+
+	@var (dict) defaultSettings
+	"""
+	defaultSettings = {
+		"captureEngine": "warm",
+		"command": "raspistill",
+		"width": 640,
+		"height": 480,
+		"quality": 85,
+		"warmUpSeconds": 2,
+		"captureTimeout": 10,
+		"fakeImagePath": None,
+		"fakeLatencySeconds": 0,
+		"syntheticSource": "directory",
+		"syntheticImagesPath": None,
+		"syntheticFramesCount": 16,
+	}
+
+	"""
+	Creates a capture engine instance
+
+	@param (dict) appSettings
+	@param (bool) debugMode = False
+	@param (string) wantsToHaveThisEngine = None
+	@return (CaptureEngine) captureEngine
+	"""
+	@staticmethod
+	def getInstance(appSettings, debugMode = False, wantsToHaveThisEngine = None):
+
+		cameraSettings = CaptureEngineFactory.getCameraSettings(appSettings)
+
+		if wantsToHaveThisEngine is None:
+			captureEngine = cameraSettings["captureEngine"]
+		else:
+			captureEngine = wantsToHaveThisEngine
+
+		if captureEngine == "warm":
+			from apps.DeviceApp.hardware.capture.WarmRaspistillCaptureEngine import WarmRaspistillCaptureEngine
+			return WarmRaspistillCaptureEngine(cameraSettings, debugMode)
+		elif captureEngine == "raspistill":
+			from apps.DeviceApp.hardware.capture.RaspistillCaptureEngine import RaspistillCaptureEngine
+			return RaspistillCaptureEngine(cameraSettings, debugMode)
+		elif captureEngine == "fake":
+			from apps.DeviceApp.hardware.capture.FakeCaptureEngine import FakeCaptureEngine
+			return FakeCaptureEngine(cameraSettings, debugMode)
+		elif captureEngine == "synthetic":
+			from apps.DeviceApp.hardware.capture.SyntheticCaptureEngine import SyntheticCaptureEngine
+			return SyntheticCaptureEngine(cameraSettings, debugMode)
+		else:
+			raise Exception("Capture engine "+captureEngine+" not found")
+
+	"""
+	Gets the camera settings merged over the defaults
+
+	@param (dict) appSettings
+	@return (dict) cameraSettings
+	"""
+	@staticmethod
+	def getCameraSettings(appSettings):
+		return getSettingsGroup(appSettings, "camera", CaptureEngineFactory.defaultSettings)
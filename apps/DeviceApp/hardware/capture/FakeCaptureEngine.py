@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import time
+
+from apps.DeviceApp.hardware.capture.CaptureEngine import CaptureEngine
+from apps.utils.Utils import getProjectRootPath
+
+"""
+Serves a fixed test image as the captured frame, for running without a Pi camera
+"""
+class FakeCaptureEngine(CaptureEngine):
+
+	"""
+	Capture engine initialization
+
+	@param (dict) settings, {fakeImagePath, fakeLatencySeconds}
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, settings, debugMode = False):
+		super().__init__(settings, debugMode)
+		self.frame = None
+		self.capturesCount = 0
+
+	"""
+	Captures a JPEG frame
+
+	@return (bytes) frame
+	"""
+	def captureFrame(self):
+		if self.frame is None:
+			with open(self.getFakeImagePath(), "rb") as imageFile:
+				self.frame = imageFile.read()
+
+		if self.settings["fakeLatencySeconds"] > 0:
+			time.sleep(self.settings["fakeLatencySeconds"])
+
+		self.capturesCount += 1
+		return self.frame
+
+	"""
+	Gets the served image path
+
+	@return (string) imagePath
+	"""
+	def getFakeImagePath(self):
+		if self.settings["fakeImagePath"] is not None:
+			return self.settings["fakeImagePath"]
+		return getProjectRootPath()+"/apps/DeviceApp/data/testimages/5aa2867e.jpg"
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import subprocess
+
+from apps.DeviceApp.hardware.capture.CaptureEngine import CaptureEngine
+
+"""
+Spawns a raspistill process per capture, the camera warms up on every shot
+"""
+class RaspistillCaptureEngine(CaptureEngine):
+
+	"""
+	List of shell apps that we require
+
+	@var (array) shellApplicationRequirements
+	"""
+	shellApplicationRequirements = ["raspistill"]
+
+	"""
+	Captures a JPEG frame
+
+	@return (bytes) frame
+	"""
+	def captureFrame(self):
+		return subprocess.check_output([
+			self.settings["command"],
+			"-w", str(self.settings["width"]),
+			"-h", str(self.settings["height"]),
+			"-o", "-"
+		])
+
+	"""
+	Captures a JPEG frame to a file
+
+	@param (string) savePath
+	"""
+	def captureToFile(self, savePath):
+		subprocess.check_call([
+			self.settings["command"],
+			"-w", str(self.settings["width"]),
+			"-h", str(self.settings["height"]),
+			"-o", savePath
+		])
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import glob
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from apps.DeviceApp.hardware.capture.CaptureEngine import CaptureEngine
+from apps.utils.Utils import getProjectRootPath
+
+"""
+Produces frames in memory for load testing the device pipeline without a Pi camera
+
+The frames are encoded once at the start, either from the test images directory or procedurally generated,
+at the configured resolution, a capture then costs only the configured sensor latency
+"""
+class SyntheticCaptureEngine(CaptureEngine):
+
+	"""
+	Image files accepted from the images directory
+
+	@var (array) imageFilePatterns
+	"""
+	imageFilePatterns = ["*.jpg", "*.jpeg", "*.png"]
+
+	"""
+	Capture engine initialization
+
+	@param (dict) settings, {width, height, quality, syntheticSource, syntheticImagesPath, syntheticFramesCount, fakeLatencySeconds}
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, settings, debugMode = False):
+		super().__init__(settings, debugMode)
+		self.frames = None
+		self.frameIndex = 0
+		self.capturesCount = 0
+		self.lock = threading.Lock()
+
+	"""
+	Prepares the frames
+	"""
+	def start(self):
+		with self.lock:
+			if self.frames is not None:
+				return
+			if self.settings["syntheticSource"] == "procedural":
+				images = self.generateImages()
+			else:
+				images = self.readImages()
+			self.frames = [self.encodeImage(image) for image in images]
+
+	"""
+	Checks if the frames are prepared
+
+	@return (bool)
+	"""
+	def isRunning(self):
+		return self.frames is not None
+
+	"""
+	Captures a JPEG frame, cycles through the prepared frames
+
+	@return (bytes) frame
+	"""
+	def captureFrame(self):
+		self.start()
+
+		if self.settings["fakeLatencySeconds"] > 0:
+			time.sleep(self.settings["fakeLatencySeconds"])
+
+		with self.lock:
+			frame = self.frames[self.frameIndex]
+			self.frameIndex = (self.frameIndex + 1) % len(self.frames)
+			self.capturesCount += 1
+		return frame
+
+	"""
+	Reads the images directory, resized to the frame size
+
+	@return (array) images
+	"""
+	def readImages(self):
+		imagesPath = self.settings["syntheticImagesPath"]
+		if imagesPath is None:
+			imagesPath = getProjectRootPath()+"/apps/DeviceApp/data/testimages"
+
+		imagePaths = []
+		for imageFilePattern in self.imageFilePatterns:
+			imagePaths.extend(glob.glob(os.path.join(imagesPath, imageFilePattern)))
+
+		images = []
+		for imagePath in sorted(imagePaths):
+			image = cv2.imread(imagePath, cv2.IMREAD_COLOR)
+			if image is not None:
+				images.append(cv2.resize(image, (self.settings["width"], self.settings["height"]), interpolation=cv2.INTER_AREA))
+
+		if len(images) == 0:
+			raise Exception("SyntheticCaptureEngine: no images found from "+imagesPath)
+		return images
+
+	"""
+	Generates images of a dark pot moving over a gradient, with sensor noise
+
+	@return (array) images
+	"""
+	def generateImages(self):
+		width = self.settings["width"]
+		height = self.settings["height"]
+		framesCount = max(1, self.settings["syntheticFramesCount"])
+		randomGenerator = np.random.default_rng(0)
+
+		gradient = np.linspace(60, 200, width, dtype=np.float32)
+		background = np.empty((height, width, 3), dtype=np.uint8)
+		background[:] = gradient.astype(np.uint8)[np.newaxis, :, np.newaxis]
+
+		images = []
+		for frameNumber in range(framesCount):
+			image = background.copy()
+			potWidth = max(4, width // 8)
+			potHeight = max(4, height // 3)
+			potX = int((width - potWidth) * frameNumber / framesCount)
+			potY = height // 2 - potHeight // 2
+			cv2.rectangle(image, (potX, potY), (potX + potWidth, potY + potHeight), (20, 30, 40), -1)
+			noise = randomGenerator.integers(-8, 9, size=image.shape, dtype=np.int16)
+			images.append(np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8))
+		return images
+
+	"""
+	Encodes an image as JPEG
+
+	@param (numpy.ndarray) image
+	@return (bytes) frame
+	"""
+	def encodeImage(self, image):
+		encodingSucceeded, encodedImage = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.settings["quality"]])
+		if not encodingSucceeded:
+			raise Exception("SyntheticCaptureEngine: could not encode a frame")
+		return encodedImage.tobytes()
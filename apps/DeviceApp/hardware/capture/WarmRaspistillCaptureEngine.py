@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import atexit
+import signal
+import subprocess
+import threading
+import time
+
+from apps.DeviceApp.hardware.capture.CaptureEngine import CaptureEngine
+from apps.utils.images.JpegStreamReader import JpegStreamReader
+
+"""
+Keeps one raspistill process resident in the signal mode, stills are triggered with SIGUSR1
+
+The sensor powers up and settles the exposure once, on the first capture,
+after that a capture costs about the sensor readout and the JPEG encoding
+
+@see: https://www.raspberrypi.org/documentation/raspbian/applications/camera.md
+"""
+class WarmRaspistillCaptureEngine(CaptureEngine):
+
+	"""
+	List of shell apps that we require
+
+	@var (array) shellApplicationRequirements
+	"""
+	shellApplicationRequirements = ["raspistill"]
+
+	"""
+	Capture engine initialization
+
+	@param (dict) settings, {command, width, height, quality, warmUpSeconds, captureTimeout}
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, settings, debugMode = False):
+		super().__init__(settings, debugMode)
+		self.process = None
+		self.frameReader = None
+		self.lock = threading.RLock()
+		self.exitHandlerRegistered = False
+
+	"""
+	Starts the resident raspistill process
+	"""
+	def start(self):
+		with self.lock:
+			if self.isRunning():
+				return
+
+			if self.debugMode:
+				print("Warming up the camera")
+
+			self.process = subprocess.Popen([
+				self.settings["command"],
+				"-s", # Signal mode, capture on SIGUSR1
+				"-t", "0", # Wait for the signals forever
+				"-n", # No preview
+				"-th", "none", # No exif thumbnail
+				"-e", "jpg",
+				"-q", str(self.settings["quality"]),
+				"-w", str(self.settings["width"]),
+				"-h", str(self.settings["height"]),
+				"-o", "-"
+			], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+			self.frameReader = JpegStreamReader(self.process.stdout, self.settings["captureTimeout"])
+
+			# SIGUSR1 kills the process until raspistill has set up its signal handler
+			time.sleep(self.settings["warmUpSeconds"])
+
+			if not self.exitHandlerRegistered:
+				atexit.register(self.stop)
+				self.exitHandlerRegistered = True
+
+	"""
+	Stops the resident raspistill process
+	"""
+	def stop(self):
+		with self.lock:
+			if self.process is not None:
+				if self.process.poll() is None:
+					self.process.terminate()
+					try:
+						self.process.wait(5)
+					except subprocess.TimeoutExpired:
+						self.process.kill()
+						self.process.wait()
+				self.process.stdout.close()
+			self.process = None
+			self.frameReader = None
+
+	"""
+	Checks if the raspistill process is alive
+
+	@return (bool)
+	"""
+	def isRunning(self):
+		return self.process is not None and self.process.poll() is None
+
+	"""
+	Captures a JPEG frame, starts the camera session if not yet running
+
+	@return (bytes) frame
+	"""
+	def captureFrame(self):
+		with self.lock:
+			self.start()
+			try:
+				self.process.send_signal(signal.SIGUSR1)
+				return self.frameReader.readFrame()
+			except Exception as e:
+				# Restart on the next capture, the stream state is unknown
+				self.stop()
+				raise e
@@ -3,9 +3,10 @@
 @author lsipii
 """
 import os
-import sh
 import glob
+import tempfile
 from apps.DeviceApp.hardware.storage.MediaStorage import MediaStorage
+from apps.utils.FileSystem import ensureDirectory, moveFile
 
 class LocalStorage(MediaStorage):
 
@@ -54,20 +55,41 @@ class LocalStorage(MediaStorage):
 			raise Exception("No writing access to "+self.configurations[self.driver]["mediaDirectory"])
 
 		# Ensure dir
-		sh.mkdir("-p", self.configurations[self.driver]["mediaDirectory"])	
+		ensureDirectory(self.configurations[self.driver]["mediaDirectory"])
 		
 	
 	"""
 	Saves the image file
 	"""
 	def saveImageFile(self):
-		sh.mv(self.getTemprorayMediaFilePath(), self.getMediaFilePath())
+		moveFile(self.getTemprorayMediaFilePath(), self.getMediaFilePath())
+
+	"""
+	Saves the in-memory image, written once next to the target and renamed in place
+	
+	@param (bytes|memoryview) imageData, JPEG
+	"""
+	def saveImageData(self, imageData):
+		mediaPath = self.getMediaFilePath()
+		partialFileDescriptor, partialPath = tempfile.mkstemp(suffix=".part", dir=os.path.dirname(mediaPath))
+		try:
+			with os.fdopen(partialFileDescriptor, "wb") as imageFile:
+				imageFile.write(imageData)
+			os.chmod(partialPath, 0o644)
+			os.replace(partialPath, mediaPath)
+		except Exception as e:
+			if os.path.exists(partialPath):
+				os.unlink(partialPath)
+			raise e
 
 	"""
 	Clears media folder from files
+
+	@param (list) keptFilenames = None, the media filenames not cleared, eg. the photo of the latest answer
 	"""
-	def clearPreviousMediaFiles(self):
+	def clearPreviousMediaFiles(self, keptFilenames = None):
+		keptFilenames = keptFilenames or []
 		files = glob.glob(self.configurations[self.driver]["mediaDirectory"]+"/*")
 		for f in files:
-			if os.path.isfile(f):
+			if os.path.isfile(f) and os.path.basename(f) not in keptFilenames:
 				os.unlink(f)
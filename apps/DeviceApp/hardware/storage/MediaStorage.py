@@ -40,7 +40,7 @@ class MediaStorage():
 	"""
 	def setupMediaFilename(self):
 
-		stampBase64 = "{0:x}".format(int(time.time()))
+		stampBase64 = "{0:x}".format(int(time.time() * 1000))
 		self.configurations[self.driver]["mediaFilename"] = stampBase64+"."+self.imageExtension
 
 		if self.configurations[self.driver]["mediaDirectory"] is not None:
@@ -54,6 +54,14 @@ class MediaStorage():
 	def saveImageFile(self):
 		raise Exception("Must be implemented")
 
+	"""
+	Saves the in-memory image
+
+	@param (bytes|memoryview) imageData, JPEG
+	"""
+	def saveImageData(self, imageData):
+		raise Exception("Must be implemented")
+
 	"""
 	Validates we'r good to go
 	"""
@@ -110,8 +118,10 @@ class MediaStorage():
 
 	"""
 	Clears media folder from files
+
+	@param (list) keptFilenames = None, the media filenames not cleared, eg. the photo of the latest answer
 	"""
-	def clearPreviousMediaFiles(self):
+	def clearPreviousMediaFiles(self, keptFilenames = None):
 		raise Exception("Must be implemented")	
 
 	"""
@@ -132,8 +142,8 @@ class MediaStorage():
 	@return (bin string) imageRead
 	"""
 	def readImageAsBinary(self):
-		image = self.getImageFileObj()
-		imageRead = image.read()
+		with self.getImageFileObj() as image:
+			imageRead = image.read()
 		return imageRead
 
 
@@ -2,6 +2,7 @@
 """
 @author lsipii
 """
+import io
 import boto3
 from apps.DeviceApp.hardware.storage.MediaStorage import MediaStorage
 
@@ -66,8 +67,10 @@ class S3Storage(MediaStorage):
 		
 	"""
 	Clears media folder from files
+
+	@param (list) keptFilenames = None, the media filenames not cleared
 	"""
-	def clearPreviousMediaFiles(self):
+	def clearPreviousMediaFiles(self, keptFilenames = None):
 		"""
 		Disabled because GC happens with cron runs
 
@@ -106,8 +109,25 @@ class S3Storage(MediaStorage):
 	Saves the image file
 	"""
 	def saveImageFile(self):
+		with self.getImageFileObj() as imageFileObj:
+			self.uploadImageFileObj(imageFileObj)
+
+	"""
+	Saves the in-memory image
+
+	@param (bytes|memoryview) imageData, JPEG
+	"""
+	def saveImageData(self, imageData):
+		self.uploadImageFileObj(io.BytesIO(imageData))
+
+	"""
+	Uploads the image
+
+	@param (FileObj) imageFileObj
+	"""
+	def uploadImageFileObj(self, imageFileObj):
 		self.s3client.upload_fileobj(
-			self.getImageFileObj(),
+			imageFileObj,
 			self.configurations[self.driver]["bucket"],
 			self.getMediaFilename(),
 			ExtraArgs={
@@ -2,7 +2,7 @@
 """
 @author lsipii
 """
-from flask import request
+from flask import request, Response
 from flask_responses import json_response
 
 class BaseController():
@@ -138,6 +138,29 @@ class BaseController():
 			response = {"message": "Undefined error"}
 		return json_response(response, status_code=responseCode)
 
+	"""
+	A multipart stream response, eg. MJPEG
+	
+	@param (generator) parts
+	@param (string) boundary
+	@param (string) mimeType = "multipart/x-mixed-replace"
+	@return (Response)
+	"""
+	def getMultipartStreamResponse(self, parts, boundary, mimeType = "multipart/x-mixed-replace"):
+		return self.getStreamedResponse(parts, mimeType+"; boundary="+boundary)
+
+	"""
+	A streamed response, not cached
+	
+	@param (generator) parts
+	@param (string) contentType
+	@return (Response)
+	"""
+	def getStreamedResponse(self, parts, contentType):
+		response = Response(parts, content_type=contentType)
+		response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+		return response
+
 
 	"""
 	Gets the request method
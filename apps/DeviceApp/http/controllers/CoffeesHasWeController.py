@@ -81,11 +81,16 @@ class CoffeesHasWeController(BaseController):
 			if self.debugMode:
 				print("Sending slack notification..")
 			try:
-				self.notifier.notify(notifyResponse)
+				with self.coffeeChecker.latencyStats.measure("notify"):
+					self.notifier.notify(notifyResponse)
 				notifyResponse["sent"] = True
 			except Exception:
 				notifyResponse["sent"] = False
 
+			# The verdict follows when resolved
+			if coffeeResponse.get("resolved") is False and self.coffeeChecker.asyncResolution.shouldSendFollowUpNotifications():
+				self.coffeeChecker.asyncResolution.onResolved(coffeeResponse["observationId"], lambda result: self.notifier.notify(self.notifier.generateFollowUpPayload(result, requestParams)))
+
 		return self.getJsonResponse({
 			"coffee": coffeeResponse,
 			"notify": notifyResponse
@@ -95,14 +100,71 @@ class CoffeesHasWeController(BaseController):
 	Basic a very much of a intresting response, or maybe something different
 	
 	@param (string) path = None
-	@return (BaseController response) {status, streaming}
+	@return (BaseController response) {status, streaming, stream, latencies, scheduler, observationFlight, coffeeLevel, asyncResolution}
 	"""
 	def getCoffeeAppStatusReponse(self):
 		return self.getJsonResponse({
 			"status": "OK",
-			"streaming": self.coffeeChecker.areWeCurrentlyStreaming()
+			"streaming": self.coffeeChecker.areWeCurrentlyStreaming(),
+			"stream": self.coffeeChecker.cameraStreamer.getStreamingStatus(),
+			"latencies": self.coffeeChecker.latencyStats.getSummary(),
+			"scheduler": self.coffeeChecker.observationScheduler.getStatus(),
+			"observationFlight": self.coffeeChecker.observationFlight.getStatus(),
+			"coffeeLevel": self.coffeeChecker.coffeeSituationResolver.coffeeLevelTracker.getStatus(),
+			"asyncResolution": self.coffeeChecker.asyncResolution.getStatus()
 		})
 
+	"""
+	The coffee situation of an observation, resolved in the background
+
+	@param (string) observationId
+	@return (BaseController response) {observation}
+	"""
+	def getObservationResponse(self, observationId):
+
+		requestMethod=self.getRequestMethod()
+		requestParams=self.getRequestParams()
+
+		try:
+			self.accessChecker.throttleRequest(requestMethod, requestParams) # throws
+			if not self.accessChecker.ifAccessGranted(requestParams, requestMethod):
+				return self.getAccessDeniedResponse()
+		except RequestException as e:
+			return self.getErrorResponse(e.message, e.code)
+
+		result = self.coffeeChecker.asyncResolution.getResult(observationId)
+		if result is None:
+			return self.getNotFoundResponse()
+		return self.getJsonResponse({
+			"observation": result
+		})
+
+	"""
+	The MJPEG stream, the in-process stream or the motion stream passed through, open for the viewers like the motion stream
+	
+	@return (BaseController response)
+	"""
+	def getStreamResponse(self):
+		cameraStreamer = self.coffeeChecker.cameraStreamer
+		if not cameraStreamer.areWeCurrentlyStreaming():
+			return self.getNotFoundResponse()
+
+		if cameraStreamer.isInProcessStreaming():
+			frameBroadcaster = cameraStreamer.frameBroadcaster
+			return self.getMultipartStreamResponse(frameBroadcaster.generateMultipartStream(), frameBroadcaster.boundary)
+
+		try:
+			contentType, parts, closeStream = cameraStreamer.motionStreamProxy.open()
+		except Exception as e:
+			if self.debugMode:
+				print("Opening the motion stream failed: "+str(e))
+			return self.getErrorResponse("Stream not available", 503)
+
+		# Closed also when the viewer leaves before the first chunk
+		response = self.getStreamedResponse(parts, contentType)
+		response.call_on_close(closeStream)
+		return response
+
 	"""
 	Basic a very much of a intresting response, or maybe something different
 	
@@ -130,6 +192,12 @@ class CoffeesHasWeController(BaseController):
 		self.accessChecker.setDebugMode(self.debugMode)
 		self.coffeeChecker.setDebugMode(self.debugMode)
 
+	"""
+	Starts the background services
+	"""
+	def startBackgroundServices(self):
+		self.coffeeChecker.startBackgroundServices()
+
 	"""
 	Validate app runtime
 	"""
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+import time
+
+"""
+Caches the result of a slow state probe, eg. a network call, refreshed periodically in the background
+
+The readers get the cached state without waiting, a failing probe keeps the previous state,
+a probe started before the state was set is discarded as stale
+"""
+class CachedProbe():
+
+	"""
+	Constructor
+
+	@param (callable) probe, returns the state
+	@param (float) refreshInterval, seconds between the background refreshes
+	@param (mixed) defaultValue = None, the state until the first successful probe
+	@param (bool) debugMode = False
+	"""
+	def __init__(self, probe, refreshInterval, defaultValue = None, debugMode = False):
+		self.probe = probe
+		self.refreshInterval = refreshInterval
+		self.debugMode = debugMode
+
+		self.lock = threading.Lock()
+		self.value = defaultValue
+		self.probedAt = None
+		self.lastError = None
+		self.setCount = 0
+		self.refreshThread = None
+		self.refreshStopper = threading.Event()
+
+	"""
+	Gets the cached state, probes once if never probed
+
+	@return (mixed) value
+	"""
+	def get(self):
+		if self.probedAt is None and self.lastError is None:
+			return self.refresh()
+		return self.value
+
+	"""
+	Sets the state, eg. after changing it ourselves
+
+	@param (mixed) value
+	"""
+	def set(self, value):
+		with self.lock:
+			self.value = value
+			self.probedAt = time.time()
+			self.setCount += 1
+
+	"""
+	Probes the state now
+
+	@return (mixed) value, the previous value if the probe fails or the state was set meanwhile
+	"""
+	def refresh(self):
+		setCount = self.setCount
+		try:
+			value = self.probe()
+		except Exception as e:
+			self.lastError = str(e)
+			if self.debugMode:
+				print("State probe failed: "+self.lastError)
+			return self.value
+		with self.lock:
+			self.lastError = None
+			if self.setCount != setCount:
+				return self.value
+			self.value = value
+			self.probedAt = time.time()
+			return value
+
+	"""
+	Gets the age of the cached state
+
+	@return (float|None) seconds, None if never probed
+	"""
+	def getAge(self):
+		probedAt = self.probedAt
+		if probedAt is None:
+			return None
+		return time.time() - probedAt
+
+	"""
+	Starts the background refreshing, if not yet running
+	"""
+	def start(self):
+		if self.refreshThread is not None and self.refreshThread.is_alive():
+			return
+		self.refreshStopper.clear()
+		self.refreshThread = threading.Thread(target=self.runRefresh, name="CachedProbe", daemon=True)
+		self.refreshThread.start()
+
+	"""
+	Stops the background refreshing
+	"""
+	def stop(self):
+		self.refreshStopper.set()
+		if self.refreshThread is not None:
+			self.refreshThread.join()
+			self.refreshThread = None
+
+	"""
+	The background refresh loop
+	"""
+	def runRefresh(self):
+		while not self.refreshStopper.is_set():
+			self.refresh()
+			self.refreshStopper.wait(self.refreshInterval)
+
+	"""
+	Sets debug mode
+
+	@param (bool) debugMode
+	"""
+	def setDebugMode(self, debugMode):
+		self.debugMode = debugMode
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+
+In-process file and process operations, no shell apps are forked
+"""
+import os
+import shutil
+import tempfile
+
+"""
+Ensures a directory exists, like mkdir -p
+
+@param (string) directoryPath
+"""
+def ensureDirectory(directoryPath):
+	os.makedirs(directoryPath, exist_ok=True)
+
+"""
+Moves a file, atomically within a filesystem, by a copy and a rename across filesystems
+
+@param (string) sourcePath
+@param (string) targetPath
+"""
+def moveFile(sourcePath, targetPath):
+	try:
+		os.replace(sourcePath, targetPath)
+	except OSError as e:
+		import errno
+		if e.errno != errno.EXDEV:
+			raise e
+		copyFile(sourcePath, targetPath)
+		os.unlink(sourcePath)
+
+"""
+Copies a file, the target appears atomically
+
+@param (string) sourcePath
+@param (string) targetPath
+"""
+def copyFile(sourcePath, targetPath):
+	partialFileDescriptor, partialPath = tempfile.mkstemp(suffix=".part", dir=os.path.dirname(os.path.abspath(targetPath)))
+	try:
+		with os.fdopen(partialFileDescriptor, "wb") as targetFile, open(sourcePath, "rb") as sourceFile:
+			shutil.copyfileobj(sourceFile, targetFile)
+		shutil.copymode(sourcePath, partialPath)
+		os.replace(partialPath, targetPath)
+	except Exception as e:
+		if os.path.exists(partialPath):
+			os.unlink(partialPath)
+		raise e
+
+"""
+Checks if a process by the name is running, by scanning the procfs
+
+@param (string) processName, eg. motion
+@param (string) procPath = "/proc"
+@return (bool)
+"""
+def isProcessRunning(processName, procPath = "/proc"):
+	try:
+		processIds = [entry for entry in os.listdir(procPath) if entry.isdigit()]
+	except OSError:
+		return False
+
+	for processId in processIds:
+		try:
+			with open(os.path.join(procPath, processId, "comm"), "rb") as commFile:
+				# The comm is cut to 15 chars
+				if commFile.read().strip().decode("utf-8", "replace") == processName[:15]:
+					return True
+		except OSError:
+			continue # The process exited meanwhile
+	return False
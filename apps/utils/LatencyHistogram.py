@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import bisect
+import threading
+import time
+
+"""
+Rolling latency histogram with a fixed memory footprint
+
+The latencies are counted in log spaced buckets, so the percentiles are accurate to a bucket width (growthFactor),
+the rolling window is a ring of windowsCount sub windows, the oldest sub window is recycled as time goes by
+"""
+class LatencyHistogram():
+
+	"""
+	Constructor
+
+	@param (int) windowSeconds = 600, length of a sub window
+	@param (int) windowsCount = 6, amount of sub windows in the rolling window
+	@param (float) minSeconds = 0.0001, upper bound of the first bucket
+	@param (float) maxSeconds = 120, latencies above go to the overflow bucket
+	@param (float) growthFactor = 1.2, bucket upper bound growth
+	"""
+	def __init__(self, windowSeconds = 600, windowsCount = 6, minSeconds = 0.0001, maxSeconds = 120, growthFactor = 1.2):
+		self.windowSeconds = windowSeconds
+		self.windowsCount = windowsCount
+		self.lock = threading.Lock()
+
+		# Bucket upper bounds, the last bucket is the overflow bucket
+		self.bucketBounds = []
+		bucketBound = minSeconds
+		while bucketBound < maxSeconds:
+			self.bucketBounds.append(bucketBound)
+			bucketBound *= growthFactor
+		self.bucketBounds.append(maxSeconds)
+
+		self.windows = [[0] * (len(self.bucketBounds) + 1) for i in range(windowsCount)]
+		self.windowSlots = [None] * windowsCount
+		self.maxRecordedSeconds = 0
+
+	"""
+	Records a latency
+
+	@param (float) seconds
+	@param (float) now = None, unix timestamp
+	"""
+	def record(self, seconds, now = None):
+		if now is None:
+			now = time.time()
+		bucketIndex = bisect.bisect_left(self.bucketBounds, seconds)
+		with self.lock:
+			self.getWindow(now)[bucketIndex] += 1
+			if seconds > self.maxRecordedSeconds:
+				self.maxRecordedSeconds = seconds
+
+	"""
+	Gets the sub window counts for the time, recycles an expired sub window
+
+	@param (float) now
+	@return (list) counts
+	"""
+	def getWindow(self, now):
+		slot = int(now // self.windowSeconds)
+		windowIndex = slot % self.windowsCount
+		if self.windowSlots[windowIndex] != slot:
+			self.windowSlots[windowIndex] = slot
+			window = self.windows[windowIndex]
+			for bucketIndex in range(len(window)):
+				window[bucketIndex] = 0
+		return self.windows[windowIndex]
+
+	"""
+	Gets the bucket counts summed over the rolling window
+
+	@param (float) now = None, unix timestamp
+	@return (list) counts
+	"""
+	def getCounts(self, now = None):
+		if now is None:
+			now = time.time()
+		oldestSlot = int(now // self.windowSeconds) - self.windowsCount + 1
+		counts = [0] * (len(self.bucketBounds) + 1)
+		with self.lock:
+			for windowIndex, slot in enumerate(self.windowSlots):
+				if slot is not None and slot >= oldestSlot:
+					for bucketIndex, count in enumerate(self.windows[windowIndex]):
+						counts[bucketIndex] += count
+		return counts
+
+	"""
+	Gets the latency percentiles of the rolling window
+
+	@param (list) percentiles, eg. [50, 95, 99]
+	@param (float) now = None, unix timestamp
+	@return (dict) {count, percentiles: {percentile: seconds|None}}
+	"""
+	def getPercentiles(self, percentiles, now = None):
+		counts = self.getCounts(now)
+		totalCount = sum(counts)
+		results = {}
+
+		for percentile in percentiles:
+			results[percentile] = None
+			if totalCount == 0:
+				continue
+			rank = max(1, int(round(totalCount * percentile / 100.0)))
+			cumulativeCount = 0
+			for bucketIndex, count in enumerate(counts):
+				cumulativeCount += count
+				if cumulativeCount >= rank:
+					if bucketIndex < len(self.bucketBounds):
+						results[percentile] = self.bucketBounds[bucketIndex]
+					else:
+						results[percentile] = self.maxRecordedSeconds
+					break
+
+		return {
+			"count": totalCount,
+			"percentiles": results,
+		}
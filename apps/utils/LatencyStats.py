@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from apps.utils.LatencyHistogram import LatencyHistogram
+from apps.utils.Utils import getSettingsGroup
+
+"""
+Latency histograms by a stage name, eg. capture, blur, resolve, store, notify
+"""
+class LatencyStats():
+
+	"""
+	Default settings
+
+	@var (dict) defaultSettings
+	"""
+	defaultSettings = {
+		"windowSeconds": 600,
+		"windowsCount": 6,
+	}
+
+	"""
+	Constructor
+
+	@param (dict) appSettings = None, {latencyStats}
+	"""
+	def __init__(self, appSettings = None):
+		self.settings = getSettingsGroup(appSettings, "latencyStats", self.defaultSettings)
+		self.histograms = {}
+		self.lock = threading.Lock()
+
+	"""
+	Records a stage latency
+
+	@param (string) stageName
+	@param (float) seconds
+	"""
+	def record(self, stageName, seconds):
+		self.getHistogram(stageName).record(seconds)
+
+	"""
+	Measures the latency of the with-block as a stage
+
+	@param (string) stageName
+	"""
+	@contextmanager
+	def measure(self, stageName):
+		startTime = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.record(stageName, time.perf_counter() - startTime)
+
+	"""
+	Gets the stage histogram, creates if not yet existing
+
+	@param (string) stageName
+	@return (LatencyHistogram)
+	"""
+	def getHistogram(self, stageName):
+		with self.lock:
+			if stageName not in self.histograms:
+				self.histograms[stageName] = LatencyHistogram(self.settings["windowSeconds"], self.settings["windowsCount"])
+			return self.histograms[stageName]
+
+	"""
+	Gets the stage latency summaries in milliseconds
+
+	@return (dict) {stageName: {count, p50, p95, p99}}
+	"""
+	def getSummary(self):
+		with self.lock:
+			histograms = dict(self.histograms)
+
+		summary = {}
+		for stageName, histogram in histograms.items():
+			stagePercentiles = histogram.getPercentiles([50, 95, 99])
+			summary[stageName] = {"count": stagePercentiles["count"]}
+			for percentile, seconds in stagePercentiles["percentiles"].items():
+				summary[stageName]["p"+str(percentile)] = None if seconds is None else round(seconds * 1000, 1)
+		return summary
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+
+"""
+Coalesces concurrent calls by a key: the first caller runs the function,
+the callers arriving while it's in flight wait for and share its result
+
+@see: https://pkg.go.dev/golang.org/x/sync/singleflight
+"""
+class SingleFlight():
+
+	"""
+	Constructor
+	"""
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.callsInFlight = {}
+		self.callsCount = 0
+		self.joinedCallersCount = 0
+
+	"""
+	Runs the function, or joins the call already in flight by the key
+
+	@throws (Exception) the exception raised by the function
+	@param (string) key
+	@param (callable) function
+	@param (list) *args
+	@return (mixed) result
+	"""
+	def do(self, key, function, *args):
+
+		with self.lock:
+			call = self.callsInFlight.get(key)
+			weAreTheLeader = call is None
+			if weAreTheLeader:
+				call = SingleFlightCall()
+				self.callsInFlight[key] = call
+			else:
+				call.joinedCallersCount += 1
+
+		if weAreTheLeader:
+			try:
+				call.result = function(*args)
+			except Exception as e:
+				call.error = e
+			finally:
+				with self.lock:
+					del self.callsInFlight[key]
+					self.callsCount += 1
+					self.joinedCallersCount += call.joinedCallersCount
+				call.done.set()
+		else:
+			call.done.wait()
+
+		if call.error is not None:
+			raise call.error
+		return call.result
+
+	"""
+	Checks if a call is in flight by the key
+
+	@param (string) key
+	@return (bool)
+	"""
+	def isInFlight(self, key):
+		with self.lock:
+			return key in self.callsInFlight
+
+	"""
+	Gets the counts of the finished calls and of the callers who joined them instead of calling
+
+	@return (dict) {calls, joinedCallers}
+	"""
+	def getStatus(self):
+		with self.lock:
+			return {
+				"calls": self.callsCount,
+				"joinedCallers": self.joinedCallersCount,
+			}
+
+"""
+A single call in flight
+"""
+class SingleFlightCall():
+
+	"""
+	Constructor
+	"""
+	def __init__(self):
+		self.done = threading.Event()
+		self.result = None
+		self.error = None
+		self.joinedCallersCount = 0
@@ -45,4 +45,18 @@ def getProjectRootPath():
 	import os
 
 	dir = os.path.dirname(__file__)
-	return os.path.join(dir, '..', '..')
\ No newline at end of file
+	return os.path.join(dir, '..', '..')
+
+"""
+Gets a settings group merged over its defaults
+
+@param (dict) settings
+@param (string) groupName
+@param (dict) defaults
+@return (dict) groupSettings
+"""
+def getSettingsGroup(settings, groupName, defaults):
+	groupSettings = defaults.copy()
+	if settings is not None and groupName in settings and isinstance(settings[groupName], dict):
+		groupSettings.update(settings[groupName])
+	return groupSettings
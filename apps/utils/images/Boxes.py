@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+
+The boxes of the detected objects, (x, y, w, h) in the image coordinates
+"""
+
+"""
+Clips a box to the image
+
+@param (tuple) box, (x, y, w, h)
+@param (int) width
+@param (int) height
+@return (tuple) box
+"""
+def clipBox(box, width, height):
+	x, y, w, h = box
+	left = max(0, x)
+	top = max(0, y)
+	right = min(width, x + w)
+	bottom = min(height, y + h)
+	return (left, top, max(0, right - left), max(0, bottom - top))
+
+"""
+Calculates the intersection over union of two boxes
+
+@param (tuple) box, (x, y, w, h)
+@param (tuple) otherBox, (x, y, w, h)
+@return (float) intersectionOverUnion, 0 if the boxes do not overlap
+"""
+def intersectionOverUnion(box, otherBox):
+	intersectionWidth = min(box[0] + box[2], otherBox[0] + otherBox[2]) - max(box[0], otherBox[0])
+	intersectionHeight = min(box[1] + box[3], otherBox[1] + otherBox[3]) - max(box[1], otherBox[1])
+	if intersectionWidth <= 0 or intersectionHeight <= 0:
+		return 0
+	intersection = intersectionWidth * intersectionHeight
+	union = box[2] * box[3] + otherBox[2] * otherBox[3] - intersection
+	return intersection / union
+
+"""
+Checks if two boxes are of the same object, by their intersection over union
+
+@param (tuple) box, (x, y, w, h)
+@param (tuple) otherBox, (x, y, w, h)
+@param (float) minIntersectionOverUnion
+@return (bool)
+"""
+def isSameBox(box, otherBox, minIntersectionOverUnion):
+	return intersectionOverUnion(box, otherBox) >= minIntersectionOverUnion
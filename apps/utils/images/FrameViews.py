@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+
+try:
+	import cv2
+except ImportError:
+	cv2 = None
+
+"""
+The derived views of a frame, eg. the grayscale, shared by the filters and the resolver of an observation
+
+A view is computed on the first ask, at most once also when asked from several threads at the same time,
+the frame must not be modified while the views are in use. The views are freed with the last reference
+"""
+class FrameViews():
+
+	"""
+	Constructor
+
+	@param (numpy.ndarray) cvImage, BGR
+	"""
+	def __init__(self, cvImage):
+		if cv2 is None:
+			raise Exception("FrameViews: opencv is not installed")
+		self.cvImage = cvImage
+		self.views = {}
+		self.lock = threading.Lock()
+
+	"""
+	Gets the frame
+
+	@return (numpy.ndarray) cvImage, BGR
+	"""
+	def getImage(self):
+		return self.cvImage
+
+	"""
+	Gets the grayscale view
+
+	@return (numpy.ndarray) grayImage
+	"""
+	def getGray(self):
+		return self.getView("gray", lambda: cv2.cvtColor(self.cvImage, cv2.COLOR_BGR2GRAY) if self.cvImage.ndim == 3 else self.cvImage)
+
+	"""
+	Gets a view, computes it if not yet computed
+
+	@param (string) viewName
+	@param (callable) computeView
+	@return (numpy.ndarray) view
+	"""
+	def getView(self, viewName, computeView):
+		view = self.views.get(viewName)
+		if view is None:
+			with self.lock:
+				view = self.views.get(viewName)
+				if view is None:
+					view = computeView()
+					self.views[viewName] = view
+		return view
+
+	"""
+	Gets the names of the computed views
+
+	@return (array) viewNames
+	"""
+	def getComputedViewNames(self):
+		return list(self.views.keys())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import os
+import select
+
+"""
+Reads consecutive JPEG frames from a byte stream, eg. a camera apps stdout or a MJPEG http stream
+
+The frame ends are resolved by walking the JPEG marker segments,
+so an 0xFFD9 inside an exif block does not cut the frame short
+
+@see: https://en.wikipedia.org/wiki/JPEG#Syntax_and_structure
+"""
+class JpegStreamReader():
+
+	"""
+	Constructor
+
+	@param (FileObj) stream, binary stream
+	@param (float) timeout = None, seconds to wait for more data
+	@param (int) chunkSize = 65536
+	@param (bool) readRaw = True, reads the file descriptor directly, disable for the streams that have already buffered data, eg. http responses
+	"""
+	def __init__(self, stream, timeout = None, chunkSize = 65536, readRaw = True):
+		self.stream = stream
+		self.timeout = timeout
+		self.chunkSize = chunkSize
+		self.buffer = bytearray()
+
+		# Raw fd reads keep the select() timeouts honest, no hidden buffering
+		self.fileDescriptor = None
+		if readRaw:
+			try:
+				self.fileDescriptor = stream.fileno()
+			except Exception:
+				self.fileDescriptor = None
+
+	"""
+	Reads the next JPEG frame
+
+	@throws (Exception) on stream end or timeout
+	@return (bytes) frame
+	"""
+	def readFrame(self):
+
+		frameStart = self.findFrameStart()
+		position = frameStart + 2
+
+		while True:
+			self.ensureBuffered(position + 2)
+			if self.buffer[position] != 0xFF:
+				raise Exception("JpegStreamReader: corrupted JPEG stream")
+
+			marker = self.buffer[position + 1]
+			if marker == 0xFF: # Fill byte
+				position += 1
+				continue
+			if marker == 0xD9: # End of image
+				position += 2
+				break
+			if marker == 0x01 or (marker >= 0xD0 and marker <= 0xD7): # Standalone markers
+				position += 2
+				continue
+
+			# Marker segment with a length
+			self.ensureBuffered(position + 4)
+			segmentLength = (self.buffer[position + 2] << 8) | self.buffer[position + 3]
+			position += 2 + segmentLength
+
+			# Start of scan, skip the entropy coded data
+			if marker == 0xDA:
+				position = self.findEntropyCodedDataEnd(position)
+
+		frame = bytes(self.buffer[frameStart:position])
+		del self.buffer[:position]
+		return frame
+
+	"""
+	Finds the start of image marker, discards the junk before it
+
+	@return (int) position
+	"""
+	def findFrameStart(self):
+		searchFrom = 0
+		while True:
+			position = self.buffer.find(b"\xff\xd8", searchFrom)
+			if position > -1:
+				del self.buffer[:position]
+				return 0
+			searchFrom = max(len(self.buffer) - 1, 0)
+			self.readMore()
+
+	"""
+	Finds the first real marker after the entropy coded data
+
+	@param (int) position
+	@return (int) markerPosition
+	"""
+	def findEntropyCodedDataEnd(self, position):
+		while True:
+			markerPosition = self.buffer.find(b"\xff", position)
+			if markerPosition == -1 or markerPosition + 1 >= len(self.buffer):
+				position = len(self.buffer) if markerPosition == -1 else markerPosition
+				self.readMore()
+				continue
+
+			nextByte = self.buffer[markerPosition + 1]
+			if nextByte == 0x00 or (nextByte >= 0xD0 and nextByte <= 0xD7): # Stuffed byte or a restart marker
+				position = markerPosition + 2
+				continue
+			return markerPosition
+
+	"""
+	Ensures the buffer has at least the given amount of bytes
+
+	@param (int) length
+	"""
+	def ensureBuffered(self, length):
+		while len(self.buffer) < length:
+			self.readMore()
+
+	"""
+	Reads more data from the stream to the buffer
+
+	@throws (Exception) on stream end or timeout
+	"""
+	def readMore(self):
+		if self.fileDescriptor is not None:
+			if self.timeout is not None:
+				readable, writable, failed = select.select([self.fileDescriptor], [], [], self.timeout)
+				if not readable:
+					raise Exception("JpegStreamReader: timed out waiting for a frame")
+			chunk = os.read(self.fileDescriptor, self.chunkSize)
+		elif hasattr(self.stream, "read1"):
+			chunk = self.stream.read1(self.chunkSize)
+		else:
+			chunk = self.stream.read(self.chunkSize)
+
+		if not chunk:
+			raise Exception("JpegStreamReader: stream ended")
+		self.buffer.extend(chunk)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+
+Perceptual image hashing, similar looking images get hashes with a small Hamming distance
+
+@see: http://www.hackerfactor.com/blog/index.php?/archives/529-Kind-of-Like-That.html
+"""
+try:
+	import cv2
+	import numpy as np
+except Exception:
+	pass
+
+"""
+Calculates the difference hash (dHash) of a grayscale image
+
+@param (numpy.ndarray) grayImage
+@param (int) hashSize = 8, the hash has hashSize*hashSize bits
+@return (int) imageHash
+"""
+def differenceHash(grayImage, hashSize = 8):
+	resizedImage = cv2.resize(grayImage, (hashSize + 1, hashSize), interpolation=cv2.INTER_AREA)
+	differences = resizedImage[:, 1:] > resizedImage[:, :-1]
+	return int.from_bytes(np.packbits(differences.reshape(-1)).tobytes(), "big")
+
+"""
+Calculates the difference hash of a JPEG, decoded at 1/8 of the resolution
+
+@param (bytes|memoryview) jpegData
+@param (int) hashSize = 8
+@return (int) imageHash
+"""
+def differenceHashOfJpeg(jpegData, hashSize = 8):
+	grayImage = cv2.imdecode(np.frombuffer(jpegData, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+	if grayImage is None:
+		raise Exception("differenceHashOfJpeg(): could not decode the image")
+	return differenceHash(grayImage, hashSize)
+
+"""
+Counts the differing bits of two hashes
+
+@param (int) hashA
+@param (int) hashB
+@return (int) distance
+"""
+def hammingDistance(hashA, hashB):
+	return bin(hashA ^ hashB).count("1")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import threading
+
+try:
+	import cv2
+	import numpy as np
+except ImportError:
+	cv2 = None
+	np = None
+
+"""
+Paints polygon areas of frames over with a fill image, eg. for the privacy masking
+
+The polygon mask, its bounding box and the fill image crop are compiled once per frame shape,
+after that a frame costs one masked copy of the bounding box, in place on the frame
+"""
+class PolygonMaskCompositor():
+
+	"""
+	Constructor
+
+	@param (array) polygons, list of polygons, each a list of [x, y] points
+	@param (tuple) polygonsResolution, (width, height) of the polygon coordinates, scaled to the frame resolution
+	@param (numpy.ndarray) fillImage, BGR image painted over the polygon areas, resized to the frame resolution
+	"""
+	def __init__(self, polygons, polygonsResolution, fillImage):
+		if cv2 is None:
+			raise Exception("PolygonMaskCompositor: opencv is not installed")
+		self.polygons = [np.array(polygon, dtype=np.float64).reshape(-1, 2) for polygon in polygons if len(polygon) > 2]
+		self.polygonsResolution = polygonsResolution
+		self.fillImage = fillImage
+		self.compiledMasks = {}
+		self.lock = threading.Lock()
+
+	"""
+	Paints the polygon areas over, in place
+
+	@param (numpy.ndarray) cvImage
+	@return (numpy.ndarray) cvImage
+	"""
+	def composite(self, cvImage):
+		compiledMask = self.getCompiledMask(cvImage.shape)
+		if compiledMask is None:
+			return cvImage
+		top, bottom, left, right = compiledMask["bounds"]
+		np.copyto(cvImage[top:bottom, left:right], compiledMask["fill"], where=compiledMask["mask"])
+		return cvImage
+
+	"""
+	Gets the compiled mask of a frame shape, compiles it if not yet compiled
+
+	@param (tuple) shape, frame shape
+	@return (dict|None) {bounds, mask, fill}, None if the polygons do not hit the frame
+	"""
+	def getCompiledMask(self, shape):
+		shape = tuple(shape)
+		compiledMask = self.compiledMasks.get(shape, False)
+		if compiledMask is False:
+			with self.lock:
+				compiledMask = self.compiledMasks.get(shape, False)
+				if compiledMask is False:
+					compiledMask = self.compileMask(shape)
+					self.compiledMasks[shape] = compiledMask
+		return compiledMask
+
+	"""
+	Compiles the mask of a frame shape
+
+	@param (tuple) shape, frame shape
+	@return (dict|None) {bounds, mask, fill}
+	"""
+	def compileMask(self, shape):
+		height, width = shape[0], shape[1]
+		if len(self.polygons) == 0:
+			return None
+
+		# The polygons scaled to the frame resolution
+		scale = np.array([width / self.polygonsResolution[0], height / self.polygonsResolution[1]])
+		scaledPolygons = [np.rint(polygon * scale).astype(np.int32) for polygon in self.polygons]
+
+		fullMask = np.zeros((height, width), dtype=np.uint8)
+		cv2.fillPoly(fullMask, scaledPolygons, 255)
+
+		# The bounding box of the painted pixels
+		rows = np.flatnonzero(fullMask.any(axis=1))
+		columns = np.flatnonzero(fullMask.any(axis=0))
+		if len(rows) == 0:
+			return None
+		top, bottom, left, right = int(rows[0]), int(rows[-1]) + 1, int(columns[0]), int(columns[-1]) + 1
+
+		fill = self.fillImage
+		if fill.shape[0] != height or fill.shape[1] != width:
+			fill = cv2.resize(fill, (width, height), interpolation=cv2.INTER_AREA)
+		if len(shape) == 2:
+			fill = cv2.cvtColor(fill, cv2.COLOR_BGR2GRAY)
+
+		# The mask is expanded to the channels, a broadcast mask makes the masked copy several times slower
+		fill = np.ascontiguousarray(fill[top:bottom, left:right])
+		mask = fullMask[top:bottom, left:right] > 0
+		if len(shape) == 3:
+			mask = np.broadcast_to(mask[:, :, np.newaxis], fill.shape)
+
+		return {
+			"bounds": (top, bottom, left, right),
+			"mask": np.ascontiguousarray(mask),
+			"fill": fill,
+		}
@@ -3,13 +3,13 @@
 @author lsipii
 """
 import cv2
-import numpy as np
 
-from apps.utils.Utils import getProjectRootPath
+from apps.utils.Utils import getProjectRootPath, getSettingsGroup
 from apps.utils.images.filters.ImageBlurrer import ImageBlurrer
+from apps.utils.images.PolygonMaskCompositor import PolygonMaskCompositor
 
 """
-Blurs an area
+Blurs an area, paints the configured polygon areas over with the space image
 
 @see: https://stackoverflow.com/questions/15341538/numpy-opencv-2-how-do-i-crop-non-rectangular-region
 @see: https://stackoverflow.com/questions/35783062/opencv-python-copy-polygon-from-one-image-to-another/35786923
@@ -17,67 +17,46 @@ Blurs an area
 class AreaBlurrer(ImageBlurrer):
 
 	"""
-	Initialization
-	"""
-	def __init__(self):
-		super().__init__()
-		self.spaceImagePath = getProjectRootPath()+"/apps/DeviceApp/data/images/space.jpg"
+	Default settings, the polygon points are in the polygonsResolution coordinates
 
+	@var (dict) defaultSettings
 	"""
-	Blurs the faces from image
+	defaultSettings = {
+		"polygons": [
+			[[0,0], [0,284], [67,217], [100,144], [178,128], [240,40], [336,28], [418,0]],
+		],
+		"polygonsResolution": [640, 480],
+		"fillImagePath": None,
+	}
 
-	@param (string) imagePath
 	"""
-	def blurImage(self, imagePath):
-
-		try:
-			
-			# Create opencv image
-			spaceImage = cv2.imread(self.spaceImagePath)
-			cvImage = cv2.imread(imagePath)
-
-			# Dimensions
-			#height = np.size(cvImage, 0)
-			#width = np.size(cvImage, 1)
-
-			# For now, use static points for blurring
-			blurAreaPoints = [
-				[0,0], 
-				[0,284], 
-				[67,217], 
-				[100,144], 
-				[178,128], 
-				[240,40], 
-				[336,28],
-				[418,0],
-			]
-			blurredAreaPoints = np.array(blurAreaPoints, dtype=np.int32)
-
-			#create a mask template
-			srcMask = spaceImage.copy()
-			srcMask = cv2.cvtColor(srcMask, cv2.COLOR_BGR2GRAY)
-			srcMask.fill(0)
-
-			# White polyfill the mask by blur points
-			cv2.fillPoly(srcMask, [blurredAreaPoints], 255)
+	Initialization
 
-			# Create region of intrest, of the image, of the blur points
-			roi = cvImage[np.min(blurredAreaPoints[:,1]):np.max(blurredAreaPoints[:,1]),np.min(blurredAreaPoints[:,0]):np.max(blurredAreaPoints[:,0])]
-			mask = srcMask[np.min(blurredAreaPoints[:,1]):np.max(blurredAreaPoints[:,1]),np.min(blurredAreaPoints[:,0]):np.max(blurredAreaPoints[:,0])]
+	@param (dict) settings = None, {areaBlurrer}
+	"""
+	def __init__(self, settings = None):
+		super().__init__()
+		self.settings = getSettingsGroup(settings, "areaBlurrer", self.defaultSettings)
 
-			# Cut and paste and combine
-			invertedMask = cv2.bitwise_not(mask)
-			spaceImageBackground = cv2.bitwise_and(roi, roi, mask = invertedMask)
-			spaceImageCuttedPart = spaceImage[np.min(blurredAreaPoints[:,1]):np.max(blurredAreaPoints[:,1]),np.min(blurredAreaPoints[:,0]):np.max(blurredAreaPoints[:,0])]
-			foregroundPart = cv2.bitwise_and(spaceImageCuttedPart, spaceImageCuttedPart, mask = mask)
+		self.spaceImagePath = self.settings["fillImagePath"]
+		if self.spaceImagePath is None:
+			self.spaceImagePath = getProjectRootPath()+"/apps/DeviceApp/data/images/space.jpg"
+		spaceImage = cv2.imread(self.spaceImagePath)
+		if spaceImage is None:
+			raise Exception("AreaBlurrer: could not read the fill image "+self.spaceImagePath)
 
-			# Combine space triangle part and wanted coffee part, save as a final master piece
-			destination = cv2.add(spaceImageBackground, foregroundPart)
-			cvImageFinal = cvImage.copy()
-			cvImageFinal[np.min(blurredAreaPoints[:,1]):np.max(blurredAreaPoints[:,1]),np.min(blurredAreaPoints[:,0]):np.max(blurredAreaPoints[:,0])] = destination
+		self.maskCompositor = PolygonMaskCompositor(self.settings["polygons"], self.settings["polygonsResolution"], spaceImage)
 
-			# Write resulting images
-			cv2.imwrite(imagePath, cvImageFinal)
+	"""
+	Blurs the area from image, in place
 
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, not needed
+	@return (numpy.ndarray) cvImage
+	"""
+	def blurImageData(self, cvImage, frameViews = None):
+		try:
+			return self.maskCompositor.composite(cvImage)
 		except Exception as e:
-			print(e)
\ No newline at end of file
+			print(e)
+		return cvImage
@@ -2,59 +2,204 @@
 """
 @author lsipii
 """
+import threading
+import time
+
 import cv2
+from apps.utils.images.Boxes import clipBox, isSameBox
 from apps.utils.images.filters.ImageBlurrer import ImageBlurrer
-from apps.utils.Utils import getProjectRootPath
+from apps.utils.Utils import getProjectRootPath, getSettingsGroup
 
 """
 Blurs faces
 
+The faces are detected at a reduced resolution, within the regions where people walk, on every photo,
+the boxes are mapped back to the full resolution. The tracking only adds boxes: a face the detection
+loses, eg. turned away, stays blurred until its track expires. The blurred boxes are expanded by a safety margin.
+
 @see: http://opencv-python-tutroals.readthedocs.io/en/latest/py_tutorials/py_objdetect/py_face_detection/py_face_detection.html
 """
 class FacesBlurrer(ImageBlurrer):
 
+	"""
+	Default settings
+
+	@var (dict) defaultSettings
+	"""
+	defaultSettings = {
+		"detectionScale": 0.5,
+		"scaleFactor": 1.1,
+		"minNeighbors": 3,
+		"minFaceSize": 30,
+		"detectionRegions": None,
+		"regionsResolution": [640, 480],
+		"trackingMaxAgeSeconds": 30,
+		"margin": 0.2,
+	}
+
+	"""
+	The intersection over union of the boxes of the same face
+
+	@var (float) sameFaceMinOverlap
+	"""
+	sameFaceMinOverlap = 0.3
+
 	"""
 	Constructor
 
-	@param (dict) settings  = None
+	@param (dict) settings  = None, {facesBlurrer}
 	"""
 	def __init__(self, settings = None):
+		self.settings = getSettingsGroup(settings, "facesBlurrer", self.defaultSettings)
 		self.faceCascade = cv2.CascadeClassifier(getProjectRootPath()+'/apps/DeviceApp/data/haarcascades/haarcascade_frontalface_default.xml')
+
+		# The tracked faces of the previous frames
+		self.lock = threading.Lock()
+		self.trackedFaces = []
+		self.trackedShape = None
 	
 	"""
 	Blurs the faces from image
 
-	@param (string) imagePath
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, the faces are detected from the shared grayscale of the captured frame if given
+	@return (numpy.ndarray) cvImage
 	"""
-	def blurImage(self, imagePath):
+	def blurImageData(self, cvImage, frameViews = None):
 
 		try:
-		
-			# Read and transform imagePath file to an opencv image matrix
-			cvImage = cv2.imread(imagePath)
-		
 			# Detect faces
-			cvImageGray = cv2.cvtColor(cvImage, cv2.COLOR_BGR2GRAY)
-			faces = self.faceCascade.detectMultiScale(cvImageGray, 
-				scaleFactor=1.1, 
-				minNeighbors=5,
-				minSize=(30, 30),
-				flags = cv2.CASCADE_SCALE_IMAGE
-			)
-
-			# Find out if there is faces, in the faces picture
-			if len(faces) > 0:
-
-				# Blur faces
-				for (x,y,w,h) in faces:
-					
-					# Blur the face area
-					facesArea = cvImage[y:y+h,x:x+w]
-					facesArea = cv2.GaussianBlur(facesArea, (23, 23), 30)
-					cvImage[y:y+facesArea.shape[0], x:x+facesArea.shape[1]] = facesArea
-
-				# Write resulting image
-				cv2.imwrite(imagePath, cvImage)
+			faces = self.detectFaces(cvImage, frameViews)
+
+			# Blur faces
+			for (x,y,w,h) in faces:
+				
+				# Blur the face area
+				facesArea = cvImage[y:y+h,x:x+w]
+				facesArea = cv2.GaussianBlur(facesArea, (23, 23), 30)
+				cvImage[y:y+facesArea.shape[0], x:x+facesArea.shape[1]] = facesArea
 				
 		except Exception as e:
-			print(e)
\ No newline at end of file
+			print(e)
+		return cvImage
+
+	"""
+	Forgets the tracked faces
+	"""
+	def resetTracking(self):
+		with self.lock:
+			self.trackedFaces = []
+			self.trackedShape = None
+
+	"""
+	Detects the faces of the detection regions, the tracked faces not found again are kept
+
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, the shared views of the frame if any
+	@return (array) faces, [(x, y, w, h)] in the image coordinates, the margins included
+	"""
+	def detectFaces(self, cvImage, frameViews = None):
+		height, width = cvImage.shape[0], cvImage.shape[1]
+		now = time.time()
+
+		with self.lock:
+			# Tracks expire, and do not survive a resolution change
+			if self.trackedShape != (height, width):
+				self.trackedFaces = []
+				self.trackedShape = (height, width)
+			self.trackedFaces = [trackedFace for trackedFace in self.trackedFaces if now - trackedFace["seenAt"] <= self.settings["trackingMaxAgeSeconds"]]
+			trackedFaces = list(self.trackedFaces)
+
+		if frameViews is not None:
+			grayImage = frameViews.getGray()
+		else:
+			grayImage = cv2.cvtColor(cvImage, cv2.COLOR_BGR2GRAY) if cvImage.ndim == 3 else cvImage
+
+		# The regions may overlap, a face is kept once
+		detectedFaces = []
+		for searchArea in self.getDetectionRegions(width, height):
+			for detectedFace in self.detectFacesInArea(grayImage, searchArea):
+				if not any(isSameBox(detectedFace, otherFace, self.sameFaceMinOverlap) for otherFace in detectedFaces):
+					detectedFaces.append(detectedFace)
+
+		# The tracked faces not found again are kept until expired, the found ones are refreshed
+		faces = []
+		for detectedFace in detectedFaces:
+			faces.append({"box": detectedFace, "seenAt": now})
+		for trackedFace in trackedFaces:
+			if not any(isSameBox(trackedFace["box"], detectedFace, self.sameFaceMinOverlap) for detectedFace in detectedFaces):
+				faces.append(trackedFace)
+
+		with self.lock:
+			self.trackedFaces = faces
+
+		return [self.expandBox(face["box"], self.settings["margin"], width, height) for face in faces]
+
+	"""
+	Detects the faces of an area at the reduced resolution
+
+	@param (numpy.ndarray) grayImage
+	@param (tuple) searchArea, (x, y, w, h)
+	@return (array) faces, [(x, y, w, h)] in the image coordinates
+	"""
+	def detectFacesInArea(self, grayImage, searchArea):
+		areaX, areaY, areaWidth, areaHeight = searchArea
+		if areaWidth <= 0 or areaHeight <= 0:
+			return []
+
+		detectionScale = self.settings["detectionScale"]
+		areaImage = grayImage[areaY:areaY+areaHeight, areaX:areaX+areaWidth]
+		if detectionScale != 1:
+			areaImage = cv2.resize(areaImage, None, fx=detectionScale, fy=detectionScale, interpolation=cv2.INTER_AREA)
+
+		minFaceSize = max(1, int(self.settings["minFaceSize"] * detectionScale))
+		if areaImage.shape[0] < minFaceSize or areaImage.shape[1] < minFaceSize:
+			return []
+
+		faces = self.faceCascade.detectMultiScale(areaImage, 
+			scaleFactor=self.settings["scaleFactor"], 
+			minNeighbors=self.settings["minNeighbors"],
+			minSize=(minFaceSize, minFaceSize),
+			flags = cv2.CASCADE_SCALE_IMAGE
+		)
+
+		# Back to the full resolution
+		return [(
+			areaX + int(x / detectionScale),
+			areaY + int(y / detectionScale),
+			int(round(w / detectionScale)),
+			int(round(h / detectionScale)),
+		) for (x, y, w, h) in faces]
+
+	"""
+	Gets the detection regions scaled to the image, the full image if not configured
+
+	@param (int) width
+	@param (int) height
+	@return (array) regions, [(x, y, w, h)]
+	"""
+	def getDetectionRegions(self, width, height):
+		if not self.settings["detectionRegions"]:
+			return [(0, 0, width, height)]
+
+		scaleX = width / self.settings["regionsResolution"][0]
+		scaleY = height / self.settings["regionsResolution"][1]
+		regions = []
+		for (x, y, w, h) in self.settings["detectionRegions"]:
+			regions.append(clipBox((int(x * scaleX), int(y * scaleY), int(round(w * scaleX)), int(round(h * scaleY))), width, height))
+		return regions
+
+	"""
+	Expands a box by a margin of its size, clipped to the image
+
+	@param (tuple) box, (x, y, w, h)
+	@param (float) margin, share of the box size added to each side
+	@param (int) width
+	@param (int) height
+	@return (tuple) box
+	"""
+	def expandBox(self, box, margin, width, height):
+		x, y, w, h = box
+		marginX = int(w * margin)
+		marginY = int(h * margin)
+		return clipBox((x - marginX, y - marginY, w + 2 * marginX, h + 2 * marginY), width, height)
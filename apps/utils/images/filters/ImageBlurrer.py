@@ -9,7 +9,27 @@ Image blurring abstraction class
 class ImageBlurrer():
 
 	"""
+	Blurs an image file in place
+
 	@param (string) imagePath
 	"""
 	def blurImage(self, imagePath):
-		raise NotImplementedError("ImageBlurrer class must have an blurImage(imagePath) method")
+		import cv2
+		cvImage = cv2.imread(imagePath)
+		cv2.imwrite(imagePath, self.blurImageData(cvImage))
+
+	"""
+	Blurs a decoded image
+
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, the shared views of the captured frame if any
+	@return (numpy.ndarray) cvImage
+	"""
+	def blurImageData(self, cvImage, frameViews = None):
+		raise NotImplementedError("ImageBlurrer class must have an blurImageData(cvImage) method")
+
+	"""
+	Forgets the state carried over from the previous images, eg. before an unrelated image
+	"""
+	def resetTracking(self):
+		pass
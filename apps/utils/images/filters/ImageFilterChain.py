@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+@author lsipii
+"""
+import time
+
+from apps.utils.images.filters.ImageBlurrer import ImageBlurrer
+from apps.utils.Utils import getModulePathInstance
+
+"""
+Runs an ordered list of image filters on one decoded image, eg. AreaBlurrer followed by FacesBlurrer,
+so stacking the filters costs no extra decoding or encoding
+"""
+class ImageFilterChain(ImageBlurrer):
+
+	"""
+	The filters module path
+
+	@var (string) filtersModulePath
+	"""
+	filtersModulePath = "apps.utils.images.filters."
+
+	"""
+	Constructor
+
+	@param (string|array) filterNames, a filter class name or an ordered list of them
+	@param (dict) appSettings = None, passed to the filters
+	@param (LatencyStats) latencyStats = None, records the filter times as "blur:<filterName>" stages
+	"""
+	def __init__(self, filterNames, appSettings = None, latencyStats = None):
+		super().__init__()
+		if isinstance(filterNames, str):
+			filterNames = [filterNames]
+		self.filterNames = list(filterNames)
+		self.filters = [getModulePathInstance(self.filtersModulePath+filterName, appSettings) for filterName in self.filterNames]
+		self.latencyStats = latencyStats
+
+	"""
+	Runs the filters on a decoded image
+
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, the shared views of the captured frame if any
+	@return (numpy.ndarray) cvImage
+	"""
+	def blurImageData(self, cvImage, frameViews = None):
+		cvImage, filterTimes = self.blurImageDataWithTimes(cvImage, frameViews)
+		if self.latencyStats is not None:
+			for filterName, seconds in filterTimes.items():
+				self.latencyStats.record("blur:"+filterName, seconds)
+		return cvImage
+
+	"""
+	Runs the filters on a decoded image, times each filter
+
+	@param (numpy.ndarray) cvImage
+	@param (FrameViews) frameViews = None, the shared views of the captured frame if any
+	@return (tuple) (cvImage, {filterName: seconds})
+	"""
+	def blurImageDataWithTimes(self, cvImage, frameViews = None):
+		filterTimes = {}
+		for filterName, imageFilter in zip(self.filterNames, self.filters):
+			startTime = time.perf_counter()
+			cvImage = imageFilter.blurImageData(cvImage, frameViews)
+			filterTimes[filterName] = time.perf_counter() - startTime
+		return cvImage, filterTimes
+
+	"""
+	Forgets the state carried over from the previous images of all of the filters
+	"""
+	def resetTracking(self):
+		for imageFilter in self.filters:
+			imageFilter.resetTracking()
+
+	"""
+	Gets the filter names in the running order
+
+	@return (array) filterNames
+	"""
+	def getFilterNames(self):
+		return list(self.filterNames)
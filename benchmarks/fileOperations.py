@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compares the forked shell apps (sh module, ps) to the in-process file and process operations
+
+Reports the import times in a fresh interpreter, and per operation the wall time
+and the CPU time spent in the child processes
+
+Usage: python3 -m benchmarks.fileOperations --rounds=50
+
+@author lsipii
+"""
+import sys, getopt
+import json
+import os
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+
+from apps.utils.FileSystem import ensureDirectory, moveFile, copyFile, isProcessRunning
+from apps.utils.Utils import getProjectRootPath
+
+"""
+Measures a module import time in a fresh interpreter
+
+@param (string) moduleName
+@param (int) rounds
+@return (float) median milliseconds
+"""
+def measureImportTime(moduleName, rounds):
+	timings = []
+	for i in range(rounds):
+		output = subprocess.check_output([
+			sys.executable, "-c",
+			"import time; startTime = time.perf_counter(); import "+moduleName+"; print(time.perf_counter() - startTime)"
+		], cwd=getProjectRootPath())
+		timings.append(float(output) * 1000)
+	return round(statistics.median(timings), 3)
+
+"""
+Measures an operation
+
+@param (callable) operation, called with the round number
+@param (int) rounds
+@return (dict) {wallMs, childCpuMs}, medians per operation
+"""
+def measureOperation(operation, rounds):
+	wallTimings = []
+	childCpuTimings = []
+	for roundNumber in range(rounds):
+		childrenUsageBefore = resource.getrusage(resource.RUSAGE_CHILDREN)
+		startTime = time.perf_counter()
+		operation(roundNumber)
+		wallTimings.append((time.perf_counter() - startTime) * 1000)
+		childrenUsageAfter = resource.getrusage(resource.RUSAGE_CHILDREN)
+		childCpuTimings.append(((childrenUsageAfter.ru_utime - childrenUsageBefore.ru_utime) + (childrenUsageAfter.ru_stime - childrenUsageBefore.ru_stime)) * 1000)
+	return {
+		"wallMs": round(statistics.median(wallTimings), 3),
+		"childCpuMs": round(statistics.median(childCpuTimings), 3),
+	}
+
+"""
+Runs the benchmark
+
+@param (int) rounds
+@return (dict) results
+"""
+def runFileOperationsBenchmark(rounds):
+
+	try:
+		import sh
+	except ImportError:
+		sh = None
+
+	workDirectory = tempfile.TemporaryDirectory()
+	sourcePath = getProjectRootPath()+"/apps/DeviceApp/data/testimages/5aa2867e.jpg"
+
+	def getPath(name, roundNumber):
+		return os.path.join(workDirectory.name, name+str(roundNumber)+".jpg")
+
+	operations = {
+		"ensureDirectory": {
+			"native": lambda roundNumber: ensureDirectory(workDirectory.name+"/media"),
+			"forked": lambda roundNumber: sh.mkdir("-p", workDirectory.name+"/media"),
+		},
+		"copyFile": {
+			"native": lambda roundNumber: copyFile(sourcePath, getPath("nativeCopy", roundNumber)),
+			"forked": lambda roundNumber: sh.cp(sourcePath, getPath("forkedCopy", roundNumber)),
+		},
+		"moveFile": {
+			"native": lambda roundNumber: moveFile(getPath("nativeCopy", roundNumber), getPath("nativeMove", roundNumber)),
+			"forked": lambda roundNumber: sh.mv(getPath("forkedCopy", roundNumber), getPath("forkedMove", roundNumber)),
+		},
+		"isProcessRunning": {
+			"native": lambda roundNumber: isProcessRunning("motion"),
+			"forked": lambda roundNumber: "motion" in str(subprocess.Popen(["ps", "-a"], stdout=subprocess.PIPE).communicate()[0]),
+		},
+	}
+
+	results = {
+		"rounds": rounds,
+		"importMs": {
+			"native": measureImportTime("apps.utils.FileSystem", min(rounds, 10)),
+		},
+		"operations": {},
+	}
+	if sh is not None:
+		results["importMs"]["forked"] = measureImportTime("sh", min(rounds, 10))
+
+	for operationName, implementations in operations.items():
+		results["operations"][operationName] = {"native": measureOperation(implementations["native"], rounds)}
+		if sh is not None:
+			results["operations"][operationName]["forked"] = measureOperation(implementations["forked"], rounds)
+
+	workDirectory.cleanup()
+	return results
+
+# App runner
+if __name__ == '__main__':
+
+	argv = sys.argv[1:]
+	rounds = 50
+
+	# Help texts
+	def printHelp():
+		print("Usage: python3 -m benchmarks.fileOperations [--rounds=50]")
+		exit()
+
+	try:
+		opts, args = getopt.getopt(argv, "h", ["help", "rounds="])
+	except getopt.GetoptError:
+		printHelp()
+
+	for opt, arg in opts:
+		if opt in ("-h", "--help"):
+			printHelp()
+		elif opt == "--rounds":
+			rounds = int(arg)
+
+	print(json.dumps(runFileOperationsBenchmark(rounds), indent=4))
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the image filters and the coffee situation resolver over the bundled test images at several resolutions
+
+Reports per target and resolution the per image latency percentiles, the peak RSS, the peak
+memory allocated while processing an image and the allocations left behind,
+each target runs in a fresh process so that the peak RSS is its own. The results are written as JSON,
+and can be compared to the results of an earlier commit, a slower target fails the comparison.
+
+Usage: python3 -m benchmarks.imageFilters --rounds=20 --resolutions=640x480,1280x720 --output=results.json --compare=baseline.json
+
+@author lsipii
+"""
+import sys, getopt
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from apps.utils.Utils import getProjectRootPath, getModulePathInstance
+
+"""
+Image files benchmarked from the images directory
+
+@var (array) imageFilePatterns
+"""
+imageFilePatterns = ["*.jpg", "*.jpeg", "*.png"]
+
+"""
+The benchmarked targets, the image filters by their class names and the resolver
+
+@var (array) defaultTargets
+"""
+defaultTargets = ["AreaBlurrer", "FacesBlurrer", "CoffeeSituationResolver"]
+
+"""
+Reads the images, resized to a resolution
+
+@param (string) imagesPath
+@param (tuple) resolution, (width, height)
+@return (dict) {imageName: cvImage}
+"""
+def readImages(imagesPath, resolution):
+	imagePaths = []
+	for imageFilePattern in imageFilePatterns:
+		imagePaths.extend(glob.glob(os.path.join(imagesPath, imageFilePattern)))
+
+	images = {}
+	for imagePath in sorted(imagePaths):
+		image = cv2.imread(imagePath, cv2.IMREAD_COLOR)
+		if image is not None:
+			images[os.path.basename(imagePath)] = cv2.resize(image, resolution, interpolation=cv2.INTER_AREA)
+	if len(images) == 0:
+		raise Exception("No images found from "+imagesPath)
+	return images
+
+"""
+Creates the target runner
+
+@param (string) targetName
+@param (dict) appSettings
+@return (callable) runs the target on an image
+"""
+def createTarget(targetName, appSettings):
+	if targetName == "CoffeeSituationResolver":
+		from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+		settings = dict(appSettings)
+		settings["CoffeeSituationResolverEnabled"] = True
+		coffeeSituationResolver = CoffeeSituationResolver(settings)
+		return coffeeSituationResolver.resolveCoffeeSituationFromImage
+
+	imageFilter = getModulePathInstance("apps.utils.images.filters."+targetName, appSettings)
+	return imageFilter.blurImageData
+
+"""
+Gets the latency percentiles
+
+@param (array) timings, seconds
+@return (dict) {count, mean, p50, p95, p99} in milliseconds
+"""
+def getPercentiles(timings):
+	milliseconds = np.array(timings) * 1000
+	return {
+		"count": len(timings),
+		"mean": round(float(milliseconds.mean()), 3),
+		"p50": round(float(np.percentile(milliseconds, 50)), 3),
+		"p95": round(float(np.percentile(milliseconds, 95)), 3),
+		"p99": round(float(np.percentile(milliseconds, 99)), 3),
+	}
+
+"""
+Benchmarks a target at the resolutions, run in a fresh process
+
+@param (string) targetName
+@param (dict) options
+@return (dict) results by the resolution
+"""
+def benchmarkTarget(targetName, options):
+	run = createTarget(targetName, options["appSettings"])
+	results = {}
+
+	for resolution in options["resolutions"]:
+		images = readImages(options["imagesPath"], resolution)
+
+		# Warm up, eg. the mask compiling and the lazy cascade loading
+		for image in images.values():
+			run(image.copy())
+
+		# The latencies, the filters work in place so each round gets a fresh copy
+		timings = {imageName: [] for imageName in images}
+		for roundNumber in range(options["rounds"]):
+			for imageName, image in images.items():
+				frame = image.copy()
+				startTime = time.perf_counter()
+				run(frame)
+				timings[imageName].append(time.perf_counter() - startTime)
+
+		# The allocations, in an own pass, the tracing slows things down
+		tracemalloc.start()
+		allocationsBefore = tracemalloc.take_snapshot()
+		peakTracedBytes = 0
+		for image in images.values():
+			frame = image.copy()
+			tracedBytesBefore = tracemalloc.get_traced_memory()[0]
+			tracemalloc.reset_peak()
+			run(frame)
+			peakTracedBytes = max(peakTracedBytes, tracemalloc.get_traced_memory()[1] - tracedBytesBefore)
+			del frame
+		allocationsAfter = tracemalloc.take_snapshot()
+		tracemalloc.stop()
+		allocationStats = allocationsAfter.compare_to(allocationsBefore, "filename")
+
+		allTimings = [timing for imageTimings in timings.values() for timing in imageTimings]
+		results[str(resolution[0])+"x"+str(resolution[1])] = {
+			"latency": getPercentiles(allTimings),
+			"images": {imageName: getPercentiles(imageTimings) for imageName, imageTimings in timings.items()},
+			"allocations": {
+				"peakPerImageKiB": round(peakTracedBytes / 1024, 1),
+				"retainedBlocks": sum(max(0, stat.count_diff) for stat in allocationStats),
+			},
+		}
+
+	# Kilobytes on Linux
+	results["peakRssKiB"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return results
+
+"""
+Runs the benchmark, each target in a fresh process
+
+@param (dict) options
+@return (dict) results
+"""
+def runImageFiltersBenchmark(options):
+	results = {
+		"options": {
+			"rounds": options["rounds"],
+			"resolutions": [str(width)+"x"+str(height) for (width, height) in options["resolutions"]],
+			"targets": options["targets"],
+		},
+		"createdAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+		"targets": {},
+	}
+	spawnContext = multiprocessing.get_context("spawn")
+	for targetName in options["targets"]:
+		with spawnContext.Pool(1) as pool:
+			results["targets"][targetName] = pool.apply(benchmarkTarget, (targetName, options))
+	return results
+
+"""
+Compares the results to the baseline results
+
+@param (dict) results
+@param (dict) baseline
+@param (float) threshold, allowed relative slow down, eg. 0.1
+@return (array) regressions, {target, resolution, metric, baseline, current}
+"""
+def compareResults(results, baseline, threshold):
+	regressions = []
+	for targetName, targetResults in results["targets"].items():
+		baselineTargetResults = baseline.get("targets", {}).get(targetName)
+		if baselineTargetResults is None:
+			continue
+		for resolutionName, resolutionResults in targetResults.items():
+			if resolutionName not in baselineTargetResults or not isinstance(resolutionResults, dict):
+				continue
+			for metric in ["p50", "p95"]:
+				baselineValue = baselineTargetResults[resolutionName]["latency"][metric]
+				currentValue = resolutionResults["latency"][metric]
+				if currentValue > baselineValue * (1 + threshold):
+					regressions.append({
+						"target": targetName,
+						"resolution": resolutionName,
+						"metric": metric,
+						"baseline": baselineValue,
+						"current": currentValue,
+					})
+	return regressions
+
+# App runner
+if __name__ == '__main__':
+
+	argv = sys.argv[1:]
+
+	options = {
+		"rounds": 10,
+		"resolutions": [(640, 480), (1280, 720)],
+		"targets": defaultTargets,
+		"imagesPath": getProjectRootPath()+"/apps/DeviceApp/data/testimages",
+		"appSettings": {},
+	}
+	outputPath = None
+	baselinePath = None
+	threshold = 0.1
+
+	# Help texts
+	def printHelp():
+		print("Usage: python3 -m benchmarks.imageFilters [--rounds=10] [--resolutions=640x480,1280x720] [--targets=AreaBlurrer,FacesBlurrer,CoffeeSituationResolver] [--images=path] [--config=config/deviceApp.json] [--output=results.json] [--compare=baseline.json] [--threshold=0.1]")
+		exit()
+
+	try:
+		opts, args = getopt.getopt(argv, "h", ["help", "rounds=", "resolutions=", "targets=", "images=", "config=", "output=", "compare=", "threshold="])
+	except getopt.GetoptError:
+		printHelp()
+
+	for opt, arg in opts:
+		if opt in ("-h", "--help"):
+			printHelp()
+		elif opt == "--rounds":
+			options["rounds"] = int(arg)
+		elif opt == "--resolutions":
+			options["resolutions"] = [tuple(int(size) for size in resolution.split("x")) for resolution in arg.split(",")]
+		elif opt == "--targets":
+			options["targets"] = arg.split(",")
+		elif opt == "--images":
+			options["imagesPath"] = arg
+		elif opt == "--config":
+			with open(arg) as configFile:
+				options["appSettings"] = json.load(configFile)["app"]["settings"]
+		elif opt == "--output":
+			outputPath = arg
+		elif opt == "--compare":
+			baselinePath = arg
+		elif opt == "--threshold":
+			threshold = float(arg)
+
+	results = runImageFiltersBenchmark(options)
+
+	if outputPath is not None:
+		with open(outputPath, "w") as outputFile:
+			json.dump(results, outputFile, indent=4)
+	else:
+		print(json.dumps(results, indent=4))
+
+	if baselinePath is not None:
+		with open(baselinePath) as baselineFile:
+			regressions = compareResults(results, json.load(baselineFile), threshold)
+		for regression in regressions:
+			print("Slower: "+regression["target"]+" "+regression["resolution"]+" "+regression["metric"]+" "+str(regression["baseline"])+" ms -> "+str(regression["current"])+" ms", file=sys.stderr)
+		if len(regressions) > 0:
+			exit(1)
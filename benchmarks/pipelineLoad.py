@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Load tests the device pipeline: capture, blur, resolve and store, with a synthetic camera
+
+Usage: python3 -m benchmarks.pipelineLoad --frames=500 --threads=4 --width=1280 --height=720 --blurrer=AreaBlurrer,FacesBlurrer --resolve
+
+@author lsipii
+"""
+import sys, getopt
+import json
+import tempfile
+import threading
+import time
+
+from apps.DeviceApp.features.coffee.CoffeeObservation import CoffeeObservation
+from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+from apps.DeviceApp.hardware.capture.CaptureEngineFactory import CaptureEngineFactory
+from apps.DeviceApp.hardware.storage.LocalStorage import LocalStorage
+from apps.utils.LatencyStats import LatencyStats
+from apps.utils.images.filters.ImageFilterChain import ImageFilterChain
+
+"""
+Runs the load test
+
+@param (dict) options
+@return (dict) results
+"""
+def runPipelineLoad(options):
+
+	captureEngine = CaptureEngineFactory.getInstance({"camera": {
+		"captureEngine": "synthetic",
+		"width": options["width"],
+		"height": options["height"],
+		"syntheticSource": options["source"],
+		"fakeLatencySeconds": options["latency"],
+	}})
+	captureEngine.start()
+
+	latencyStats = LatencyStats()
+
+	imageBlurrer = None
+	if options["blurrer"] is not None:
+		imageBlurrer = ImageFilterChain(options["blurrer"].split(","), None, latencyStats)
+
+	coffeeSituationResolver = None
+	if options["resolve"]:
+		coffeeSituationResolver = CoffeeSituationResolver({"CoffeeSituationResolverEnabled": True})
+
+	mediaDirectory = tempfile.TemporaryDirectory()
+	framesLeft = [options["frames"]]
+	framesLock = threading.Lock()
+
+	def runWorker():
+		storage = LocalStorage({"mediaDirectory": mediaDirectory.name, "mediaHost": "http://localhost"})
+		while True:
+			with framesLock:
+				if framesLeft[0] <= 0:
+					return
+				framesLeft[0] -= 1
+
+			with latencyStats.measure("observation"):
+				with latencyStats.measure("capture"):
+					coffeeObservation = CoffeeObservation(captureEngine.captureFrame())
+				if imageBlurrer is not None:
+					with latencyStats.measure("blur"):
+						coffeeObservation.setImage(imageBlurrer.blurImageData(coffeeObservation.getImage()))
+				if coffeeSituationResolver is not None:
+					with latencyStats.measure("resolve"):
+						coffeeSituationResolver.resolveCoffeeSituationFromImage(coffeeObservation.getImage())
+				with latencyStats.measure("store"):
+					storage.setupMediaFilename()
+					storage.saveImageData(coffeeObservation.getEncodedFrame())
+
+	startTime = time.perf_counter()
+	workers = [threading.Thread(target=runWorker) for i in range(options["threads"])]
+	for worker in workers:
+		worker.start()
+	for worker in workers:
+		worker.join()
+	totalSeconds = time.perf_counter() - startTime
+	mediaDirectory.cleanup()
+
+	return {
+		"options": options,
+		"totalSeconds": round(totalSeconds, 3),
+		"framesPerSecond": round(options["frames"] / totalSeconds, 1),
+		"latencies": latencyStats.getSummary(),
+	}
+
+# App runner
+if __name__ == '__main__':
+
+	argv = sys.argv[1:]
+
+	options = {
+		"frames": 200,
+		"threads": 1,
+		"width": 640,
+		"height": 480,
+		"source": "directory",
+		"latency": 0,
+		"blurrer": None,
+		"resolve": False,
+	}
+
+	# Help texts
+	def printHelp():
+		print("Usage: python3 -m benchmarks.pipelineLoad [--frames=200] [--threads=1] [--width=640] [--height=480] [--source=directory|procedural] [--latency=0] [--blurrer=AreaBlurrer,FacesBlurrer] [--resolve]")
+		exit()
+
+	try:
+		opts, args = getopt.getopt(argv, "h", ["help", "frames=", "threads=", "width=", "height=", "source=", "latency=", "blurrer=", "resolve"])
+	except getopt.GetoptError:
+		printHelp()
+
+	for opt, arg in opts:
+		if opt in ("-h", "--help"):
+			printHelp()
+		elif opt in ("--frames", "--threads", "--width", "--height"):
+			options[opt[2:]] = int(arg)
+		elif opt == "--latency":
+			options["latency"] = float(arg)
+		elif opt in ("--source", "--blurrer"):
+			options[opt[2:]] = arg
+		elif opt == "--resolve":
+			options["resolve"] = True
+
+	print(json.dumps(runPipelineLoad(options), indent=4))
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Evaluates the coffee level strategies of the coffee situation resolver over labeled images
+
+Reports per strategy the precision and the recall of the coffee and the no coffee decisions, the mean absolute
+fill level error and the per image latency percentiles, in one table. The labels file maps the image file names
+to their labels, eg. {"pot1.jpg": {"hasCoffee": true, "level": 0.6}, "pot2.jpg": {"hasCoffee": false, "level": 0}},
+the level may be left out. The sweep mode evaluates every combination of the swept settings and finds the fastest
+one still as accurate as required.
+
+Usage: python3 -m benchmarks.resolverAccuracy --images=labeled --labels=labeled/labels.json --sweep=coffeeLevelEstimator.liquidMinNeighbors=3,5,7 --minAccuracy=0.9
+
+@author lsipii
+"""
+import sys, getopt
+import copy
+import glob
+import itertools
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+from apps.utils.Utils import getProjectRootPath
+
+"""
+Lists the coffee level strategies in the strategies directory
+
+@return (array) strategyNames
+"""
+def listStrategies():
+	strategiesPath = getProjectRootPath()+"/apps/DeviceApp/features/coffee/strategies"
+	strategyNames = []
+	for strategyPath in sorted(glob.glob(os.path.join(strategiesPath, "*CoffeeLevelStrategy.py"))):
+		strategyName = os.path.splitext(os.path.basename(strategyPath))[0]
+		if strategyName != "CoffeeLevelStrategy":
+			strategyNames.append(strategyName)
+	return strategyNames
+
+"""
+Reads the labeled images
+
+@param (string) imagesPath
+@param (string) labelsPath
+@return (dict) {imageName: {image, hasCoffee, level}}
+"""
+def readLabeledImages(imagesPath, labelsPath):
+	with open(labelsPath) as labelsFile:
+		labels = json.load(labelsFile)
+
+	labeledImages = {}
+	for imageName, label in sorted(labels.items()):
+		image = cv2.imread(os.path.join(imagesPath, imageName), cv2.IMREAD_COLOR)
+		if image is None:
+			print("Skipping an unreadable image: "+imageName, file=sys.stderr)
+			continue
+		labeledImages[imageName] = {"image": image, "hasCoffee": bool(label["hasCoffee"]), "level": label.get("level")}
+	if len(labeledImages) == 0:
+		raise Exception("No labeled images found from "+imagesPath)
+	return labeledImages
+
+"""
+Gets the settings with the overrides, eg. {"coffeeLevelEstimator.minDarkness": 0.8}
+
+@param (dict) appSettings
+@param (dict) overrides, dotted settings paths to values
+@return (dict) settings
+"""
+def getOverriddenSettings(appSettings, overrides):
+	settings = copy.deepcopy(appSettings)
+	for settingPath, value in overrides.items():
+		group = settings
+		keys = settingPath.split(".")
+		for key in keys[:-1]:
+			group = group.setdefault(key, {})
+		group[keys[-1]] = value
+	return settings
+
+"""
+Gets the precision and the recall of a decision
+
+@param (int) truePositives
+@param (int) falsePositives
+@param (int) falseNegatives
+@return (dict) {precision, recall}, None if not defined
+"""
+def getPrecisionAndRecall(truePositives, falsePositives, falseNegatives):
+	return {
+		"precision": round(truePositives / (truePositives + falsePositives), 3) if truePositives + falsePositives > 0 else None,
+		"recall": round(truePositives / (truePositives + falseNegatives), 3) if truePositives + falseNegatives > 0 else None,
+	}
+
+"""
+Evaluates the resolver with the settings
+
+@param (dict) settings, the app settings
+@param (dict) labeledImages
+@param (int) rounds, of the latency measuring
+@return (dict) {accuracy, coffee, noCoffee, levelError, levelsMeasured, latency}
+"""
+def evaluateResolver(settings, labeledImages, rounds):
+	settings = dict(settings)
+	settings["CoffeeSituationResolverEnabled"] = True
+	coffeeSituationResolver = CoffeeSituationResolver(settings)
+
+	counts = {"truePositives": 0, "falsePositives": 0, "trueNegatives": 0, "falseNegatives": 0}
+	levelErrors = []
+	timings = []
+
+	for labeledImage in labeledImages.values():
+		startTime = time.perf_counter()
+		coffeeSituationResolver.resolveCoffeeSituationFromImage(labeledImage["image"])
+		timings.append(time.perf_counter() - startTime)
+
+		hasCoffee = coffeeSituationResolver.hasCoffee()
+		if hasCoffee and labeledImage["hasCoffee"]:
+			counts["truePositives"] += 1
+		elif hasCoffee:
+			counts["falsePositives"] += 1
+		elif labeledImage["hasCoffee"]:
+			counts["falseNegatives"] += 1
+		else:
+			counts["trueNegatives"] += 1
+
+		coffeeLevel = coffeeSituationResolver.getCoffeeLevel()
+		if labeledImage["level"] is not None and coffeeLevel is not None:
+			levelErrors.append(abs(coffeeLevel - labeledImage["level"]))
+
+	# The more rounds of the latencies
+	for roundNumber in range(1, rounds):
+		for labeledImage in labeledImages.values():
+			startTime = time.perf_counter()
+			coffeeSituationResolver.resolveCoffeeSituationFromImage(labeledImage["image"])
+			timings.append(time.perf_counter() - startTime)
+
+	milliseconds = np.array(timings) * 1000
+	return {
+		"accuracy": round((counts["truePositives"] + counts["trueNegatives"]) / len(labeledImages), 3),
+		"coffee": getPrecisionAndRecall(counts["truePositives"], counts["falsePositives"], counts["falseNegatives"]),
+		"noCoffee": getPrecisionAndRecall(counts["trueNegatives"], counts["falseNegatives"], counts["falsePositives"]),
+		"levelError": round(float(np.mean(levelErrors)), 3) if len(levelErrors) > 0 else None,
+		"levelsMeasured": len(levelErrors),
+		"latency": {
+			"p50": round(float(np.percentile(milliseconds, 50)), 3),
+			"p95": round(float(np.percentile(milliseconds, 95)), 3),
+			"p99": round(float(np.percentile(milliseconds, 99)), 3),
+		},
+	}
+
+"""
+Runs the evaluation, every strategy with every combination of the swept settings
+
+@param (dict) options
+@return (dict) results
+"""
+def runResolverAccuracy(options):
+	labeledImages = readLabeledImages(options["imagesPath"], options["labelsPath"])
+
+	sweepPaths = list(options["sweeps"].keys())
+	evaluations = []
+	for strategyName in options["strategies"]:
+		for sweepValues in itertools.product(*options["sweeps"].values()):
+			overrides = {"coffeeLevelEstimator.strategy": strategyName}
+			overrides.update(zip(sweepPaths, sweepValues))
+			evaluation = evaluateResolver(getOverriddenSettings(options["appSettings"], overrides), labeledImages, options["rounds"])
+			evaluation["settings"] = overrides
+			evaluations.append(evaluation)
+
+	results = {
+		"images": len(labeledImages),
+		"evaluations": evaluations,
+	}
+
+	# The fastest accurate enough
+	if options["minAccuracy"] is not None:
+		accurateEvaluations = [evaluation for evaluation in evaluations if evaluation["accuracy"] >= options["minAccuracy"]]
+		results["fastest"] = min(accurateEvaluations, key=lambda evaluation: evaluation["latency"]["p50"]) if len(accurateEvaluations) > 0 else None
+	return results
+
+"""
+Formats the evaluations as a table
+
+@param (array) evaluations
+@return (string) table
+"""
+def formatTable(evaluations):
+	def formatValue(value):
+		return "-" if value is None else str(value)
+
+	headers = ["settings", "accuracy", "coffee P", "coffee R", "no coffee P", "no coffee R", "level error", "p50 ms", "p95 ms", "p99 ms"]
+	rows = []
+	for evaluation in evaluations:
+		rows.append([
+			" ".join(settingPath.split(".")[-1]+"="+str(value) for settingPath, value in evaluation["settings"].items()),
+			formatValue(evaluation["accuracy"]),
+			formatValue(evaluation["coffee"]["precision"]),
+			formatValue(evaluation["coffee"]["recall"]),
+			formatValue(evaluation["noCoffee"]["precision"]),
+			formatValue(evaluation["noCoffee"]["recall"]),
+			formatValue(evaluation["levelError"]),
+			formatValue(evaluation["latency"]["p50"]),
+			formatValue(evaluation["latency"]["p95"]),
+			formatValue(evaluation["latency"]["p99"]),
+		])
+
+	widths = [max(len(row[column]) for row in [headers] + rows) for column in range(len(headers))]
+	lines = []
+	for row in [headers] + rows:
+		lines.append("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+	return "\n".join(lines)
+
+# App runner
+if __name__ == '__main__':
+
+	argv = sys.argv[1:]
+
+	options = {
+		"imagesPath": None,
+		"labelsPath": None,
+		"strategies": listStrategies(),
+		"appSettings": {},
+		"sweeps": {},
+		"minAccuracy": None,
+		"rounds": 5,
+	}
+	outputPath = None
+
+	# Help texts
+	def printHelp():
+		print("Usage: python3 -m benchmarks.resolverAccuracy --images=path --labels=labels.json [--strategies="+",".join(listStrategies())+"] [--config=config/deviceApp.json] [--sweep=coffeeLevelEstimator.minDarkness=0.8,0.85,0.9] [--minAccuracy=0.9] [--rounds=5] [--output=results.json]")
+		exit()
+
+	try:
+		opts, args = getopt.getopt(argv, "h", ["help", "images=", "labels=", "strategies=", "config=", "sweep=", "minAccuracy=", "rounds=", "output="])
+	except getopt.GetoptError:
+		printHelp()
+
+	for opt, arg in opts:
+		if opt in ("-h", "--help"):
+			printHelp()
+		elif opt == "--images":
+			options["imagesPath"] = arg
+		elif opt == "--labels":
+			options["labelsPath"] = arg
+		elif opt == "--strategies":
+			options["strategies"] = arg.split(",")
+		elif opt == "--config":
+			with open(arg) as configFile:
+				options["appSettings"] = json.load(configFile)["app"]["settings"]
+		elif opt == "--sweep":
+			# The values as JSON, eg. 5 or 1.3 or "IntensityProfileCoffeeLevelStrategy"
+			settingPath, values = arg.split("=", 1)
+			options["sweeps"][settingPath] = [json.loads(value) for value in values.split(",")]
+		elif opt == "--minAccuracy":
+			options["minAccuracy"] = float(arg)
+		elif opt == "--rounds":
+			options["rounds"] = max(1, int(arg))
+		elif opt == "--output":
+			outputPath = arg
+
+	if options["imagesPath"] is None or options["labelsPath"] is None:
+		printHelp()
+
+	results = runResolverAccuracy(options)
+
+	if outputPath is not None:
+		with open(outputPath, "w") as outputFile:
+			json.dump(results, outputFile, indent=4)
+
+	print(formatTable(results["evaluations"]))
+	if "fastest" in results:
+		if results["fastest"] is None:
+			print("\nNo settings reach the accuracy of "+str(options["minAccuracy"]))
+			exit(1)
+		print("\nThe fastest settings with the accuracy of "+str(options["minAccuracy"])+": "+json.dumps(results["fastest"]["settings"]))
@@ -2,7 +2,7 @@
 """
 @author lsipii
 """
-import sys, getopt
+import os, sys, getopt
 from flask import Flask
 from apps.DeviceApp.DeviceApp import DeviceApp
 from apps.DeviceApp.http.controllers.CoffeesHasWeController import CoffeesHasWeController
@@ -15,6 +15,14 @@ routerApp = Flask(__name__)
 controller = CoffeesHasWeController(app)
 
 # Defines the app routes
+@routerApp.route('/stream', methods=['GET'])
+def stream():
+	return controller.getStreamResponse()
+
+@routerApp.route('/observation/<observationId>', methods=['GET'])
+def observation(observationId):
+	return controller.getObservationResponse(observationId)
+
 @routerApp.route('/', methods=controller.knownHttpMethods)
 @routerApp.route('/<path>', methods=controller.knownHttpMethods)
 def request(path = None):
@@ -53,4 +61,9 @@ if __name__ == '__main__':
 	# Run app
 	controller.setDebugMode(debugMode)
 	controller.validateZoinksFunctionality()
-	routerApp.run(debug=debugMode)
+
+	# In debug mode the reloader parent process only watches the files, the served app runs in a child process
+	if not debugMode or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+		controller.startBackgroundServices()
+
+	routerApp.run(debug=debugMode, threaded=True)
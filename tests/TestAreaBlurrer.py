@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from apps.utils.images.filters.AreaBlurrer import AreaBlurrer
+from apps.utils.images.PolygonMaskCompositor import PolygonMaskCompositor
+
+class TestAreaBlurrer(unittest.TestCase):
+
+    def setUp(self):
+        self.fillImage = np.full((100, 200, 3), 255, dtype=np.uint8)
+
+    def testPolygonsArePaintedInPlace(self):
+        compositor = PolygonMaskCompositor([
+            [[0, 0], [10, 0], [10, 10], [0, 10]],
+            [[150, 50], [199, 50], [199, 99], [150, 99]],
+        ], (200, 100), self.fillImage)
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        self.assertIs(compositor.composite(frame), frame)
+        self.assertTrue((frame[0:10, 0:10] == 255).all())
+        self.assertTrue((frame[50:99, 150:199] == 255).all())
+        self.assertTrue((frame[20:40, 20:140] == 0).all())
+        self.assertEqual(compositor.getCompiledMask(frame.shape)["bounds"], (0, 100, 0, 200))
+
+    def testPolygonsAreScaledAndCompiledOncePerResolution(self):
+        compositor = PolygonMaskCompositor([[[0, 0], [100, 0], [100, 50], [0, 50]]], (200, 100), self.fillImage)
+        frame = np.zeros((200, 400, 3), dtype=np.uint8)
+        compositor.composite(frame)
+        compiledMask = compositor.getCompiledMask(frame.shape)
+        self.assertEqual(compiledMask["bounds"], (0, 101, 0, 201))
+        self.assertTrue((frame[0:100, 0:200] == 255).all())
+        self.assertTrue((frame[102:, :] == 0).all())
+
+        compositor.composite(np.zeros((200, 400, 3), dtype=np.uint8))
+        self.assertIs(compositor.getCompiledMask(frame.shape), compiledMask)
+        self.assertEqual(len(compositor.compiledMasks), 1)
+
+    def testPolygonsOutsideTheFrameAreIgnored(self):
+        compositor = PolygonMaskCompositor([[[-50, -50], [-10, -50], [-10, -10]]], (200, 100), self.fillImage)
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        compositor.composite(frame)
+        self.assertFalse(frame.any())
+
+    def testConfiguredPolygons(self):
+        areaBlurrer = AreaBlurrer({"areaBlurrer": {"polygons": [[[0, 0], [320, 0], [320, 240], [0, 240]]]}})
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        areaBlurrer.blurImageData(frame)
+        self.assertTrue(frame[0:240, 0:320].any())
+        self.assertFalse(frame[242:, :].any())
+
+if __name__ == '__main__':
+    unittest.main()
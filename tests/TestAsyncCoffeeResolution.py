@@ -0,0 +1,99 @@
+import threading
+import time
+import unittest
+from apps.DeviceApp.features.coffee.AsyncCoffeeResolution import AsyncCoffeeResolution
+
+class SlowResolver():
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.resolvedImages = []
+
+    def resolveCoffeeVerdictFromImage(self, cvImage, frameViews = None):
+        self.release.wait(5)
+        if cvImage == "broken":
+            raise Exception("Not a photo")
+        self.resolvedImages.append(cvImage)
+        return "We have coffee", 0.6
+
+class TestAsyncCoffeeResolution(unittest.TestCase):
+
+    def getAsyncResolution(self, settings = None):
+        resolver = SlowResolver()
+        asyncSettings = {"enabled": True}
+        asyncSettings.update(settings or {})
+        asyncResolution = AsyncCoffeeResolution(resolver, {"asyncResolution": asyncSettings})
+        self.addCleanup(asyncResolution.stop)
+        return asyncResolution, resolver
+
+    def waitResolved(self, asyncResolution, observationId):
+        for i in range(100):
+            result = asyncResolution.getResult(observationId)
+            if result["resolved"]:
+                return result
+            time.sleep(0.02)
+        self.fail("Not resolved")
+
+    def testPendingUntilResolved(self):
+        asyncResolution, resolver = self.getAsyncResolution()
+        observationId = asyncResolution.submit("photo")
+
+        result = asyncResolution.getResult(observationId)
+        self.assertFalse(result["resolved"])
+        self.assertEqual(result["hasCoffeeMsg"], AsyncCoffeeResolution.pendingCoffeeMsg)
+
+        resolver.release.set()
+        result = self.waitResolved(asyncResolution, observationId)
+        self.assertEqual(result["hasCoffeeMsg"], "We have coffee")
+        self.assertEqual(result["coffeeLevel"], 0.6)
+        self.assertEqual(resolver.resolvedImages, ["photo"])
+        self.assertIsNone(asyncResolution.getResult("unknown"))
+
+    def testCallbacks(self):
+        asyncResolution, resolver = self.getAsyncResolution()
+        observationId = asyncResolution.submit("photo")
+        calledBack = []
+        asyncResolution.onResolved(observationId, lambda result: calledBack.append(result["hasCoffeeMsg"]))
+        asyncResolution.onResolved(observationId, lambda result: 1 / 0)
+
+        resolver.release.set()
+        self.waitResolved(asyncResolution, observationId)
+        for i in range(100):
+            if len(calledBack) > 0:
+                break
+            time.sleep(0.02)
+        self.assertEqual(calledBack, ["We have coffee"])
+
+        # Resolved already, called right away
+        asyncResolution.onResolved(observationId, lambda result: calledBack.append(result["coffeeLevel"]))
+        self.assertEqual(calledBack, ["We have coffee", 0.6])
+
+    def testFailedResolving(self):
+        asyncResolution, resolver = self.getAsyncResolution()
+        resolver.release.set()
+        result = self.waitResolved(asyncResolution, asyncResolution.submit("broken"))
+        self.assertEqual(result["hasCoffeeMsg"], "Not recognized")
+        self.assertEqual(result["error"], "Not a photo")
+
+    def testFullQueue(self):
+        asyncResolution, resolver = self.getAsyncResolution({"queueSize": 1})
+        firstId = asyncResolution.submit("photo1")
+        for i in range(100):
+            if asyncResolution.getStatus()["queued"] == 0:
+                break
+            time.sleep(0.01)
+        self.assertIsNotNone(asyncResolution.submit("photo2"))
+        self.assertIsNone(asyncResolution.submit("photo3"))
+        self.assertEqual(asyncResolution.getStatus()["results"], 2)
+        resolver.release.set()
+        self.waitResolved(asyncResolution, firstId)
+
+    def testPruning(self):
+        asyncResolution, resolver = self.getAsyncResolution({"maxResults": 2, "queueSize": 10})
+        resolver.release.set()
+        observationIds = [asyncResolution.submit("photo"+str(i)) for i in range(3)]
+        self.assertIsNone(asyncResolution.getResult(observationIds[0]))
+        self.assertIsNotNone(asyncResolution.getResult(observationIds[2]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+from apps.utils.images.Boxes import clipBox, intersectionOverUnion, isSameBox
+
+class TestBoxes(unittest.TestCase):
+
+    def testClipBox(self):
+        self.assertEqual(clipBox((10, 20, 30, 40), 640, 480), (10, 20, 30, 40))
+        self.assertEqual(clipBox((-10, -20, 30, 40), 640, 480), (0, 0, 20, 20))
+        self.assertEqual(clipBox((630, 470, 30, 40), 640, 480), (630, 470, 10, 10))
+        self.assertEqual(clipBox((700, 500, 30, 40), 640, 480), (700, 500, 0, 0))
+
+    def testSameBoxByTheOverlap(self):
+        self.assertEqual(intersectionOverUnion((0, 0, 10, 10), (0, 0, 10, 10)), 1)
+        self.assertEqual(intersectionOverUnion((0, 0, 10, 10), (10, 0, 10, 10)), 0)
+        self.assertAlmostEqual(intersectionOverUnion((0, 0, 10, 10), (5, 0, 10, 10)), 1 / 3)
+        self.assertTrue(isSameBox((0, 0, 10, 10), (5, 0, 10, 10), 0.3))
+        self.assertFalse(isSameBox((0, 0, 10, 10), (5, 0, 10, 10), 0.5))
+
+if __name__ == '__main__':
+    unittest.main()
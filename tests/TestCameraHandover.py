@@ -0,0 +1,79 @@
+import os
+import time
+import unittest
+from apps.DeviceApp.features.CameraShooter import CameraShooter
+from apps.DeviceApp.features.CameraStreamer import CameraStreamer
+
+fakeRaspistillPath = os.path.join(os.path.dirname(__file__), "fakes", "fakeRaspistill.py")
+
+class TestCameraHandover(unittest.TestCase):
+
+    def waitFor(self, condition, timeout = 5):
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def testWarmEngineLetsGoOfTheCameraForTheStream(self):
+        shooter = CameraShooter(None, False, {"camera": {
+            "captureEngine": "warm",
+            "command": fakeRaspistillPath,
+            "warmUpSeconds": 0.5,
+            "captureTimeout": 5,
+        }})
+        try:
+            shooter.captureOwnFrame()
+            self.assertTrue(shooter.captureEngine.isRunning())
+
+            shooter.releaseCamera()
+            self.assertFalse(shooter.captureEngine.isRunning())
+            with self.assertRaises(Exception):
+                shooter.captureObservation()
+            self.assertFalse(shooter.captureEngine.isRunning())
+
+            shooter.reclaimCamera()
+            self.assertTrue(self.waitFor(shooter.captureEngine.isRunning))
+            self.assertIsNotNone(shooter.captureObservation())
+        finally:
+            shooter.captureEngine.stop()
+
+    def testBackgroundCaptureStaysOffTheCameraWhileStreaming(self):
+        shooter = CameraShooter(None, False, {
+            "camera": {"captureEngine": "fake"},
+            "frameBuffer": {"backgroundCaptureEnabled": True, "captureInterval": 0.02},
+        })
+        try:
+            shooter.releaseCamera()
+            shooter.startBackgroundCapture()
+            time.sleep(0.2)
+            self.assertEqual(shooter.captureEngine.capturesCount, 0)
+
+            shooter.reclaimCamera()
+            self.assertTrue(self.waitFor(lambda: shooter.captureEngine.capturesCount > 0))
+        finally:
+            shooter.stopBackgroundCapture()
+
+    def testBackgroundCaptureStartsUpAndPausesForTheInProcessStream(self):
+        shooter = CameraShooter(None, False, {
+            "camera": {"captureEngine": "fake"},
+            "frameBuffer": {"backgroundCaptureEnabled": True, "captureInterval": 0.02},
+        })
+        cameraStreamer = CameraStreamer({"host": "http://localhost", "settings": {"streaming": {"mode": "inProcess", "idleShutdownSeconds": 0}}},
+            shooter.captureFrame, False, shooter.releaseCamera, shooter.reclaimCamera)
+        try:
+            shooter.startBackgroundServices()
+            self.assertTrue(self.waitFor(lambda: shooter.frameBuffer.getSize() > 0))
+
+            cameraStreamer.startStreaming()
+            self.assertTrue(shooter.isCameraReleased())
+            self.assertFalse(shooter.captureEngineReleased)
+            cameraStreamer.stopStreaming()
+            self.assertFalse(shooter.isCameraReleased())
+        finally:
+            cameraStreamer.stopStreaming()
+            shooter.stopBackgroundCapture()
+
+if __name__ == '__main__':
+    unittest.main()
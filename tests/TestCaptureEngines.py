@@ -0,0 +1,61 @@
+import io
+import os
+import unittest
+from apps.utils.images.JpegStreamReader import JpegStreamReader
+from apps.DeviceApp.hardware.capture.CaptureEngineFactory import CaptureEngineFactory
+
+testImagePath = os.path.join(os.path.dirname(__file__), "..", "apps", "DeviceApp", "data", "testimages", "5aa2867e.jpg")
+
+class TestCaptureEngines(unittest.TestCase):
+
+    def setUp(self):
+        with open(testImagePath, "rb") as imageFile:
+            self.frame = imageFile.read()
+
+    def testJpegStreamReaderSplitsFrames(self):
+        stream = io.BytesIO(b"junk" + self.frame + self.frame)
+        reader = JpegStreamReader(stream, chunkSize=1000)
+        self.assertEqual(reader.readFrame(), self.frame)
+        self.assertEqual(reader.readFrame(), self.frame)
+        with self.assertRaises(Exception):
+            reader.readFrame()
+
+    def testFakeEngine(self):
+        engine = CaptureEngineFactory.getInstance({"camera": {"captureEngine": "fake"}})
+        self.assertEqual(engine.captureFrame(), self.frame)
+        self.assertEqual(engine.capturesCount, 1)
+
+    def testSyntheticEngineCyclesFramesAtTheResolution(self):
+        import cv2
+        import numpy as np
+        engine = CaptureEngineFactory.getInstance({"camera": {
+            "captureEngine": "synthetic",
+            "syntheticSource": "procedural",
+            "syntheticFramesCount": 4,
+            "width": 320,
+            "height": 240,
+        }})
+        frames = [engine.captureFrame() for i in range(5)]
+        self.assertEqual(frames[0], frames[4])
+        self.assertNotEqual(frames[0], frames[1])
+        image = cv2.imdecode(np.frombuffer(frames[0], dtype=np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(image.shape, (240, 320, 3))
+
+    def testWarmEngineKeepsOneProcess(self):
+        engine = CaptureEngineFactory.getInstance({"camera": {
+            "captureEngine": "warm",
+            "command": os.path.join(os.path.dirname(__file__), "fakes", "fakeRaspistill.py"),
+            "warmUpSeconds": 0.5,
+            "captureTimeout": 5,
+        }})
+        try:
+            self.assertEqual(engine.captureFrame(), self.frame)
+            process = engine.process
+            self.assertEqual(engine.captureFrame(), self.frame)
+            self.assertIs(engine.process, process)
+        finally:
+            engine.stop()
+        self.assertFalse(engine.isRunning())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import tempfile
+import time
+import unittest
+import cv2
+import numpy as np
+from apps.DeviceApp.features.coffee.CoffeeChecker import CoffeeChecker
+
+class StubStorage():
+
+    def __init__(self):
+        self.savedImages = []
+
+    def clearPreviousMediaFiles(self, keptFilenames = None):
+        pass
+
+    def setupMediaFilename(self):
+        pass
+
+    def saveImageData(self, imageData):
+        self.savedImages.append(bytes(imageData))
+
+    def getMediaFilename(self):
+        return str(len(self.savedImages))+".jpg"
+
+    def getMediaFileUrl(self):
+        return "http://localhost/media/"+self.getMediaFilename()
+
+class MarkingFilter():
+
+    def __init__(self):
+        self.failing = False
+
+    def blurImageData(self, cvImage, frameViews = None):
+        if self.failing:
+            raise Exception("Blur failed")
+        cvImage[0:80, 0:80] = (0, 0, 255)
+        return cvImage
+
+class TestCoffeeChecker(unittest.TestCase):
+
+    def getCoffeeChecker(self, settings = None, mediaDirectory = None):
+        appSettings = {
+            "CoffeeSituationResolverEnabled": True,
+            "camera": {"captureEngine": "fake"},
+            "streaming": {"mode": "inProcess", "idleShutdownSeconds": 0},
+        }
+        appSettings.update(settings or {})
+        coffeeChecker = CoffeeChecker({
+            "app": {"host": "http://localhost", "storage_driver": "local", "settings": appSettings},
+            "storage": {"local": {"mediaDirectory": mediaDirectory, "mediaHost": "http://localhost/media"}},
+            "coffeeAccess": {},
+        })
+        self.addCleanup(coffeeChecker.cameraStreamer.stopStreaming)
+
+        # Stored to the media directory if any
+        if mediaDirectory is None:
+            self.storage = StubStorage()
+            coffeeChecker.storage = self.storage
+            coffeeChecker.cameraShooter.storage = self.storage
+        self.markingFilter = MarkingFilter()
+        coffeeChecker.imageBlurrer = self.markingFilter
+
+        # The resolver sees the photos, resolved as usual, kept as is to catch a blur in place later on
+        self.resolvedImages = []
+        resolveCoffeeVerdictFromImage = coffeeChecker.coffeeSituationResolver.resolveCoffeeVerdictFromImage
+        def recordingResolveCoffeeVerdictFromImage(cvImage, frameViews = None):
+            self.resolvedImages.append(cvImage)
+            return resolveCoffeeVerdictFromImage(cvImage, frameViews)
+        coffeeChecker.coffeeSituationResolver.resolveCoffeeVerdictFromImage = recordingResolveCoffeeVerdictFromImage
+        return coffeeChecker
+
+    def isMarked(self, cvImage):
+        markedArea = cvImage[10:70, 10:70].reshape(-1, 3).mean(axis=0)
+        return markedArea[2] > 200 and markedArea[0] < 60 and markedArea[1] < 60
+
+    def assertOnlyTheStoredPhotoIsBlurred(self):
+        self.assertEqual(len(self.resolvedImages), 1)
+        self.assertEqual(len(self.storage.savedImages), 1)
+        self.assertFalse(self.isMarked(self.resolvedImages[0]))
+        self.assertTrue(self.isMarked(cv2.imdecode(np.frombuffer(self.storage.savedImages[0], dtype=np.uint8), cv2.IMREAD_COLOR)))
+
+    def testResolvesTheCapturedPhotoAndStoresTheBlurredOne(self):
+        coffeeChecker = self.getCoffeeChecker()
+        coffeeSituation = coffeeChecker.observeCoffeeSituation()
+        self.assertOnlyTheStoredPhotoIsBlurred()
+        self.assertFalse(coffeeSituation["streaming"])
+        self.assertEqual(coffeeSituation["coffeeObservationUrl"], "http://localhost/media/1.jpg")
+        self.assertIn(coffeeSituation["hasCoffeeMsg"], ["We might have coffee", "Not recognized"])
+
+    def testFailingBlurStoresNothing(self):
+        coffeeChecker = self.getCoffeeChecker()
+        self.markingFilter.failing = True
+        with self.assertRaises(Exception):
+            coffeeChecker.observeCoffeeSituation()
+        self.assertEqual(self.storage.savedImages, [])
+
+    def testUnchangedPhotoReusesThePreviousObservation(self):
+        coffeeChecker = self.getCoffeeChecker({"changeDetection": {"enabled": True}})
+        firstCoffeeSituation = coffeeChecker.observeCoffeeSituation()
+        secondCoffeeSituation = coffeeChecker.observeCoffeeSituation()
+        self.assertEqual(secondCoffeeSituation, firstCoffeeSituation)
+        self.assertOnlyTheStoredPhotoIsBlurred()
+        self.assertEqual(coffeeChecker.cameraShooter.captureEngine.capturesCount, 2)
+
+    def testSnapshotOfTheStreamWhileStreaming(self):
+        coffeeChecker = self.getCoffeeChecker()
+        coffeeChecker.cameraStreamer.startStreaming()
+        deadline = time.time() + 5
+        while coffeeChecker.cameraStreamer.getSnapshotFrame() is None:
+            if time.time() > deadline:
+                self.fail("No stream snapshot")
+            time.sleep(0.01)
+
+        coffeeSituation = coffeeChecker.observeCoffeeSituation()
+        self.assertOnlyTheStoredPhotoIsBlurred()
+        self.assertTrue(coffeeSituation["streaming"])
+        self.assertEqual(coffeeSituation["coffeeObservationUrl"], "http://localhost/stream")
+        self.assertEqual(coffeeSituation["snapshotUrl"], "http://localhost/media/1.jpg")
+
+    def testAnsweredPhotoOutlivesTheBackgroundObservations(self):
+        mediaDirectory = tempfile.TemporaryDirectory()
+        self.addCleanup(mediaDirectory.cleanup)
+        coffeeChecker = self.getCoffeeChecker({"observationScheduler": {"enabled": True}}, mediaDirectory.name)
+        answeredPhoto = os.path.basename(coffeeChecker.hasWeCoffee()["coffeeObservationUrl"])
+
+        for i in range(3):
+            time.sleep(0.002)
+            coffeeChecker.runScheduledObservation()
+        self.assertIn(answeredPhoto, os.listdir(mediaDirectory.name))
+        self.assertEqual(len(os.listdir(mediaDirectory.name)), 3)
+
+        # Answered from the latest background observation, the earlier answer goes with the next observation
+        latestAnsweredPhoto = os.path.basename(coffeeChecker.hasWeCoffee()["coffeeObservationUrl"])
+        self.assertNotEqual(latestAnsweredPhoto, answeredPhoto)
+        time.sleep(0.002)
+        coffeeChecker.runScheduledObservation()
+        photos = os.listdir(mediaDirectory.name)
+        self.assertNotIn(answeredPhoto, photos)
+        self.assertIn(latestAnsweredPhoto, photos)
+        self.assertEqual(len(photos), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import unittest
+import numpy as np
+from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+
+class TestCoffeeLevelStrategies(unittest.TestCase):
+
+    def getPotImage(self, coffeeLevel):
+        # A light pot on a mid gray wall, filled with coffee from the bottom, a dark lid
+        cvImage = np.full((480, 640, 3), 120, dtype=np.uint8)
+        cvImage[200:400, 300:400] = 200
+        cvImage[200:240, 300:400] = 60
+        coffeeTop = 400 - 10 - int(150 * coffeeLevel)
+        cvImage[coffeeTop:390, 320:380] = 25
+        return cvImage
+
+    def getResolver(self, strategy):
+        return CoffeeSituationResolver({
+            "CoffeeSituationResolverEnabled": True,
+            "coffeeLevelEstimator": {"strategy": strategy},
+            "coffeePotRegions": {"enabled": True, "regions": [[300, 200, 100, 200]]},
+        })
+
+    def testIntensityProfileMeasuresTheFillLevel(self):
+        coffeeSituationResolver = self.getResolver("IntensityProfileCoffeeLevelStrategy")
+        for coffeeLevel in [0.2, 0.5, 0.9]:
+            self.assertEqual(coffeeSituationResolver.resolveCoffeeSituationFromImage(self.getPotImage(coffeeLevel)), "We might have coffee")
+            self.assertAlmostEqual(coffeeSituationResolver.getCoffeeLevel(), coffeeLevel, delta=0.08)
+            self.assertGreater(coffeeSituationResolver.getCoffeeLevelScores()["darkness"], 0.87)
+
+        self.assertEqual(coffeeSituationResolver.resolveCoffeeSituationFromImage(self.getPotImage(0)), "Not recognized")
+        self.assertEqual(coffeeSituationResolver.getCoffeeLevel(), 0)
+
+        # A black frame can not be measured
+        self.assertEqual(coffeeSituationResolver.resolveCoffeeSituationFromImage(np.zeros((480, 640, 3), dtype=np.uint8)), "Not recognized")
+        self.assertIsNone(coffeeSituationResolver.getCoffeeLevel())
+
+    def testHaarStrategyMeasuresTheLiquidsInThePot(self):
+        coffeeSituationResolver = self.getResolver("HaarCoffeeLevelStrategy")
+        coffeePot = (300, 200, 100, 200)
+        cvImage = self.getPotImage(0.5)
+
+        # The liquid areas are found in the pot coordinates, measured in the frame coordinates
+        class LiquidAreaCascade():
+            def detectMultiScale(self, cvImageGray, scaleFactor, minNeighbors):
+                return [(20, 115, 60, 75)]
+        coffeeSituationResolver.coffeeLevelStrategy.liquidAreaCascade = LiquidAreaCascade()
+        potScores = coffeeSituationResolver.coffeeLevelStrategy.measureCoffeePot(cvImage, cvImage[:, :, 0], coffeePot)
+        self.assertAlmostEqual(potScores["darkness"], 1 - 25 / 255, places=3)
+        self.assertAlmostEqual(potScores["level"], 0.425)
+
+    def testResolutionsDoNotMixTheirVerdicts(self):
+        coffeeSituationResolver = self.getResolver("IntensityProfileCoffeeLevelStrategy")
+        measureCoffeePot = coffeeSituationResolver.coffeeLevelStrategy.measureCoffeePot
+        measuring = threading.Event()
+        release = threading.Event()
+        def slowMeasureCoffeePot(cvImage, cvImageGray, coffeePot):
+            if not measuring.is_set():
+                measuring.set()
+                release.wait(5)
+            return measureCoffeePot(cvImage, cvImageGray, coffeePot)
+        coffeeSituationResolver.coffeeLevelStrategy.measureCoffeePot = slowMeasureCoffeePot
+
+        verdicts = {}
+        def resolve(coffeeLevel):
+            verdicts[coffeeLevel] = coffeeSituationResolver.resolveCoffeeVerdictFromImage(self.getPotImage(coffeeLevel))
+        fullPot = threading.Thread(target=resolve, args=(0.9,))
+        fullPot.start()
+        self.assertTrue(measuring.wait(5))
+
+        # The empty pot waits for the full pot verdict to be read
+        emptyPot = threading.Thread(target=resolve, args=(0,))
+        emptyPot.start()
+        emptyPot.join(0.2)
+        self.assertTrue(emptyPot.is_alive())
+        release.set()
+        fullPot.join(5)
+        emptyPot.join(5)
+
+        self.assertEqual(verdicts[0.9][0], "We might have coffee")
+        self.assertAlmostEqual(verdicts[0.9][1], 0.9, delta=0.08)
+        self.assertEqual(verdicts[0], ("Not recognized", 0))
+        self.assertEqual(coffeeSituationResolver.getCoffeeVerdict(), ("Not recognized", 0))
+
+    def testUnknownStrategy(self):
+        with self.assertRaises(Exception):
+            self.getResolver("NoSuchCoffeeLevelStrategy")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from apps.DeviceApp.features.coffee.CoffeeLevelHistory import CoffeeLevelHistory
+from apps.DeviceApp.features.coffee.CoffeeLevelTracker import CoffeeLevelTracker
+
+class TestCoffeeLevelTracker(unittest.TestCase):
+
+    def getTracker(self, **settings):
+        return CoffeeLevelTracker({"coffeeLevelTracker": dict({"enabled": True, "smoothingWindow": 3}, **settings)})
+
+    def testHistoryOverwritesTheOldest(self):
+        history = CoffeeLevelHistory(3)
+        for timestamp in range(5):
+            history.push(float(timestamp), 0.9, None if timestamp == 4 else timestamp / 10)
+        self.assertEqual(history.getCount(), 3)
+        self.assertEqual([observation[0] for observation in history.getLatest()], [2.0, 3.0, 4.0])
+        self.assertIsNone(history.getLatest()[-1][2])
+        self.assertEqual([observation[0] for observation in history.getLatest(2, minTimestamp=3.5)], [4.0])
+
+    def testBrewRunningLowAndEmpty(self):
+        coffeeLevelTracker = self.getTracker()
+        self.assertIsNone(coffeeLevelTracker.getCoffeeMsg(now=0))
+
+        events = []
+        for now, level in enumerate([0.0, 0.0, 0.0, 0.8, 0.8, 0.8, 0.2, 0.2, 0.0, 0.0]):
+            events.append(coffeeLevelTracker.recordObservation(0.95 if level > 0 else 0.0, level, now=now))
+        self.assertEqual([event for event in events if event is not None], ["brewed", "runningLow", "empty"])
+        self.assertEqual(coffeeLevelTracker.getStatus()["lastEvent"], {"event": "empty", "at": 9})
+        self.assertEqual(coffeeLevelTracker.getCoffeeMsg(now=10), "No coffee")
+
+    def testNoisyFramesAndThresholdsDoNotFlap(self):
+        coffeeLevelTracker = self.getTracker()
+        for now in range(3):
+            coffeeLevelTracker.recordObservation(0.95, 0.8, now=now)
+        # Not seen brewing, the first state is not a fresh pot
+        self.assertEqual(coffeeLevelTracker.getCoffeeMsg(now=3), "We have coffee")
+
+        # A single bad frame is outvoted, unknown frames are skipped
+        self.assertIsNone(coffeeLevelTracker.recordObservation(0.1, 0.0, now=3))
+        self.assertIsNone(coffeeLevelTracker.recordObservation(None, None, now=4))
+
+        # Hovering around the low level stays in the state reached
+        for now, level in enumerate([0.25, 0.25, 0.25, 0.38, 0.38, 0.38, 0.33, 0.33], start=5):
+            coffeeLevelTracker.recordObservation(0.95, level, now=now)
+        self.assertEqual(coffeeLevelTracker.getStatus()["state"], CoffeeLevelTracker.stateLow)
+        self.assertEqual(coffeeLevelTracker.getCoffeeMsg(now=13), "Coffee is running low")
+        self.assertIsNone(coffeeLevelTracker.getCoffeeMsg(now=13 + 3600 + 1))
+
+if __name__ == '__main__':
+    unittest.main()
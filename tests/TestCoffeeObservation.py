@@ -0,0 +1,38 @@
+import os
+import unittest
+from apps.DeviceApp.features.coffee.CoffeeObservation import CoffeeObservation, openCvNotInstalled
+
+testImagePath = os.path.join(os.path.dirname(__file__), "..", "apps", "DeviceApp", "data", "testimages", "5aa2867e.jpg")
+
+@unittest.skipIf(openCvNotInstalled, "OpenCV not installed")
+class TestCoffeeObservation(unittest.TestCase):
+
+    def setUp(self):
+        with open(testImagePath, "rb") as imageFile:
+            self.frame = imageFile.read()
+
+    def testUnmodifiedFrameIsStoredAsCaptured(self):
+        coffeeObservation = CoffeeObservation(self.frame)
+        image = coffeeObservation.getImage()
+        self.assertIs(coffeeObservation.getImage(), image)
+        self.assertIs(coffeeObservation.getEncodedFrame(), self.frame)
+
+    def testModifiedImageIsEncodedOnce(self):
+        coffeeObservation = CoffeeObservation(self.frame)
+        image = coffeeObservation.getImage()
+        image[0:10, 0:10] = 0
+        coffeeObservation.setImage(image)
+        encodedFrame = coffeeObservation.getEncodedFrame()
+        self.assertIs(coffeeObservation.getEncodedFrame(), encodedFrame)
+        self.assertEqual(bytes(encodedFrame[:2]), b"\xff\xd8")
+
+    def testFrameViewsAreOfTheCapturedImageUntilReleased(self):
+        coffeeObservation = CoffeeObservation(self.frame)
+        frameViews = coffeeObservation.getFrameViews()
+        self.assertIs(frameViews.getImage(), coffeeObservation.getImage())
+        self.assertIs(coffeeObservation.getFrameViews(), frameViews)
+        coffeeObservation.releaseFrameViews()
+        self.assertIsNot(coffeeObservation.getFrameViews(), frameViews)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+import cv2
+from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+from apps.utils.Utils import getProjectRootPath
+from apps.utils.images.Boxes import isSameBox
+
+class TestCoffeePotRegions(unittest.TestCase):
+
+    def setUp(self):
+        testImagesPath = getProjectRootPath()+"/apps/DeviceApp/data/testimages/"
+        self.images = [cv2.imread(testImagesPath+imageName) for imageName in ["mismoro.png", "mismoro_orig.png", "moro.png"]]
+        self.workDirectory = tempfile.TemporaryDirectory()
+        self.regionsFile = os.path.join(self.workDirectory.name, "coffeePotRegions.json")
+
+    def tearDown(self):
+        self.workDirectory.cleanup()
+
+    def getResolver(self, potRegionsSettings):
+        return CoffeeSituationResolver({"CoffeeSituationResolverEnabled": True, "coffeePotRegions": dict({"enabled": True, "regionsFile": self.regionsFile}, **potRegionsSettings)})
+
+    def testCalibratedRegionsGiveTheFullFrameVerdict(self):
+        coffeeSituationResolver = self.getResolver({"fullDetectionInterval": 1000})
+        potRegions = coffeeSituationResolver.calibratePotRegions(iter(self.images))
+        self.assertTrue(any(isSameBox(potRegion, (287, 200, 125, 169), CoffeeSituationResolver.samePotMinOverlap) for potRegion in potRegions))
+        coffeeSituationResolver.savePotRegions(self.regionsFile)
+
+        fullFrameResolver = CoffeeSituationResolver({"CoffeeSituationResolverEnabled": True})
+        coffeeSituationResolver = self.getResolver({"fullDetectionInterval": 1000})
+        self.assertEqual(coffeeSituationResolver.getCalibratedPotRegions(), potRegions)
+        for cvImage in self.images:
+            self.assertEqual(coffeeSituationResolver.resolveCoffeeSituationFromImage(cvImage), fullFrameResolver.resolveCoffeeSituationFromImage(cvImage))
+
+    def testRegionsFollowTheFullDetection(self):
+        coffeeSituationResolver = self.getResolver({"regions": [[277, 190, 125, 169], [600, 400, 30, 30]], "fullDetectionInterval": 1})
+        cvImageGray = cv2.cvtColor(self.images[0], cv2.COLOR_BGR2GRAY)
+
+        # The first one scans the regions, the second one the full frame
+        self.assertEqual(len(coffeeSituationResolver.detectCoffeePots(cvImageGray)), 1)
+        self.assertGreater(len(coffeeSituationResolver.detectCoffeePots(cvImageGray)), 1)
+        self.assertEqual(coffeeSituationResolver.getCalibratedPotRegions(), [(287, 200, 125, 169), (600, 400, 30, 30)])
+
+    def testCalibratedRegionsFollowTheFullDetectionWithoutPotDetections(self):
+        coffeeSituationResolver = CoffeeSituationResolver({
+            "CoffeeSituationResolverEnabled": True,
+            "coffeeLevelEstimator": {"strategy": "IntensityProfileCoffeeLevelStrategy"},
+            "coffeePotRegions": {"enabled": True, "regionsFile": self.regionsFile, "regions": [[277, 190, 125, 169]], "fullDetectionInterval": 1},
+        })
+        cvImageGray = cv2.cvtColor(self.images[0], cv2.COLOR_BGR2GRAY)
+
+        # The first one measures the region as such, the second one follows the pot found in the full frame
+        self.assertEqual(coffeeSituationResolver.getCoffeePots(cvImageGray), [(277, 190, 125, 169)])
+        self.assertEqual(coffeeSituationResolver.getCoffeePots(cvImageGray), [(287, 200, 125, 169)])
+        self.assertEqual(coffeeSituationResolver.getCalibratedPotRegions(), [(287, 200, 125, 169)])
+
+if __name__ == '__main__':
+    unittest.main()
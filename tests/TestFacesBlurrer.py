@@ -0,0 +1,56 @@
+import os
+import unittest
+import cv2
+import numpy as np
+from apps.utils.images.Boxes import isSameBox
+from apps.utils.images.filters.FacesBlurrer import FacesBlurrer
+
+testImagePath = os.path.join(os.path.dirname(__file__), "..", "apps", "DeviceApp", "data", "testimages", "moro_orig.png")
+
+class TestFacesBlurrer(unittest.TestCase):
+
+    def setUp(self):
+        self.cvImage = cv2.imread(testImagePath)
+        self.faceBox = (300, 52, 60, 60) # Found by a full resolution detection
+
+    def testReducedResolutionDetectionFindsTheFace(self):
+        facesBlurrer = FacesBlurrer({"facesBlurrer": {"margin": 0}})
+        faces = facesBlurrer.detectFaces(self.cvImage)
+        self.assertEqual(len(faces), 1)
+        self.assertTrue(isSameBox(faces[0], self.faceBox, FacesBlurrer.sameFaceMinOverlap))
+
+    def testNewFacesAreFoundWhileTracking(self):
+        facesBlurrer = FacesBlurrer({"facesBlurrer": {"margin": 0}})
+        self.assertEqual(len(facesBlurrer.detectFaces(self.cvImage)), 1)
+
+        # Someone else shows up elsewhere while the first face is tracked
+        x, y, w, h = self.faceBox
+        newcomerImage = np.full_like(self.cvImage, 128)
+        newcomerImage[300:460, 40:200] = self.cvImage[y-40:y+h+60, x-50:x+w+50]
+        faces = facesBlurrer.detectFaces(newcomerImage)
+        self.assertEqual(len(faces), 2)
+        self.assertTrue(any(isSameBox(face, (90, 338, 60, 60), FacesBlurrer.sameFaceMinOverlap) for face in faces))
+        self.assertTrue(any(isSameBox(face, self.faceBox, FacesBlurrer.sameFaceMinOverlap) for face in faces))
+
+    def testLostFaceStaysBlurredUntilExpired(self):
+        facesBlurrer = FacesBlurrer()
+        facesBlurrer.detectFaces(self.cvImage)
+        blankImage = np.zeros_like(self.cvImage)
+        self.assertEqual(len(facesBlurrer.detectFaces(blankImage)), 1)
+
+        facesBlurrer.settings["trackingMaxAgeSeconds"] = -1
+        self.assertEqual(facesBlurrer.detectFaces(blankImage), [])
+
+    def testDetectionIsLimitedToTheRegions(self):
+        facesBlurrer = FacesBlurrer({"facesBlurrer": {"detectionRegions": [[0, 200, 640, 280]]}})
+        self.assertEqual(facesBlurrer.detectFaces(self.cvImage), [])
+
+    def testFaceIsBlurred(self):
+        cvImage = self.cvImage.copy()
+        FacesBlurrer().blurImageData(cvImage)
+        x, y, w, h = self.faceBox
+        self.assertFalse((cvImage[y:y+h, x:x+w] == self.cvImage[y:y+h, x:x+w]).all())
+        self.assertTrue((cvImage[300:, :] == self.cvImage[300:, :]).all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from apps.utils.FileSystem import ensureDirectory, moveFile, copyFile, isProcessRunning
+
+class TestFileSystem(unittest.TestCase):
+
+    def setUp(self):
+        self.workDirectory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.workDirectory.cleanup()
+
+    def testCopyAndMove(self):
+        sourcePath = os.path.join(self.workDirectory.name, "source.jpg")
+        with open(sourcePath, "wb") as sourceFile:
+            sourceFile.write(b"coffee")
+        mediaDirectory = os.path.join(self.workDirectory.name, "images", "coffee")
+        ensureDirectory(mediaDirectory)
+        ensureDirectory(mediaDirectory)
+
+        copyFile(sourcePath, os.path.join(mediaDirectory, "copy.jpg"))
+        moveFile(sourcePath, os.path.join(mediaDirectory, "moved.jpg"))
+
+        self.assertFalse(os.path.exists(sourcePath))
+        self.assertEqual(sorted(os.listdir(mediaDirectory)), ["copy.jpg", "moved.jpg"])
+
+    def testProcessProbeScansProcfs(self):
+        for processId, processName in [("1", "systemd"), ("42", "motion"), ("self", "python3")]:
+            os.makedirs(os.path.join(self.workDirectory.name, processId))
+            with open(os.path.join(self.workDirectory.name, processId, "comm"), "w") as commFile:
+                commFile.write(processName+"\n")
+        self.assertTrue(isProcessRunning("motion", self.workDirectory.name))
+        self.assertFalse(isProcessRunning("python3", self.workDirectory.name))
+        self.assertFalse(isProcessRunning("raspistill", self.workDirectory.name))
+
+if __name__ == '__main__':
+    unittest.main()
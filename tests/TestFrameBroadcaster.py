@@ -0,0 +1,78 @@
+import time
+import unittest
+from apps.DeviceApp.features.CameraStreamer import CameraStreamer
+from apps.DeviceApp.features.streaming.FrameBroadcaster import FrameBroadcaster
+from apps.DeviceApp.features.streaming.StreamClient import StreamClient
+
+class TestFrameBroadcaster(unittest.TestCase):
+
+    def setUp(self):
+        self.capturesCount = 0
+        self.settings = dict(CameraStreamer.defaultStreamingSettings)
+        self.settings.update({"maxFramesPerSecond": 200, "idleFramesPerSecond": 200, "framesBudgetPerSecond": 400})
+
+    def captureFrame(self):
+        self.capturesCount += 1
+        return b"frame"+str(self.capturesCount).encode()
+
+    def testSlowClientDropsOldestFrames(self):
+        client = StreamClient(2)
+        for frame in [b"1", b"2", b"3"]:
+            client.push(frame)
+        self.assertEqual(client.droppedFramesCount, 1)
+        self.assertEqual(client.getFrame(0), b"2")
+        self.assertEqual(client.getFrame(0), b"3")
+        self.assertIsNone(client.getFrame(0))
+
+    def testFrameRateFollowsViewers(self):
+        frameBroadcaster = FrameBroadcaster(self.captureFrame, dict(self.settings, framesBudgetPerSecond=30, maxFramesPerSecond=15, minFramesPerSecond=2, idleFramesPerSecond=1))
+        self.assertEqual(frameBroadcaster.getFramesPerSecond(), 1)
+        clients = [frameBroadcaster.subscribe() for i in range(1)]
+        self.assertEqual(frameBroadcaster.getFramesPerSecond(), 15)
+        clients.extend(frameBroadcaster.subscribe() for i in range(2))
+        self.assertEqual(frameBroadcaster.getFramesPerSecond(), 10)
+        clients.extend(frameBroadcaster.subscribe() for i in range(27))
+        self.assertEqual(frameBroadcaster.getFramesPerSecond(), 2)
+        frameBroadcaster.unsubscribe(clients[0])
+        self.assertEqual(frameBroadcaster.getViewersCount(), 29)
+
+    def testViewersShareTheCapturedFrames(self):
+        frameBroadcaster = FrameBroadcaster(self.captureFrame, self.settings)
+        frameBroadcaster.start()
+        try:
+            streams = [frameBroadcaster.generateMultipartStream(1) for i in range(3)]
+            parts = [[next(stream) for i in range(5)] for stream in streams]
+            self.assertEqual(frameBroadcaster.getViewersCount(), 3)
+            for part in parts[0]:
+                self.assertTrue(part.startswith(b"--frame\r\nContent-Type: image/jpeg\r\n"))
+            # Captured once per frame, not once per viewer
+            self.assertLess(self.capturesCount, 3 * 5)
+            self.assertIsNotNone(frameBroadcaster.getNewestFrame(5))
+
+            for stream in streams:
+                stream.close()
+            self.assertEqual(frameBroadcaster.getViewersCount(), 0)
+        finally:
+            frameBroadcaster.stop()
+        self.assertFalse(frameBroadcaster.isRunning())
+
+    def testStreamerServesSnapshotsWhileStreaming(self):
+        self.assertIsNone(CameraStreamer({"host": "http://localhost"}).frameBroadcaster)
+        cameraStreamer = CameraStreamer({"host": "http://localhost", "settings": {"streaming": dict(self.settings, mode="inProcess")}}, self.captureFrame)
+        self.assertEqual(cameraStreamer.shellApplicationRequirements, [])
+        self.assertFalse(cameraStreamer.areWeCurrentlyStreaming())
+        self.assertTrue(cameraStreamer.canServeSnapshots())
+        cameraStreamer.startStreaming()
+        try:
+            deadline = time.time() + 5
+            while cameraStreamer.getSnapshotFrame() is None:
+                if time.time() > deadline:
+                    self.fail("No stream snapshot")
+                time.sleep(0.01)
+            self.assertEqual(cameraStreamer.getStreamingStatus()["mode"], "inProcess")
+        finally:
+            cameraStreamer.stopStreaming()
+        self.assertIsNone(cameraStreamer.getSnapshotFrame())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import time
+import unittest
+from apps.DeviceApp.features.FrameRingBuffer import FrameRingBuffer
+from apps.DeviceApp.features.CameraShooter import CameraShooter
+
+class TestFrameRingBuffer(unittest.TestCase):
+
+    def testBufferIsBounded(self):
+        frameBuffer = FrameRingBuffer(2)
+        for frame in [b"1", b"2", b"3"]:
+            frameBuffer.push(frame)
+        self.assertEqual(frameBuffer.getSize(), 2)
+        self.assertEqual(frameBuffer.getNewest()[1], b"3")
+
+    def testStaleFramesAreNotServed(self):
+        frameBuffer = FrameRingBuffer(2)
+        frameBuffer.push(b"old", time.time() - 60)
+        self.assertIsNone(frameBuffer.getNewestFrame(30))
+        self.assertEqual(frameBuffer.getNewestFrame(90), b"old")
+
+    def testShooterServesBufferedFrame(self):
+        shooter = CameraShooter(None, False, {
+            "camera": {"captureEngine": "fake"},
+            "frameBuffer": {"backgroundCaptureEnabled": True, "captureInterval": 60, "freshnessSeconds": 60},
+        })
+        try:
+            shooter.startBackgroundCapture()
+            deadline = time.time() + 5
+            while shooter.frameBuffer.getSize() == 0:
+                if time.time() > deadline:
+                    self.fail("No frame was captured in the background")
+                time.sleep(0.01)
+            capturesCount = shooter.captureEngine.capturesCount
+            shooter.getFreshFrame()
+            shooter.getFreshFrame()
+            self.assertEqual(shooter.captureEngine.capturesCount, capturesCount)
+        finally:
+            shooter.stopBackgroundCapture()
+
+if __name__ == '__main__':
+    unittest.main()
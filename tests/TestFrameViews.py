@@ -0,0 +1,58 @@
+import os
+import threading
+import unittest
+import cv2
+from apps.utils.images.FrameViews import FrameViews
+from apps.utils.images.filters.FacesBlurrer import FacesBlurrer
+from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+
+testImagesPath = os.path.join(os.path.dirname(__file__), "..", "apps", "DeviceApp", "data", "testimages")
+
+class TestFrameViews(unittest.TestCase):
+
+    def setUp(self):
+        self.cvImage = cv2.imread(os.path.join(testImagesPath, "moro_orig.png"))
+
+    def testGrayIsComputedOnce(self):
+        frameViews = FrameViews(self.cvImage)
+        computed = []
+        originalCvtColor = cv2.cvtColor
+        def countedCvtColor(*args):
+            computed.append(1)
+            return originalCvtColor(*args)
+
+        grays = []
+        cv2.cvtColor = countedCvtColor
+        try:
+            askers = [threading.Thread(target=lambda: grays.append(frameViews.getGray())) for i in range(4)]
+            for asker in askers:
+                asker.start()
+            for asker in askers:
+                asker.join()
+        finally:
+            cv2.cvtColor = originalCvtColor
+
+        self.assertEqual(len(computed), 1)
+        self.assertTrue(all(gray is grays[0] for gray in grays))
+        self.assertTrue((grays[0] == cv2.cvtColor(self.cvImage, cv2.COLOR_BGR2GRAY)).all())
+        self.assertEqual(frameViews.getComputedViewNames(), ["gray"])
+
+    def testFacesAreFoundFromTheSharedGray(self):
+        frameViews = FrameViews(self.cvImage)
+        faces = FacesBlurrer().detectFaces(self.cvImage.copy(), frameViews)
+        self.assertEqual(faces, FacesBlurrer().detectFaces(self.cvImage))
+        self.assertEqual(frameViews.getComputedViewNames(), ["gray"])
+
+    def testResolverReadsTheSharedGray(self):
+        cvImage = cv2.imread(os.path.join(testImagesPath, "5aa2867e.jpg"))
+        coffeeSituationResolver = CoffeeSituationResolver({"CoffeeSituationResolverEnabled": True})
+        hasCoffeeMsg = coffeeSituationResolver.resolveCoffeeSituationFromImage(cvImage)
+        coffeeLevelScores = coffeeSituationResolver.getCoffeeLevelScores()
+
+        frameViews = FrameViews(cvImage)
+        self.assertEqual(coffeeSituationResolver.resolveCoffeeSituationFromImage(cvImage, frameViews), hasCoffeeMsg)
+        self.assertEqual(coffeeSituationResolver.getCoffeeLevelScores(), coffeeLevelScores)
+        self.assertEqual(frameViews.getComputedViewNames(), ["gray"])
+
+if __name__ == '__main__':
+    unittest.main()
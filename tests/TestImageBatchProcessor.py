@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+import unittest
+from apps.DeviceApp.features.ImageBatchProcessor import ImageBatchProcessor
+from apps.utils.Utils import getProjectRootPath
+
+class TestImageBatchProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.workDirectory = tempfile.TemporaryDirectory()
+        self.imagePath = getProjectRootPath()+"/apps/DeviceApp/data/testimages/5aa2867e.jpg"
+        self.options = {"filters": ["AreaBlurrer"], "resolve": False, "outputPath": os.path.join(self.workDirectory.name, "output"), "workers": 2}
+
+    def tearDown(self):
+        self.workDirectory.cleanup()
+
+    def runBatch(self, inputPath):
+        resultsFile = io.StringIO()
+        summary = ImageBatchProcessor(self.options).run(inputPath, resultsFile)
+        results = [json.loads(line) for line in resultsFile.getvalue().splitlines()]
+        return summary, sorted(results, key=lambda result: result["name"])
+
+    def testTarArchive(self):
+        archivePath = os.path.join(self.workDirectory.name, "photos.tar.gz")
+        with tarfile.open(archivePath, "w:gz") as archive:
+            archive.add(self.imagePath, "a/first.jpg")
+            archive.add(self.imagePath, "second.jpg")
+            archive.addfile(tarfile.TarInfo("broken.jpg"), io.BytesIO(b""))
+
+        summary, results = self.runBatch(archivePath)
+        self.assertEqual(summary["images"], 3)
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual([result["name"] for result in results], ["a/first.jpg", "broken.jpg", "second.jpg"])
+        self.assertIn("error", results[1])
+        self.assertEqual((results[0]["width"], results[0]["height"]), (640, 480))
+        self.assertIn("AreaBlurrer", results[0]["filterTimes"])
+        self.assertTrue(os.path.isfile(os.path.join(self.options["outputPath"], "a/first.jpg")))
+
+    def testArchiveNamesDoNotEscapeTheOutput(self):
+        archivePath = os.path.join(self.workDirectory.name, "evil.tar")
+        with tarfile.open(archivePath, "w") as archive:
+            archive.add(self.imagePath, "../escaped.jpg")
+            archive.add(self.imagePath, "a/../../escaped2.jpg")
+            absoluteMember = archive.gettarinfo(self.imagePath)
+            absoluteMember.name = os.path.join(self.workDirectory.name, "absolute.jpg")
+            with open(self.imagePath, "rb") as imageFile:
+                archive.addfile(absoluteMember, imageFile)
+            archive.add(self.imagePath, "a/../fine.jpg")
+
+        summary, results = self.runBatch(archivePath)
+        self.assertEqual(summary["images"], 4)
+        self.assertEqual(summary["failed"], 3)
+        for result in results:
+            if result["name"] == "a/../fine.jpg":
+                self.assertNotIn("error", result)
+            else:
+                self.assertIn("outside the output directory", result["error"])
+        self.assertEqual(sorted(os.listdir(self.workDirectory.name)), ["evil.tar", "output"])
+        self.assertEqual(os.listdir(self.options["outputPath"]), ["fine.jpg"])
+
+    def testNotAnImageSource(self):
+        with self.assertRaises(Exception):
+            self.runBatch(self.imagePath)
+
+    def testFacesAreNotCarriedOverBetweenPhotos(self):
+        import cv2
+        import numpy as np
+        faceImage = cv2.imread(getProjectRootPath()+"/apps/DeviceApp/data/testimages/moro_orig.png")
+        newcomerImage = np.random.default_rng(0).integers(0, 256, faceImage.shape, dtype=np.uint8)
+        newcomerImage[300:460, 40:200] = faceImage[12:172, 250:410]
+
+        inputPath = os.path.join(self.workDirectory.name, "input")
+        os.makedirs(inputPath)
+        cv2.imwrite(os.path.join(inputPath, "1.png"), faceImage)
+        cv2.imwrite(os.path.join(inputPath, "2.png"), newcomerImage)
+        self.options.update({"filters": ["FacesBlurrer"], "workers": 1})
+        self.runBatch(inputPath)
+
+        # The newcomer is blurred, the face of the first photo is not looked for in the second
+        blurredImage = cv2.imread(os.path.join(self.options["outputPath"], "2.png"))
+        self.assertFalse((blurredImage[338:398, 90:150] == newcomerImage[338:398, 90:150]).all())
+        self.assertTrue((blurredImage[:300, :] == newcomerImage[:300, :]).all())
+
+if __name__ == '__main__':
+    unittest.main()
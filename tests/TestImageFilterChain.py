@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+from apps.utils.LatencyStats import LatencyStats
+from apps.utils.images.filters.ImageFilterChain import ImageFilterChain
+
+class TestImageFilterChain(unittest.TestCase):
+
+    def testFiltersRunInOrderOnTheSameImage(self):
+        latencyStats = LatencyStats()
+        imageFilterChain = ImageFilterChain(["AreaBlurrer", "FacesBlurrer"], {"areaBlurrer": {"polygons": [[[0, 0], [10, 0], [10, 10], [0, 10]]]}}, latencyStats)
+        self.assertEqual(imageFilterChain.getFilterNames(), ["AreaBlurrer", "FacesBlurrer"])
+
+        cvImage = np.zeros((480, 640, 3), dtype=np.uint8)
+        filteredImage, filterTimes = imageFilterChain.blurImageDataWithTimes(cvImage)
+        self.assertIs(filteredImage, cvImage)
+        self.assertEqual(list(filterTimes.keys()), ["AreaBlurrer", "FacesBlurrer"])
+        self.assertTrue(cvImage[0:10, 0:10].any())
+
+        imageFilterChain.blurImageData(cvImage)
+        summary = latencyStats.getSummary()
+        self.assertEqual(summary["blur:AreaBlurrer"]["count"], 1)
+        self.assertEqual(summary["blur:FacesBlurrer"]["count"], 1)
+
+    def testSingleFilterName(self):
+        self.assertEqual(ImageFilterChain("AreaBlurrer").getFilterNames(), ["AreaBlurrer"])
+        with self.assertRaises(Exception):
+            ImageFilterChain(["NoSuchBlurrer"])
+
+if __name__ == '__main__':
+    unittest.main()
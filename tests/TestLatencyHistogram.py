@@ -0,0 +1,35 @@
+import unittest
+from apps.utils.LatencyHistogram import LatencyHistogram
+from apps.utils.LatencyStats import LatencyStats
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def testPercentilesAreWithinABucket(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 101):
+            histogram.record(millis / 1000.0, now=1000)
+        result = histogram.getPercentiles([50, 99], now=1000)
+        self.assertEqual(result["count"], 100)
+        self.assertAlmostEqual(result["percentiles"][50], 0.050, delta=0.050 * 0.2)
+        self.assertAlmostEqual(result["percentiles"][99], 0.099, delta=0.099 * 0.2)
+
+    def testOldWindowsRollOut(self):
+        histogram = LatencyHistogram(windowSeconds=10, windowsCount=3)
+        histogram.record(0.1, now=5)
+        histogram.record(0.1, now=25)
+        self.assertEqual(histogram.getPercentiles([50], now=25)["count"], 2)
+        self.assertEqual(histogram.getPercentiles([50], now=35)["count"], 1)
+        histogram.record(0.1, now=45)
+        self.assertEqual(histogram.getPercentiles([50], now=45)["count"], 2)
+        self.assertEqual(histogram.getPercentiles([50], now=55)["count"], 1)
+
+    def testStatsSummary(self):
+        latencyStats = LatencyStats()
+        with latencyStats.measure("blur"):
+            pass
+        summary = latencyStats.getSummary()
+        self.assertEqual(summary["blur"]["count"], 1)
+        self.assertIn("p95", summary["blur"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import time
+import unittest
+from apps.DeviceApp.features.CameraShooter import CameraShooter
+from apps.DeviceApp.features.CameraStreamer import CameraStreamer
+from apps.utils.CachedProbe import CachedProbe
+from tests.fakes.fakeMotion import FakeMotionServer
+
+class TestMotionControl(unittest.TestCase):
+
+    def setUp(self):
+        self.fakeMotion = FakeMotionServer()
+        self.fakeMotion.start()
+        self.cameraStreamer = CameraStreamer({"host": "http://localhost", "settings": {"streaming": {
+            "mode": "motionControl",
+            "motionControlUrl": self.fakeMotion.url,
+            "motionStreamUrl": self.fakeMotion.url+"/stream",
+            "stateProbeInterval": 60,
+        }}})
+
+    def tearDown(self):
+        self.fakeMotion.stop()
+
+    def testStreamTogglesThroughWebControl(self):
+        self.assertFalse(self.cameraStreamer.areWeCurrentlyStreaming())
+
+        startTime = time.perf_counter()
+        self.cameraStreamer.startStreaming()
+        self.assertTrue(self.fakeMotion.detectionActive)
+        self.assertTrue(self.cameraStreamer.areWeCurrentlyStreaming())
+        self.cameraStreamer.stopStreaming()
+        self.assertLess(time.perf_counter() - startTime, 1)
+
+        self.assertFalse(self.fakeMotion.detectionActive)
+        self.assertFalse(self.cameraStreamer.areWeCurrentlyStreaming())
+        self.assertEqual(self.fakeMotion.requestedPaths, ["/0/detection/status", "/0/detection/start", "/0/detection/pause"])
+
+    def testStoppingDisconnectsTheViewers(self):
+        self.fakeMotion.streamFramesCount = 1000
+        self.cameraStreamer.startStreaming()
+        contentType, stream, closeStream = self.cameraStreamer.motionStreamProxy.open()
+        self.assertIn(b"\xff\xd8", next(stream))
+        self.assertEqual(self.cameraStreamer.getViewersCount(), 1)
+
+        self.cameraStreamer.stopStreaming()
+        self.assertEqual(len(list(stream)), 0)
+        self.assertEqual(self.cameraStreamer.getViewersCount(), 0)
+
+    def testStillsAreTakenFromTheResidentMotion(self):
+        shooter = CameraShooter(None, False, {"camera": {"captureEngine": "fake"}})
+        cameraStreamer = CameraStreamer({"host": "http://localhost", "settings": {"streaming": {
+            "mode": "motionControl",
+            "motionControlUrl": self.fakeMotion.url,
+            "motionStreamUrl": self.fakeMotion.url+"/stream",
+        }}}, shooter.captureFrame, False, shooter.releaseCamera, shooter.reclaimCamera)
+
+        # Motion holds the camera also while not streaming
+        self.assertFalse(cameraStreamer.areWeCurrentlyStreaming())
+        self.assertTrue(cameraStreamer.isCameraHeldByStreamingApp())
+        self.assertEqual(cameraStreamer.getSnapshotFrame(), self.fakeMotion.frame)
+        self.assertIn("/stream", self.fakeMotion.requestedPaths)
+        with self.assertRaises(Exception):
+            shooter.captureObservation()
+        self.assertEqual(shooter.captureEngine.capturesCount, 0)
+
+        cameraStreamer.startStreaming()
+        cameraStreamer.stopStreaming()
+        self.assertTrue(shooter.captureEngineReleased)
+
+    def testStateIsServedFromTheCache(self):
+        self.assertFalse(self.cameraStreamer.areWeCurrentlyStreaming())
+        self.fakeMotion.detectionActive = True
+        self.assertFalse(self.cameraStreamer.areWeCurrentlyStreaming())
+        self.assertEqual(len(self.fakeMotion.requestedPaths), 1)
+        self.assertTrue(self.cameraStreamer.checkIfStreamingAppActuallyRunning())
+        self.assertTrue(self.cameraStreamer.areWeCurrentlyStreaming())
+
+    def testSnapshotIsReadFromTheMotionStream(self):
+        self.cameraStreamer.startStreaming()
+        self.assertEqual(self.cameraStreamer.getSnapshotFrame(), self.fakeMotion.frame)
+
+        self.fakeMotion.streamFramesCount = 0
+        self.assertIsNone(self.cameraStreamer.getSnapshotFrame())
+
+    def testFailingProbeKeepsThePreviousState(self):
+        probeResults = [True, Exception("motion is down")]
+        def probe():
+            probeResult = probeResults.pop(0)
+            if isinstance(probeResult, Exception):
+                raise probeResult
+            return probeResult
+        cachedProbe = CachedProbe(probe, 60, False)
+        self.assertTrue(cachedProbe.get())
+        self.assertTrue(cachedProbe.refresh())
+        self.assertEqual(cachedProbe.lastError, "motion is down")
+
+    def testStaleProbeDoesNotOverwriteTheSetState(self):
+        cachedProbe = CachedProbe(lambda: cachedProbe.set(True) or False, 60, False)
+        self.assertTrue(cachedProbe.refresh())
+        self.assertTrue(cachedProbe.get())
+
+if __name__ == '__main__':
+    unittest.main()
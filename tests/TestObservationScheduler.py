@@ -0,0 +1,34 @@
+import time
+import unittest
+from apps.DeviceApp.features.coffee.RequestDemandHistory import RequestDemandHistory
+from apps.DeviceApp.features.coffee.ObservationScheduler import ObservationScheduler
+
+class TestObservationScheduler(unittest.TestCase):
+
+    def testDemandFadesOutWeekly(self):
+        demandHistory = RequestDemandHistory(weeklyDecay=0.5)
+        now = time.time()
+        for i in range(10):
+            demandHistory.recordRequest(now)
+        self.assertEqual(demandHistory.getExpectedRequestsPerHour(now), 10)
+        nextWeek = now + RequestDemandHistory.weekInSeconds
+        self.assertAlmostEqual(demandHistory.getExpectedRequestsPerHour(nextWeek), 5 / 1.5)
+
+    def testIntervalFollowsDemandAndDutyCycle(self):
+        scheduler = ObservationScheduler(lambda: None, {"observationScheduler": {
+            "minInterval": 30,
+            "maxInterval": 900,
+            "maxDutyCycle": 0.1,
+        }})
+        now = time.time()
+        self.assertIsNone(scheduler.getObservationInterval(now))
+
+        for i in range(60):
+            scheduler.recordRequest(now)
+        self.assertEqual(scheduler.getObservationInterval(now), 60)
+
+        scheduler.recordObservation(10, now)
+        self.assertEqual(scheduler.getObservationInterval(now), 100)
+
+if __name__ == '__main__':
+    unittest.main()
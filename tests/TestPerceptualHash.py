@@ -0,0 +1,25 @@
+import os
+import unittest
+from apps.DeviceApp.features.coffee.CoffeeObservation import openCvNotInstalled
+from apps.utils.images.PerceptualHash import differenceHashOfJpeg, hammingDistance
+
+testImagesPath = os.path.join(os.path.dirname(__file__), "..", "apps", "DeviceApp", "data", "testimages")
+
+def readTestImage(imageName):
+    with open(os.path.join(testImagesPath, imageName), "rb") as imageFile:
+        return imageFile.read()
+
+@unittest.skipIf(openCvNotInstalled, "OpenCV not installed")
+class TestPerceptualHash(unittest.TestCase):
+
+    def testSameImageHasNoDistance(self):
+        frame = readTestImage("5aa2867e.jpg")
+        self.assertEqual(hammingDistance(differenceHashOfJpeg(frame), differenceHashOfJpeg(frame)), 0)
+
+    def testDifferentImagesAreFarApart(self):
+        hashA = differenceHashOfJpeg(readTestImage("5aa2867e.jpg"))
+        hashB = differenceHashOfJpeg(readTestImage("night.jpg"))
+        self.assertGreater(hammingDistance(hashA, hashB), 10)
+
+if __name__ == '__main__':
+    unittest.main()
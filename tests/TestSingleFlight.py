@@ -0,0 +1,45 @@
+import threading
+import time
+import unittest
+from apps.utils.SingleFlight import SingleFlight
+
+class TestSingleFlight(unittest.TestCase):
+
+    def testConcurrentCallsShareOneResult(self):
+        singleFlight = SingleFlight()
+        calls = []
+        results = []
+
+        def observe():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"coffeeObservationUrl": "https://example.com/a.jpg"}
+
+        def ask():
+            results.append(singleFlight.do("coffeeObservation", observe))
+
+        askers = [threading.Thread(target=ask) for i in range(5)]
+        for asker in askers:
+            asker.start()
+        for asker in askers:
+            asker.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertFalse(singleFlight.isInFlight("coffeeObservation"))
+        self.assertEqual(singleFlight.getStatus(), {"calls": 1, "joinedCallers": 4})
+
+    def testErrorsAreRaisedAndNotCached(self):
+        singleFlight = SingleFlight()
+
+        def fail():
+            raise Exception("No camera")
+
+        with self.assertRaises(Exception):
+            singleFlight.do("coffeeObservation", fail)
+        self.assertEqual(singleFlight.do("coffeeObservation", lambda: "ok"), "ok")
+        self.assertEqual(singleFlight.getStatus(), {"calls": 2, "joinedCallers": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import time
+import unittest
+from apps.DeviceApp.features.CameraStreamer import CameraStreamer
+from tests.fakes.fakeMotion import FakeMotionServer
+
+class TestStreamIdleShutdown(unittest.TestCase):
+
+    def waitFor(self, condition, timeout = 5):
+        deadline = time.time() + timeout
+        while not condition():
+            if time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def testIdleInProcessStreamIsStopped(self):
+        cameraStreamer = CameraStreamer({"host": "http://localhost", "settings": {"streaming": {
+            "mode": "inProcess",
+            "idleFramesPerSecond": 50,
+            "idleShutdownSeconds": 0.3,
+            "idleCheckInterval": 0.05,
+        }}}, lambda: b"frame")
+        cameraStreamer.startStreaming()
+        try:
+            stream = cameraStreamer.frameBroadcaster.generateMultipartStream(1)
+            next(stream)
+            self.assertEqual(cameraStreamer.getViewersCount(), 1)
+            time.sleep(0.5)
+            self.assertTrue(cameraStreamer.areWeCurrentlyStreaming())
+            self.assertGreaterEqual(cameraStreamer.getStreamingStatus()["uptimeSeconds"], 0)
+
+            stream.close()
+            self.assertTrue(self.waitFor(lambda: not cameraStreamer.areWeCurrentlyStreaming()))
+            self.assertIsNone(cameraStreamer.getStreamingStatus()["uptimeSeconds"])
+        finally:
+            cameraStreamer.stopIdleWatchdog()
+            cameraStreamer.stopStreaming()
+
+    def testMotionStreamViewersAreCounted(self):
+        fakeMotion = FakeMotionServer(detectionActive=True, streamFramesCount=100)
+        fakeMotion.start()
+        try:
+            cameraStreamer = CameraStreamer({"host": "http://localhost", "settings": {"streaming": {
+                "mode": "motionControl",
+                "motionControlUrl": fakeMotion.url,
+                "motionStreamUrl": fakeMotion.url+"/stream",
+                "idleShutdownSeconds": 60,
+            }}})
+            self.assertEqual(cameraStreamer.getStreamingStatus()["viewers"], 0)
+
+            contentType, stream, closeStream = cameraStreamer.motionStreamProxy.open()
+            self.assertTrue(contentType.startswith("multipart/x-mixed-replace"))
+            self.assertIn(b"\xff\xd8", next(stream))
+            self.assertEqual(cameraStreamer.getStreamingStatus()["viewers"], 1)
+            self.assertFalse(cameraStreamer.stopStreamingIfIdle())
+
+            stream.close()
+            self.assertEqual(cameraStreamer.getViewersCount(), 0)
+            cameraStreamer.lastWatchedAt = time.time() - 120
+            self.assertTrue(cameraStreamer.stopStreamingIfIdle())
+            self.assertFalse(fakeMotion.detectionActive)
+        finally:
+            fakeMotion.stop()
+
+    def testViewerLeavingBeforeTheFirstChunkIsClosed(self):
+        fakeMotion = FakeMotionServer(detectionActive=True, streamFramesCount=100)
+        fakeMotion.start()
+        try:
+            cameraStreamer = CameraStreamer({"host": "http://localhost", "settings": {"streaming": {
+                "mode": "motionControl",
+                "motionControlUrl": fakeMotion.url,
+                "motionStreamUrl": fakeMotion.url+"/stream",
+            }}})
+            contentType, stream, closeStream = cameraStreamer.motionStreamProxy.open()
+            self.assertEqual(cameraStreamer.getViewersCount(), 1)
+            stream.close()
+            closeStream()
+            closeStream()
+            self.assertEqual(cameraStreamer.getViewersCount(), 0)
+        finally:
+            fakeMotion.stop()
+
+if __name__ == '__main__':
+    unittest.main()
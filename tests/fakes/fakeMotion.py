@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the motion web control interface, serves the detection status, pause and start actions,
+and a MJPEG stream of the test image at /stream
+
+Usage: python3 tests/fakes/fakeMotion.py [port]
+
+@author lsipii
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+imagePath = os.path.join(os.path.dirname(__file__), "..", "..", "apps", "DeviceApp", "data", "testimages", "5aa2867e.jpg")
+
+class FakeMotionServer():
+
+    def __init__(self, port = 0, detectionActive = False, streamFramesCount = 3):
+        self.detectionActive = detectionActive
+        self.streamFramesCount = streamFramesCount
+        self.requestedPaths = []
+        with open(imagePath, "rb") as imageFile:
+            self.frame = imageFile.read()
+        fakeMotion = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                fakeMotion.requestedPaths.append(self.path)
+                if self.path == "/stream":
+                    self.sendStream()
+                    return
+                if self.path == "/0/detection/status":
+                    body = "Camera 0 Detection status "+("ACTIVE" if fakeMotion.detectionActive else "PAUSE")+"\n"
+                elif self.path == "/0/detection/start":
+                    fakeMotion.detectionActive = True
+                    body = "Camera 0 Detection resumed\nDone\n"
+                elif self.path == "/0/detection/pause":
+                    fakeMotion.detectionActive = False
+                    body = "Camera 0 Detection paused\nDone\n"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def sendStream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=BoundaryString")
+                self.end_headers()
+                try:
+                    for i in range(fakeMotion.streamFramesCount):
+                        self.wfile.write(b"--BoundaryString\r\nContent-type: image/jpeg\r\nContent-Length: "+str(len(fakeMotion.frame)).encode()+b"\r\n\r\n"+fakeMotion.frame+b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), RequestHandler)
+        self.url = "http://127.0.0.1:"+str(self.server.server_address[1])
+        self.serverThread = None
+
+    def start(self):
+        self.serverThread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.serverThread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.serverThread.join()
+
+if __name__ == '__main__':
+    fakeMotion = FakeMotionServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8080)
+    print("Fake motion web control at "+fakeMotion.url)
+    fakeMotion.server.serve_forever()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Stand-in for raspistill in the signal mode: writes a test image to stdout on every SIGUSR1
+
+@author lsipii
+"""
+import os
+import signal
+import sys
+
+imagePath = os.path.join(os.path.dirname(__file__), "..", "..", "apps", "DeviceApp", "data", "testimages", "5aa2867e.jpg")
+with open(imagePath, "rb") as imageFile:
+    frame = imageFile.read()
+
+def writeFrame(signum, stackFrame):
+    sys.stdout.buffer.write(frame)
+    sys.stdout.buffer.flush()
+
+signal.signal(signal.SIGUSR1, writeFrame)
+signal.signal(signal.SIGTERM, lambda signum, stackFrame: sys.exit(0))
+while True:
+    signal.pause()
@@ -1,11 +1,89 @@
 #!/usr/bin/env python3
 """
+Runs the image filters and the coffee situation resolver over a directory or an archive of coffee images,
+eg. re-blurs the stored photos when the privacy polygons change, or calibrates the coffee pot regions from them
+
+Usage: tinker.py --input=images|images.tar.gz|images.zip [--output=blurred] [--results=results.jsonl] [--filters=AreaBlurrer,FacesBlurrer] [--resolve] [--config=config/deviceApp.json] [--workers=4] [--quality=85]
+       tinker.py --input=images --calibrate=config/coffeePotRegions.json [--config=config/deviceApp.json]
+
 @author lsipii
 """
-from apps.utils.images.filters.AreaBlurrer import AreaBlurrer
+import sys, getopt
+import json
+
+from apps.DeviceApp.features.ImageBatchProcessor import ImageBatchProcessor
+
+# App runner
+if __name__ == '__main__':
+
+	argv = sys.argv[1:]
+
+	inputPath = None
+	resultsPath = None
+	calibrationPath = None
+	options = {
+		"filters": None,
+		"resolve": False,
+		"appSettings": {},
+		"outputPath": None,
+		"jpegQuality": 85,
+		"workers": None,
+	}
+
+	# Help texts
+	def printHelp():
+		print("Usage: tinker.py --input=images|images.tar.gz|images.zip [--output=blurred] [--results=results.jsonl] [--filters=AreaBlurrer,FacesBlurrer] [--resolve] [--config=config/deviceApp.json] [--workers=4] [--quality=85]")
+		print("       tinker.py --input=images --calibrate=config/coffeePotRegions.json [--config=config/deviceApp.json]")
+		exit()
+
+	try:
+		opts, args = getopt.getopt(argv, "hi:o:", ["help", "input=", "output=", "results=", "filters=", "resolve", "config=", "workers=", "quality=", "calibrate="])
+	except getopt.GetoptError:
+		printHelp()
+
+	for opt, arg in opts:
+		if opt in ("-h", "--help"):
+			printHelp()
+		elif opt in ("-i", "--input"):
+			inputPath = arg
+		elif opt in ("-o", "--output"):
+			options["outputPath"] = arg
+		elif opt == "--results":
+			resultsPath = arg
+		elif opt == "--filters":
+			options["filters"] = arg.split(",")
+		elif opt == "--resolve":
+			options["resolve"] = True
+		elif opt == "--config":
+			with open(arg) as configFile:
+				options["appSettings"] = json.load(configFile)["app"]["settings"]
+		elif opt == "--workers":
+			options["workers"] = int(arg)
+		elif opt == "--quality":
+			options["jpegQuality"] = int(arg)
+		elif opt == "--calibrate":
+			calibrationPath = arg
+
+	if inputPath is None:
+		printHelp()
+
+	# Finds the coffee pots from the images, stores their regions for the resolver
+	if calibrationPath is not None:
+		from apps.DeviceApp.features.coffee.CoffeeSituationResolver import CoffeeSituationResolver
+		coffeeSituationResolver = CoffeeSituationResolver(dict(options["appSettings"], CoffeeSituationResolverEnabled=True))
+		potRegions = coffeeSituationResolver.calibratePotRegions(ImageBatchProcessor(options).iterateImages(inputPath))
+		coffeeSituationResolver.savePotRegions(calibrationPath)
+		print(json.dumps({"regions": potRegions, "regionsFile": calibrationPath}))
+		exit()
 
-imageName = "mismoro.png"
-imagePath = "device/data/testimages/"+imageName
+	# The configured filters by default
+	if options["filters"] is None and options["appSettings"].get("imageBlurrerFilter"):
+		options["filters"] = options["appSettings"]["imageBlurrerFilter"]
 
-areaBlurrer = AreaBlurrer()
-areaBlurrer.blurImage(imagePath)
+	imageBatchProcessor = ImageBatchProcessor(options)
+	if resultsPath is None:
+		summary = imageBatchProcessor.run(inputPath, sys.stdout)
+	else:
+		with open(resultsPath, "w") as resultsFile:
+			summary = imageBatchProcessor.run(inputPath, resultsFile)
+	print(json.dumps(summary), file=sys.stderr)